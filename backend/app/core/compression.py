@@ -0,0 +1,166 @@
+import time
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.config import settings
+from app.core.metrics import COMPRESSION_CPU, RESPONSE_BODY_BYTES
+
+try:
+    import brotli
+except ImportError:  # brotli yoksa sadece gzip konuşulur
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "text/",
+)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Accept-Encoding başlığından 'br' / 'gzip' seçer; q=0 ile reddedilenler atlanır."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    if brotli and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    """brotli ve gzip için ortak akış arayüzü: process() parça sıkıştırır, finish() kapatır."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        else:
+            # wbits=31: gzip başlığı ve CRC ile
+            self._zlib = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def process(self, chunk: bytes) -> bytes:
+        # Streaming'de her parça hemen istemciye ulaşsın diye flush edilir
+        if self.encoding == "br":
+            return self._brotli.process(chunk) + self._brotli.flush()
+        return self._zlib.compress(chunk) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, chunk: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(chunk) + self._brotli.finish()
+        return self._zlib.compress(chunk) + self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """
+    Saf ASGI middleware: JSON/metin yanıtlarını istemcinin desteklediği en iyi
+    kodlamayla (brotli, yoksa gzip) sıkıştırır.
+
+    - COMPRESSION_MIN_BYTES altındaki tek parça gövdeler olduğu gibi gönderilir
+      (küçük yanıtta kazanç, harcanan CPU'ya değmez).
+    - Streaming yanıtlar COMPRESSION_STREAMING açıksa parça parça sıkıştırılır.
+    - Zaten Content-Encoding taşıyan veya sıkıştırılamayan tipler dokunulmadan geçer.
+    Yanıt başına gövde boyutu ve sıkıştırma CPU süresi Prometheus'a yazılır.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+        original_bytes = sent_bytes = 0
+        cpu_seconds = 0.0
+
+        def observe(used_encoding: str) -> None:
+            RESPONSE_BODY_BYTES.labels(used_encoding, "original").observe(original_bytes)
+            RESPONSE_BODY_BYTES.labels(used_encoding, "sent").observe(sent_bytes)
+            if used_encoding != "identity":
+                COMPRESSION_CPU.labels(used_encoding).observe(cpu_seconds)
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor, passthrough, original_bytes, sent_bytes, cpu_seconds
+
+            if message["type"] == "http.response.start":
+                # Gövdenin ilk parçası görülene kadar başlıklar bekletilir
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                passthrough = "content-encoding" in headers or not content_type.startswith(COMPRESSIBLE_TYPES)
+                if passthrough:
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            original_bytes += len(body)
+
+            if start_message is not None:
+                # İlk gövde parçası: sıkıştırılıp sıkıştırılmayacağına burada karar verilir
+                headers = MutableHeaders(raw=start_message["headers"])
+                streaming = more_body
+                if (streaming and not settings.COMPRESSION_STREAMING) or (
+                    not streaming and len(body) < settings.COMPRESSION_MIN_BYTES
+                ):
+                    passthrough = True
+                    await send(start_message)
+                    start_message = None
+                    sent_bytes = original_bytes
+                    if not more_body:
+                        observe("identity")
+                    await send(message)
+                    return
+
+                compressor = _Compressor(encoding)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                cpu_start = time.thread_time()
+                chunk = compressor.process(body) if streaming else compressor.finish(body)
+                cpu_seconds += time.thread_time() - cpu_start
+                if streaming:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(chunk))
+                await send(start_message)
+                start_message = None
+            else:
+                cpu_start = time.thread_time()
+                chunk = compressor.process(body) if more_body else compressor.finish(body)
+                cpu_seconds += time.thread_time() - cpu_start
+
+            sent_bytes += len(chunk)
+            if not more_body:
+                observe(encoding)
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
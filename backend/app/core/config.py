@@ -13,7 +13,99 @@ class Settings(BaseSettings):
     OPENROUTER_API_KEY: str | None = None
     GROQ_API_KEY: str | None = None
     
+    # Yük testi / yerel geliştirme: gerçek sağlayıcı yerine deterministik sahte model
+    AGENT_FAKE_LLM: bool = False
+    AGENT_FAKE_LLM_LATENCY_MS: int = 0
+    # Router'ı yerelde denemek için birden çok sahte sağlayıcı: "ad:gecikme_ms:hata_oranı,..."
+    AGENT_FAKE_LLM_PROVIDERS: str = ""
+    
+    # Saf filtre/detay sorgularını LLM'siz, araçlarla doğrudan cevaplayan hızlı yol
+    AGENT_FAST_PATH_ENABLED: bool = True
+    AGENT_FAST_PATH_LIMIT: int = 5
+    AGENT_FAST_PATH_VOCAB_SECONDS: int = 600   # Tür/yönetmen sözlüğünün tazelenme aralığı
+    
+    # Ajan cevap önbelleği (aynı soru + geçmiş + model + katalog versiyonu)
+    AGENT_ANSWER_CACHE_ENABLED: bool = True
+    AGENT_ANSWER_CACHE_TTL_SECONDS: int = 3600
+    AGENT_ANSWER_CACHE_MAX_HISTORY: int = 0    # 0: sadece geçmişsiz ilk sorular önbelleklenir
+    
+    # LLM router: sağlayıcılar arası gecikme farkındalıklı yönlendirme, hedge ve failover
+    LLM_CALL_TIMEOUT_SECONDS: float = 20.0
+    LLM_HEDGE_AFTER_SECONDS: float = 4.0     # Üst sınır; birincilin p95'i daha kısaysa o kullanılır. 0 = hedge yok
+    LLM_MAX_PARALLEL_CALLS: int = 2
+    LLM_ROUTER_WINDOW: int = 50              # İstatistik için son N çağrı
+    LLM_ROUTER_FAILURE_THRESHOLD: int = 3    # Art arda bu kadar hatada sağlayıcı dinlenmeye alınır
+    LLM_ROUTER_COOLDOWN_SECONDS: float = 30.0
+    
+    # /api/agent/chat kabul kontrolü: Redis token bucket (kullanıcı + global) ve eşzamanlılık sınırı
+    AGENT_USER_RATE_PER_MINUTE: float = 6
+    AGENT_USER_BURST: int = 3
+    AGENT_GLOBAL_RATE_PER_MINUTE: float = 300
+    AGENT_GLOBAL_BURST: int = 50
+    AGENT_MAX_CONCURRENT: int = 8            # Süreç başına aynı anda çalışan ajan sayısı
+    AGENT_QUEUE_TIMEOUT_SECONDS: float = 2.0
+    
     REDIS_URL: str
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 5.0
+    
+    # İstek bazında zaman bütçesi (Mongo/Redis/embedding/LLM çağrılarına yayılır)
+    REQUEST_TIMEOUT_SECONDS: float = 10.0
+    AGENT_REQUEST_TIMEOUT_SECONDS: float = 60.0
+    AGENT_MAX_ITERATIONS: int = 6             # Ajan döngüsünde en fazla araç çağrısı turu
+    
+    # Admin dışa aktarımı (NDJSON/CSV akışı)
+    EXPORT_BATCH_SIZE: int = 2000             # Motor cursor getMore başına doküman
+    
+    # Sıcak okuma endpoint'lerinde response_model doğrulaması yerine orjson ile doğrudan yanıt
+    FAST_JSON_RESPONSES: bool = True
+    
+    # Yanıt sıkıştırma (brotli > gzip). Düşük seviyeler CPU'yu, yüksekler bant genişliğini korur
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_BYTES: int = 1024          # Bundan küçük gövdeler olduğu gibi gönderilir
+    COMPRESSION_BROTLI_QUALITY: int = 4        # 0-11; 4 civarı gzip-6 hızında, daha küçük çıktı
+    COMPRESSION_GZIP_LEVEL: int = 6            # 1-9
+    COMPRESSION_STREAMING: bool = True         # Parça parça gelen (streaming) yanıtlar da sıkıştırılsın mı
+    
+    # Embedding modeli (app.core.embeddings.EMBEDDING_MODELS anahtarı) ve ONNX Runtime ayarları
+    EMBEDDING_MODEL: str = "minilm-l12"
+    EMBEDDING_CACHE_DIR: str | None = None        # Boşsa FastEmbed'in geçici dizini
+    EMBEDDING_LOCAL_FILES_ONLY: bool = False      # True: açılışta model indirilmez, cache'te olmalı
+    EMBEDDING_THREADS: int | None = None          # ONNX thread sayısı; boşsa tüm çekirdekler
+    EMBEDDING_PARALLEL: int | None = None         # Büyük toplu işlerde veri-paralel alt süreç sayısı
+    EMBEDDING_REEMBED_ON_CHANGE: bool = True      # Model değişince eski vektörler arka planda yenilenir
+    EMBEDDING_REEMBED_BATCH: int = 256
+    
+    # Admin'e özel istek profillemesi (X-Profile başlığı)
+    PROFILING_ENABLED: bool = True
+    PROFILE_BUFFER_SIZE: int = 20             # Bellekte tutulan son rapor sayısı
+    PROFILE_SAMPLE_INTERVAL_MS: float = 5.0
+    
+    # Arka plan işleri (Redis stream kuyruğu)
+    JOB_WORKERS_IN_APP: bool = True   # False ise işler `python -m app.worker` ile çalışır
+    JOB_WORKER_CONCURRENCY: int = 2
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_SECONDS: float = 2.0
+    JOB_DEDUPE_TTL_SECONDS: int = 3600
+    
+    # Süreç içi vektör indeksi ve önceden hesaplanan benzer filmler
+    VECTOR_INDEX_SYNC_SECONDS: float = 2.0
+    VECTOR_INDEX_FULL_RELOAD_SECONDS: int = 900
+    SIMILAR_MOVIES_K: int = 10
+    SIMILAR_BLOCK_ROWS: int = 512      # Skor bloğu: 512 x 65536 float32 ~ 128 MB
+    SIMILAR_BLOCK_COLS: int = 65536
+    SIMILAR_REFRESH_CANDIDATES: int = 256
+    RECOMMENDATION_TASTE_TTL_SECONDS: int = 7 * 24 * 3600
+    
+    # Hibrit arama (anahtar kelime + vektör, RRF)
+    SEARCH_CANDIDATE_MULTIPLIER: int = 5     # Her sıralamadan limit * bu kadar aday
+    SEARCH_PREFILTER_MAX_IDS: int = 50_000   # Daha geniş filtreler sonradan uygulanır
+    AUTOCOMPLETE_REBUILD_SECONDS: int = 600
+    FACETS_RECONCILE_SECONDS: int = 3600
+    TOTAL_COUNT_CACHE_SECONDS: int = 60
+    
+    # Liderlik tabloları (Redis sorted set)
+    LEADERBOARD_MIN_REVIEWS: int = 25        # Ağırlıklı puandaki m (önsel yorum sayısı)
+    TRENDING_WINDOW_CACHE_SECONDS: int = 60
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -1,5 +1,8 @@
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, TEXT
+from pymongo.errors import OperationFailure
 from app.core.config import settings
+from app.core.metrics import MongoCommandMetrics
 from typing import Optional
 
 class Database:
@@ -16,10 +19,41 @@ async def get_database() -> AsyncIOMotorDatabase:
 
 async def connect_to_mongo() -> None:
     """Uygulama başlarken çalışacak"""
-    db.client = AsyncIOMotorClient(settings.MONGO_URL)
+    db.client = AsyncIOMotorClient(settings.MONGO_URL, event_listeners=[MongoCommandMetrics()])
     print("MongoDB Bağlantısı Başarılı!")
 
 async def close_mongo_connection() -> None:
     """Uygulama kapanırken çalışacak"""
     db.client.close()
-    print("MongoDB Bağlantısı Kapatıldı.")
\ No newline at end of file
+    print("MongoDB Bağlantısı Kapatıldı.")
+
+
+async def ensure_indexes(database: AsyncIOMotorDatabase) -> None:
+    """
+    Yazma yollarının dayandığı unique index'leri oluşturur.
+    Kayıt/yorum handler'ları ön kontrol sorgusu yerine DuplicateKeyError yakalar.
+    Diğerleri arka plan işlerinin ve öneri sorgularının dayandığı index'lerdir.
+    """
+    indexes = [
+        (database.users, [("email", ASCENDING)], {"unique": True}),
+        (database.users, [("username", ASCENDING)], {"unique": True}),
+        (database.reviews, [("movie_id", ASCENDING), ("user_id", ASCENDING)], {"unique": True}),
+        (database.reviews, [("user_id", ASCENDING)], {}),
+        (database.reviews, [("created_at", ASCENDING)], {}),
+        (database.movies, [("embedding_updated_at", ASCENDING)], {}),
+        (database.movies, [("average_rating", DESCENDING), ("review_count", DESCENDING)], {}),
+        (database.movie_facets, [("facet", ASCENDING), ("count", DESCENDING)], {}),
+        # Hibrit aramanın anahtar kelime ayağı; içerik TR/EN karışık olduğu için kök bulma kapalı
+        (
+            database.movies,
+            [("title", TEXT), ("director", TEXT), ("cast", TEXT), ("description", TEXT)],
+            {"name": "movie_text", "default_language": "none", "weights": {"title": 10, "director": 5, "cast": 3, "description": 1}},
+        ),
+        (database.movies, [("similar_movies", ASCENDING)], {}),
+    ]
+    for collection, keys, options in indexes:
+        try:
+            await collection.create_index(keys, **options)
+        except OperationFailure as e:
+            # Mevcut veride tekrar eden kayıt varsa index oluşmaz; uygulama yine de açılır
+            print(f"Index oluşturulamadı ({collection.name} {keys}): {e}")
@@ -0,0 +1,139 @@
+"""
+İstek bazında zaman bütçesi (deadline).
+
+DeadlineMiddleware her HTTP isteği için route'a göre bir bütçe belirler ve bitiş
+anını `request_deadline_var` ContextVar'ına yazar (user_context_var gibi; handler
+ve araçlar parametre taşımadan okur). Bütçe şu çağrılara yayılır:
+
+- Mongo: pymongo.timeout() ile; sürücü her komuta kalan süreyi maxTimeMS olarak ekler.
+- Redis: InstrumentedRedis her komutu kalan süreyle sınırlar (+ REDIS_SOCKET_TIMEOUT_SECONDS).
+- Embedding ve LLM: `run_with_deadline` / LLM router kalan süreyi kullanır.
+
+Süre dolunca istek 504 ile hızlıca biter. Arka plan işlerinde deadline yoktur.
+"""
+import asyncio
+import json
+import time
+from contextvars import ContextVar
+from typing import Awaitable, Optional, TypeVar
+
+import pymongo
+from fastapi import HTTPException, status
+from pymongo.errors import PyMongoError
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+# time.monotonic() cinsinden bitiş anı; None ise sınır yok
+request_deadline_var: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+TIMEOUT_HEADER = b"x-request-timeout"   # İstemci bütçeyi kısaltabilir, uzatamaz
+TIMEOUT_DETAIL = "İstek zaman aşımına uğradı; sunucu bağımlılıklarından biri zamanında yanıt vermedi."
+
+
+class DeadlineExceeded(HTTPException):
+    def __init__(self, detail: str = TIMEOUT_DETAIL):
+        super().__init__(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=detail)
+
+
+def budget_for(path: str) -> Optional[float]:
+    """Route'a özel varsayılan bütçe (saniye). None: sınırsız (uzun süren yükleme vb.)."""
+    if path.startswith("/api/agent/chat"):
+        return settings.AGENT_REQUEST_TIMEOUT_SECONDS
+    if path.startswith("/api/movies/import") or path.endswith("/export") or path == "/metrics":
+        return None
+    return settings.REQUEST_TIMEOUT_SECONDS
+
+
+def remaining() -> Optional[float]:
+    """Kalan süre (saniye, en az 0); deadline yoksa None."""
+    deadline = request_deadline_var.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def cap_timeout(timeout: Optional[float]) -> Optional[float]:
+    """Bir çağrının kendi zaman aşımını kalan bütçeyle sınırlar."""
+    left = remaining()
+    if left is None:
+        return timeout
+    return left if timeout is None else min(timeout, left)
+
+
+def check_deadline() -> None:
+    if remaining() == 0.0:
+        raise DeadlineExceeded()
+
+
+async def run_with_deadline(awaitable: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """
+    Kalan bütçe içinde bitmeyen çağrıyı keser ve DeadlineExceeded fırlatır.
+    Threadpool'daki iş (ör. ONNX) durdurulamaz ama istek onu beklemez.
+    """
+    limit = cap_timeout(timeout)
+    if limit is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, timeout=limit)
+    except asyncio.TimeoutError:
+        if remaining() == 0.0:
+            raise DeadlineExceeded()
+        raise
+
+
+class DeadlineMiddleware:
+    """
+    Saf ASGI middleware: bütçeyi ContextVar'a ve pymongo.timeout()'a koyar; bütçe
+    dolduğunda (veya bağımlılık zaman aşımı fırlatırsa) yanıt başlamadıysa 504 döner.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        budget = budget_for(scope["path"])
+        requested = next((value for name, value in scope["headers"] if name == TIMEOUT_HEADER), None)
+        if requested is not None:
+            try:
+                requested_seconds = float(requested)
+                if requested_seconds > 0:
+                    budget = requested_seconds if budget is None else min(budget, requested_seconds)
+            except ValueError:
+                pass
+        if budget is None:
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        token = request_deadline_var.set(time.monotonic() + budget)
+        try:
+            with pymongo.timeout(budget):
+                await asyncio.wait_for(self.app(scope, receive, send_wrapper), timeout=budget)
+        except (asyncio.TimeoutError, PyMongoError) as e:
+            if isinstance(e, PyMongoError) and not e.timeout:
+                raise
+            print(f"İstek bütçesi aşıldı ({budget:.1f} sn): {scope['method']} {scope['path']}")
+            if response_started:
+                return
+            body = json.dumps({"detail": TIMEOUT_DETAIL}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": status.HTTP_504_GATEWAY_TIMEOUT,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+            })
+            await send({"type": "http.response.body", "body": body})
+        finally:
+            request_deadline_var.reset(token)
@@ -0,0 +1,143 @@
+import time
+import warnings
+from typing import List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.metrics import EMBEDDING_LATENCY, EMBEDDING_BATCH_SIZE
+
+# --- MODEL YÜKLEME (Lightweight / Hafif Versiyon) ---
+# PyTorch yerine ONNX tabanlı FastEmbed kullanıyoruz.
+# Model EMBEDDING_CACHE_DIR'e indirilir; container imajına önceden konup
+# EMBEDDING_LOCAL_FILES_ONLY=true ile açılışta indirme tamamen kapatılabilir.
+
+# Suppress FastEmbed UserWarning about pooling method
+warnings.filterwarnings("ignore", message=".*uses mean pooling instead of CLS embedding.*")
+
+# Seçilebilir embedding modelleri (Settings.EMBEDDING_MODEL). Filmlerde vektörle
+# birlikte `embedding_model` anahtarı saklanır; model değişince eski vektörler yeniden üretilir.
+EMBEDDING_MODELS = {
+    "minilm-l12": {
+        "model_name": "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+        "dim": 384,
+        "description": "Çok dilli MiniLM (varsayılan, ~220 MB)",
+    },
+    "minilm-l12-q8": {
+        # FastEmbed listesinde yok; HF'deki int8 ONNX dosyası özel model olarak kaydedilir
+        "model_name": "Xenova/paraphrase-multilingual-MiniLM-L12-v2",
+        "model_file": "onnx/model_quantized.onnx",
+        "dim": 384,
+        "description": "Aynı MiniLM, int8 quantize (~120 MB, CPU'da daha hızlı)",
+    },
+    "mpnet-base": {
+        "model_name": "sentence-transformers/paraphrase-multilingual-mpnet-base-v2",
+        "dim": 768,
+        "description": "Çok dilli MPNet (daha isabetli, ~1 GB, daha yavaş)",
+    },
+}
+# `embedding_model` alanı eklenmeden önce üretilmiş vektörlerin modeli
+LEGACY_EMBEDDING_MODEL = "minilm-l12"
+
+_embedding_model = None
+
+
+def current_embedding_model() -> str:
+    if settings.EMBEDDING_MODEL not in EMBEDDING_MODELS:
+        raise ValueError(
+            f"Bilinmeyen EMBEDDING_MODEL: {settings.EMBEDDING_MODEL}. Seçenekler: {', '.join(EMBEDDING_MODELS)}"
+        )
+    return settings.EMBEDDING_MODEL
+
+
+def load_embedding_model(key: str, threads: Optional[int] = None):
+    """Registry'deki modeli FastEmbed ile yükler (benchmark birden fazla modeli yan yana yükler)."""
+    from fastembed import TextEmbedding
+
+    spec = EMBEDDING_MODELS[key]
+    if "model_file" in spec and spec["model_name"] not in {m["model"] for m in TextEmbedding.list_supported_models()}:
+        from fastembed.common.model_description import ModelSource, PoolingType
+
+        TextEmbedding.add_custom_model(
+            model=spec["model_name"],
+            pooling=PoolingType.MEAN,
+            normalization=True,
+            sources=ModelSource(hf=spec["model_name"]),
+            dim=spec["dim"],
+            model_file=spec["model_file"],
+        )
+
+    options = {}
+    if settings.EMBEDDING_LOCAL_FILES_ONLY:
+        options["local_files_only"] = True
+    return TextEmbedding(
+        model_name=spec["model_name"],
+        cache_dir=settings.EMBEDDING_CACHE_DIR,
+        threads=threads if threads is not None else settings.EMBEDDING_THREADS,
+        **options,
+    )
+
+
+def get_embedding_model():
+    """Modeli ilk kullanımda yükler; uygulama açılışında lifespan içinde ısıtılır."""
+    global _embedding_model
+    if _embedding_model is None:
+        _embedding_model = load_embedding_model(current_embedding_model())
+    return _embedding_model
+
+
+def generate_embeddings(texts: List[str], batch_size: int = 256, model=None) -> List[List[float]]:
+    """
+    Birden fazla metni en fazla `batch_size`'lık ONNX çağrılarıyla vektöre çevirir.
+    Tek batch'e sığmayan büyük işlerde EMBEDDING_PARALLEL kadar alt süreç kullanılır.
+    """
+    if not texts:
+        return []
+
+    parallel = settings.EMBEDDING_PARALLEL if len(texts) > batch_size else None
+    start = time.perf_counter()
+    vectors = [
+        vector.tolist()
+        for vector in (model or get_embedding_model()).embed(texts, batch_size=min(batch_size, len(texts)), parallel=parallel)
+    ]
+    EMBEDDING_LATENCY.observe(time.perf_counter() - start)
+    EMBEDDING_BATCH_SIZE.observe(len(texts))
+    return vectors
+
+
+def generate_embedding(text: str) -> List[float]:
+    """
+    Verilen metni vektöre çevirir.
+    FastEmbed generator döndürdüğü için listeye çevirip ilk elemanı alıyoruz.
+    """
+    if not text:
+        return []
+
+    return generate_embeddings([text])[0]
+
+
+def movie_embedding_text(movie: dict) -> str:
+    """Bir filmin embed edilecek metni: başlık, yönetmen, türler ve açıklama."""
+    genre = " ".join(movie.get("genre") or [])
+    return f"{movie.get('title', '')} {movie.get('director', '')} {genre} {movie.get('description') or ''}"
+
+
+def cosine_scores(query_vector, doc_vecs: np.ndarray) -> np.ndarray:
+    """
+    Sorgu vektörü ile doküman matrisinin satırları arasındaki kosinüs benzerliği.
+    Sıfır normlu satırların skoru 0 kalır.
+    """
+    query_vec = np.asarray(query_vector, dtype=doc_vecs.dtype)
+
+    # Cosine Similarity: (A . B) / (|A| * |B|)
+    norm_query = np.linalg.norm(query_vec)
+    norm_docs = np.linalg.norm(doc_vecs, axis=1)
+
+    # Sıfıra bölmeyi engelle
+    valid_indices = norm_docs > 0
+
+    scores = np.zeros(len(doc_vecs), dtype=doc_vecs.dtype)
+    if norm_query == 0:
+        return scores
+    scores[valid_indices] = np.dot(doc_vecs[valid_indices], query_vec) / (norm_docs[valid_indices] * norm_query)
+    return scores
@@ -0,0 +1,85 @@
+"""
+Koleksiyonların NDJSON/CSV olarak akış halinde dışa aktarımı.
+
+Motor cursor'ı `_id` sırasıyla ve büyük batch'lerle okunur; satırlar ~64 KB'lık
+parçalar halinde StreamingResponse'a verilir. Generator sadece istemci önceki
+parçayı aldıkça ilerlediği için (ASGI send geri basıncı) bellek kullanımı
+koleksiyon boyutundan bağımsızdır. Kopan aktarım, alınan son satırın `_id`'si
+`after` parametresine verilerek kaldığı yerden devam ettirilir.
+"""
+import csv
+import io
+from datetime import datetime
+from typing import AsyncIterator, List, Literal, Optional
+
+import orjson
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.responses import dumps_json
+
+ExportFormat = Literal["ndjson", "csv"]
+FLUSH_BYTES = 64 * 1024
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+def resume_filter(after: Optional[str]) -> dict:
+    """`after` checkpoint'inden sonraki dokümanlar; geçersiz id 400."""
+    if not after:
+        return {}
+    try:
+        return {"_id": {"$gt": ObjectId(after)}}
+    except (InvalidId, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Geçersiz 'after' değeri; son alınan satırın _id'si verilmelidir."
+        )
+
+
+def _csv_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return "|".join(str(item) for item in value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+async def _ndjson_chunks(cursor) -> AsyncIterator[bytes]:
+    chunk = bytearray()
+    async for doc in cursor:
+        chunk += dumps_json(doc, orjson.OPT_APPEND_NEWLINE)
+        if len(chunk) >= FLUSH_BYTES:
+            yield bytes(chunk)
+            chunk.clear()
+    if chunk:
+        yield bytes(chunk)
+
+
+async def _csv_chunks(cursor, columns: List[str]) -> AsyncIterator[bytes]:
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(columns)
+    async for doc in cursor:
+        writer.writerow([_csv_value(doc.get(column)) for column in columns])
+        if text.tell() >= FLUSH_BYTES:
+            yield text.getvalue().encode("utf-8")
+            text.seek(0)
+            text.truncate()
+    if text.tell():
+        yield text.getvalue().encode("utf-8")
+
+
+def export_response(collection, query: dict, columns: List[str], fmt: ExportFormat, filename: str) -> StreamingResponse:
+    """`query` ile eşleşen dokümanları `_id` sırasıyla, sadece `columns` alanlarıyla akıtır."""
+    cursor = collection.find(query, {column: 1 for column in columns}).sort("_id", 1).batch_size(settings.EXPORT_BATCH_SIZE)
+    chunks = _csv_chunks(cursor, columns) if fmt == "csv" else _ndjson_chunks(cursor)
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
@@ -0,0 +1,230 @@
+import asyncio
+import json
+import os
+import socket
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from redis.exceptions import RedisError, ResponseError
+
+from app.core.config import settings
+from app.core.metrics import JOB_LATENCY, JOB_QUEUE_LAG, JOB_QUEUE_PENDING, JOB_QUEUE_RETRYING, JOB_RESULTS
+from app.core.redis import get_redis
+
+# --- ARKA PLAN İŞ KUYRUĞU (Redis Streams) ---
+# Yazma endpoint'leri türetilmiş veriyi (ortalama puan, embedding, cache versiyonu...)
+# kendileri hesaplamaz; buraya bir iş bırakıp hemen döner. İşleri consumer group
+# üyesi worker'lar işler. Handler'lar idempotent olmalıdır: aynı iş birden fazla
+# kez çalışabilir (tekrar deneme, sahipsiz kalan işin devralınması).
+
+STREAM_KEY = "jobs:derived"
+GROUP_NAME = "derived-workers"
+RETRY_KEY = "jobs:derived:retry"        # ZSET: skor = tekrar deneme zamanı
+DEAD_LETTER_KEY = "jobs:derived:dead"   # Deneme hakkı biten işler
+DEDUPE_PREFIX = "jobs:key:"
+STREAM_MAXLEN = 100_000
+CLAIM_IDLE_MS = 60_000                  # Bu kadar süre onaylanmayan iş başka worker'a geçer
+HEARTBEAT_SECONDS = CLAIM_IDLE_MS / 1000 / 4  # Çalışan işin sahibi idle süresini bu aralıkla sıfırlar
+MAINTENANCE_INTERVAL = 5.0
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+_handlers: Dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str):
+    """Bir coroutine'i `kind` tipindeki işlerin handler'ı olarak kaydeder."""
+    def decorator(func: JobHandler) -> JobHandler:
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+async def _run_inline(kind: str, payload: Dict[str, Any]) -> None:
+    """Redis yoksa iş senkron çalıştırılır (eski davranış); hata isteği düşürmez."""
+    try:
+        await _handlers[kind](payload)
+        JOB_RESULTS.labels(kind, "inline").inc()
+    except Exception as e:
+        JOB_RESULTS.labels(kind, "failed").inc()
+        print(f"İş (inline) başarısız: {kind} {payload}: {e}")
+
+
+async def enqueue_job(kind: str, payload: Dict[str, Any], key: Optional[str] = None) -> bool:
+    """
+    İşi kuyruğa ekler. `key` verilirse aynı anahtarlı bir iş henüz işlenmeyi
+    beklerken yenisi eklenmez (ör. aynı filme art arda gelen yorumlar tek
+    yeniden hesaplamaya iner). Kuyruğa eklendiyse True döner.
+    """
+    if kind not in _handlers:
+        raise ValueError(f"Kayıtlı olmayan iş tipi: {kind}")
+
+    redis = get_redis()
+    if not redis:
+        await _run_inline(kind, payload)
+        return False
+
+    try:
+        if key and not await redis.set(f"{DEDUPE_PREFIX}{key}", "1", nx=True, ex=settings.JOB_DEDUPE_TTL_SECONDS):
+            return False
+        await redis.xadd(
+            STREAM_KEY,
+            {
+                "kind": kind,
+                "payload": json.dumps(payload),
+                "key": key or "",
+                "attempts": "0",
+                "enqueued_at": str(time.time()),
+            },
+            maxlen=STREAM_MAXLEN,
+            approximate=True,
+        )
+        return True
+    except RedisError as e:
+        print(f"İş kuyruğa eklenemedi ({e}); inline çalıştırılıyor.")
+        await _run_inline(kind, payload)
+        return False
+
+
+# --- WORKER ---
+async def _ensure_group(redis) -> None:
+    try:
+        await redis.xgroup_create(STREAM_KEY, GROUP_NAME, id="0", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+async def _schedule_retry(redis, fields: Dict[str, str], error: Exception) -> None:
+    attempts = int(fields.get("attempts", "0")) + 1
+    kind = fields["kind"]
+    fields = {**fields, "attempts": str(attempts), "last_error": str(error)[:500]}
+
+    if attempts >= settings.JOB_MAX_ATTEMPTS:
+        await redis.xadd(DEAD_LETTER_KEY, fields, maxlen=STREAM_MAXLEN, approximate=True)
+        JOB_RESULTS.labels(kind, "dead").inc()
+        print(f"İş deneme hakkını bitirdi, dead-letter'a taşındı: {kind}: {error}")
+        return
+
+    delay = settings.JOB_RETRY_BASE_SECONDS * (2 ** (attempts - 1))
+    await redis.zadd(RETRY_KEY, {json.dumps(fields): time.time() + delay})
+    JOB_RESULTS.labels(kind, "retry").inc()
+
+
+async def _heartbeat(redis, consumer: str, entry_id: str) -> None:
+    """
+    Uzun süren iş (rebuild_similar, reembed_movies...) CLAIM_IDLE_MS'i aşsa da
+    çökmüş worker'ın işi gibi görünmesin: sahibi kendi kaydını JUSTID XCLAIM ile
+    periyodik olarak yeniden sahiplenir, idle süresi sıfırlanır ve XAUTOCLAIM almaz.
+    """
+    while True:
+        await asyncio.sleep(HEARTBEAT_SECONDS)
+        try:
+            await redis.xclaim(STREAM_KEY, GROUP_NAME, consumer, min_idle_time=0, message_ids=[entry_id], justid=True)
+        except RedisError as e:
+            print(f"İş heartbeat'i yazılamadı ({entry_id}): {e}")
+
+
+async def _process(redis, consumer: str, entry_id: str, fields: Dict[str, str]) -> None:
+    kind = fields.get("kind", "")
+    handler = _handlers.get(kind)
+    heartbeat = asyncio.create_task(_heartbeat(redis, consumer, entry_id))
+    try:
+        if handler is None:
+            raise ValueError(f"Kayıtlı olmayan iş tipi: {kind}")
+        # Anahtar iş başlamadan serbest bırakılır: çalışma sırasında gelen yeni
+        # yazmalar yeni bir iş ekleyebilsin, güncel veri kaybolmasın.
+        if fields.get("key"):
+            await redis.delete(f"{DEDUPE_PREFIX}{fields['key']}")
+        await handler(json.loads(fields.get("payload") or "{}"))
+        JOB_RESULTS.labels(kind, "ok").inc()
+        JOB_LATENCY.labels(kind).observe(max(0.0, time.time() - float(fields.get("enqueued_at", time.time()))))
+    except Exception as e:
+        await _schedule_retry(redis, fields, e)
+    finally:
+        heartbeat.cancel()
+        await redis.xack(STREAM_KEY, GROUP_NAME, entry_id)
+
+
+async def _promote_due_retries(redis) -> None:
+    """Zamanı gelen tekrar denemeleri ana stream'e geri taşır."""
+    due = await redis.zrangebyscore(RETRY_KEY, 0, time.time(), start=0, num=100)
+    for raw in due:
+        # Birden fazla worker aynı işi görebilir; ZREM'i kazanan taşır
+        if await redis.zrem(RETRY_KEY, raw):
+            fields = json.loads(raw)
+            fields["enqueued_at"] = str(time.time())
+            await redis.xadd(STREAM_KEY, fields, maxlen=STREAM_MAXLEN, approximate=True)
+
+
+async def _update_queue_metrics(redis) -> None:
+    for group in await redis.xinfo_groups(STREAM_KEY):
+        if group.get("name") == GROUP_NAME:
+            JOB_QUEUE_LAG.set(group.get("lag") or 0)
+            JOB_QUEUE_PENDING.set(group.get("pending") or 0)
+    JOB_QUEUE_RETRYING.set(await redis.zcard(RETRY_KEY))
+
+
+async def _worker_loop(consumer: str, stop: asyncio.Event) -> None:
+    redis = get_redis()
+    last_maintenance = 0.0
+
+    while not stop.is_set():
+        try:
+            entries: List = []
+            if time.monotonic() - last_maintenance > MAINTENANCE_INTERVAL:
+                last_maintenance = time.monotonic()
+                await _promote_due_retries(redis)
+                await _update_queue_metrics(redis)
+                # Çöken bir worker'ın onaylamadığı işleri devral (çalışan işler heartbeat ile taze kalır)
+                claimed = await redis.xautoclaim(STREAM_KEY, GROUP_NAME, consumer, min_idle_time=CLAIM_IDLE_MS, count=10)
+                entries.extend(claimed[1])
+
+            response = await redis.xreadgroup(GROUP_NAME, consumer, {STREAM_KEY: ">"}, count=10, block=1000)
+            for _stream, stream_entries in response or []:
+                entries.extend(stream_entries)
+
+            for entry_id, fields in entries:
+                if fields:
+                    await _process(redis, consumer, entry_id, fields)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"İş worker'ı hatası ({consumer}): {e}")
+            await asyncio.sleep(1)
+
+
+class JobWorkers:
+    """Aynı süreçte çalışan worker coroutine'lerini başlatır/durdurur."""
+
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self._stop = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> bool:
+        redis = get_redis()
+        if not redis:
+            return False
+        try:
+            await _ensure_group(redis)
+        except RedisError as e:
+            print(f"İş kuyruğu başlatılamadı: {e}")
+            return False
+
+        prefix = f"{socket.gethostname()}-{os.getpid()}"
+        self._tasks = [
+            asyncio.create_task(_worker_loop(f"{prefix}-{i}", self._stop))
+            for i in range(self.concurrency)
+        ]
+        print(f"{self.concurrency} arka plan iş worker'ı başlatıldı.")
+        return True
+
+    async def stop(self) -> None:
+        self._stop.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def wait(self) -> None:
+        await asyncio.gather(*self._tasks, return_exceptions=True)
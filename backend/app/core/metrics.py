@@ -0,0 +1,180 @@
+import time
+
+from fastapi import Response
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+from pymongo import monitoring
+
+# --- METRİK TANIMLARI ---
+# Tüm Prometheus metrikleri burada tanımlanır; diğer modüller sadece import edip gözlem ekler.
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP istek süresi (route şablonu bazında)",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Şu anda işlenmekte olan HTTP istekleri",
+    ["method"],
+)
+
+MONGO_COMMAND_LATENCY = Histogram(
+    "mongo_command_duration_seconds",
+    "MongoDB komut süresi",
+    ["command", "status"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+REDIS_COMMAND_LATENCY = Histogram(
+    "redis_command_duration_seconds",
+    "Redis komut süresi",
+    ["command", "status"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1),
+)
+
+EMBEDDING_LATENCY = Histogram(
+    "embedding_inference_duration_seconds",
+    "ONNX embedding çıkarım süresi (batch başına)",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+EMBEDDING_BATCH_SIZE = Histogram(
+    "embedding_batch_size",
+    "Tek çağrıda embed edilen metin sayısı",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512),
+)
+
+LLM_LATENCY = Histogram(
+    "llm_call_duration_seconds",
+    "Tek bir LLM çağrısının süresi",
+    ["model", "status"],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60),
+)
+LLM_PROVIDER_LATENCY = Histogram(
+    "llm_provider_call_duration_seconds",
+    "LLM router'ın bir sağlayıcıya yaptığı tek denemenin süresi (hedge/failover denemeleri ayrı)",
+    ["provider", "status"],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60),
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "LLM çağrılarında harcanan token sayısı",
+    ["model", "kind"],
+)
+AGENT_CHAT_LATENCY = Histogram(
+    "agent_chat_duration_seconds",
+    "AgentService.chat uçtan uca süresi",
+    ["status"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120),
+)
+AGENT_ADMISSION = Counter(
+    "agent_admission_total",
+    "Sohbet isteklerinin kabul kontrolü sonucu",
+    ["result"],
+)
+
+# Hit oranı PromQL ile hesaplanır:
+#   sum(rate(cache_requests_total{result="hit"}[5m])) / sum(rate(cache_requests_total[5m]))
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Önbellek sorguları (hit/miss)",
+    ["cache", "result"],
+)
+
+RESPONSE_BODY_BYTES = Histogram(
+    "http_response_body_bytes",
+    "Yanıt gövdesi boyutu; stage=original sıkıştırma öncesi, stage=sent istemciye giden",
+    ["encoding", "stage"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+COMPRESSION_CPU = Histogram(
+    "http_compression_cpu_seconds",
+    "Yanıt başına sıkıştırmanın eklediği CPU süresi",
+    ["encoding"],
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+
+JOB_RESULTS = Counter(
+    "background_jobs_total",
+    "İşlenen arka plan işleri",
+    ["kind", "status"],
+)
+JOB_LATENCY = Histogram(
+    "background_job_latency_seconds",
+    "İşin kuyruğa girişinden tamamlanmasına kadar geçen süre",
+    ["kind"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+JOB_QUEUE_LAG = Gauge(
+    "background_job_queue_lag",
+    "Consumer group'un henüz okumadığı iş sayısı",
+)
+JOB_QUEUE_PENDING = Gauge(
+    "background_job_queue_pending",
+    "Okunmuş ama henüz onaylanmamış (XACK) iş sayısı",
+)
+JOB_QUEUE_RETRYING = Gauge(
+    "background_job_queue_retrying",
+    "Tekrar denenmeyi bekleyen iş sayısı",
+)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def metrics_response() -> Response:
+    """/metrics endpoint'i için Prometheus text formatında çıktı üretir."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+# --- MONGO KOMUT DİNLEYİCİSİ ---
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    PyMongo'nun komut olaylarını dinleyerek her Mongo çağrısının süresini kaydeder.
+    Motor istemcisine `event_listeners=[...]` ile verilir.
+    """
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        MONGO_COMMAND_LATENCY.labels(event.command_name, "ok").observe(event.duration_micros / 1e6)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        MONGO_COMMAND_LATENCY.labels(event.command_name, "error").observe(event.duration_micros / 1e6)
+
+
+# --- HTTP MIDDLEWARE ---
+class MetricsMiddleware:
+    """
+    Saf ASGI middleware: istek süresini route şablonuna göre (ör. /api/movies/{id}) ölçer.
+    Route şablonu, router eşleşmeden sonra scope["route"] içine yazıldığı için
+    süre istek bittikten sonra etiketlenir. Eşleşmeyen path'ler tek bir etikette toplanır.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            REQUEST_LATENCY.labels(method, route_path, str(status_code)).observe(time.perf_counter() - start)
+            in_progress.dec()
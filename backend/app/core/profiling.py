@@ -0,0 +1,168 @@
+"""
+Admin'ler için istek bazında profil çıkarma.
+
+İstek `X-Profile: sample` (veya `cprofile`) başlığı ve admin kullanıcının Bearer
+token'ı ile gelirse o tek istek profillenir; rapor bellekteki sınırlı bir halka
+tamponuna (PROFILE_BUFFER_SIZE) yazılır ve id'si `X-Profile-Id` yanıt başlığıyla
+döner. Raporlar /api/admin/profiles altından okunur.
+
+- sample:   PROFILE_SAMPLE_INTERVAL_MS'de bir tüm thread'lerin yığını örneklenir
+            (threadpool'daki bcrypt/ONNX dahil). Çıktı "collapsed stacks"
+            formatındadır; flamegraph.pl veya speedscope ile açılabilir.
+- cprofile: Sadece event loop thread'i, deterministik; pstats metni (kümülatif süre).
+
+İki mod da süreçteki diğer eşzamanlı isteklerin işini de görür; profil sakin bir
+anda alınmalıdır. Başlığı olmayan isteklerde tek maliyet başlık listesinde bir aramadır.
+"""
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from datetime import datetime
+from typing import Deque, List, Optional
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_MODES = ("sample", "cprofile")
+
+# En yeni sonda; dolunca en eski rapor düşer
+profile_reports: Deque[dict] = deque(maxlen=settings.PROFILE_BUFFER_SIZE)
+_active = threading.Lock()  # Aynı anda tek profil (cProfile iç içe çalışamaz)
+
+
+class StackSampler:
+    """Ayrı bir thread'de sys._current_frames() ile periyodik yığın örneklemesi."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                frames.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(frames))] += 1
+            self.samples += 1
+
+    def stop(self) -> str:
+        self._stop.set()
+        self._thread.join()
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+def _cprofile_report(profiler: cProfile.Profile) -> str:
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(80)
+    return out.getvalue()
+
+
+async def _is_admin(scope) -> bool:
+    """Bearer token'ı get_current_user ile doğrular; hata durumunda sessizce False."""
+    from app.core.database import get_database
+    from app.services.auth.utils import get_current_user
+
+    authorization = dict(scope["headers"]).get(b"authorization", b"").decode("latin-1")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        user = await get_current_user(db=await get_database(), token=token)
+    except HTTPException:
+        return False
+    return user.get("role") == "admin" and user.get("is_active", True)
+
+
+def list_reports() -> List[dict]:
+    return [{k: v for k, v in report.items() if k != "report"} for report in reversed(profile_reports)]
+
+
+def get_report(profile_id: str) -> Optional[dict]:
+    return next((report for report in profile_reports if report["id"] == profile_id), None)
+
+
+class ProfilingMiddleware:
+    """Saf ASGI middleware; başlıksız istekler doğrudan uygulamaya geçer."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.PROFILING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        mode = next((value for name, value in scope["headers"] if name == PROFILE_HEADER), None)
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        mode = mode.decode("latin-1").strip().lower() or "sample"
+        if mode not in PROFILE_MODES or not await _is_admin(scope) or not _active.acquire(blocking=False):
+            # Yetkisiz, bilinmeyen mod veya başka profil sürüyor: istek normal işlenir
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex[:12]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        started = time.perf_counter()
+        report = report_format = None
+        try:
+            if mode == "cprofile":
+                profiler = cProfile.Profile()
+                profiler.enable()
+                try:
+                    await self.app(scope, receive, send_wrapper)
+                finally:
+                    profiler.disable()
+                    report, report_format = _cprofile_report(profiler), "pstats"
+            else:
+                sampler = StackSampler(settings.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+                sampler.start()
+                try:
+                    await self.app(scope, receive, send_wrapper)
+                finally:
+                    report, report_format = sampler.stop(), "collapsed"
+        finally:
+            _active.release()
+            # Hata ile biten istek de saklanır; yavaş ve patlayan istek en çok merak edilendir
+            profile_reports.append({
+                "id": profile_id,
+                "created_at": datetime.utcnow(),
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                "duration_ms": round((time.perf_counter() - started) * 1e3, 2),
+                "mode": mode,
+                "format": report_format,
+                "report": report or "",
+            })
@@ -1,11 +1,47 @@
+import asyncio
+import time
 import redis.asyncio as redis
 from app.core.config import settings
+from app.core.deadline import DeadlineExceeded, remaining
+from app.core.metrics import REDIS_COMMAND_LATENCY
+
+
+class InstrumentedRedis(redis.Redis):
+    """
+    Her Redis komutunun süresini Prometheus'a yazan istemci.
+    İstek içindeyse komut, isteğin kalan zaman bütçesiyle sınırlanır.
+    """
+
+    async def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        status = "ok"
+        budget = remaining()
+        try:
+            if budget is None:
+                return await super().execute_command(*args, **options)
+            return await asyncio.wait_for(super().execute_command(*args, **options), timeout=budget)
+        except asyncio.TimeoutError:
+            status = "timeout"
+            raise DeadlineExceeded()
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            REDIS_COMMAND_LATENCY.labels(str(args[0]).upper(), status).observe(time.perf_counter() - start)
+
 
 redis_client: redis.Redis | None = None
 
 async def connect_to_redis():
     global redis_client
-    redis_client = redis.from_url(settings.REDIS_URL, encoding="utf-8", decode_responses=True)
+    redis_client = InstrumentedRedis.from_url(
+        settings.REDIS_URL,
+        encoding="utf-8",
+        decode_responses=True,
+        # Tek bir komut (pipeline dahil) sonsuza kadar asılı kalamaz; worker'ların XREADGROUP block süresinden uzun
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+    )
     try:
         await redis_client.ping()
         print("Redis bağlantısı başarılı.")
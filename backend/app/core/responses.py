@@ -0,0 +1,34 @@
+from typing import Any
+
+import orjson
+from bson import ObjectId
+from fastapi import Response
+
+from app.core.config import settings
+
+
+def _default(obj: Any):
+    # orjson datetime/list/dict'i kendisi yazar; Mongo'ya özgü tek tip ObjectId
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"JSON'a çevrilemeyen tip: {type(obj).__name__}")
+
+
+def dumps_json(content: Any, option: int = 0) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS | option)
+
+
+class FastJSONResponse(Response):
+    """
+    orjson ile serileştirilen yanıt. Handler bu sınıfı döndürdüğünde FastAPI
+    response_model doğrulamasını atlar; içerik şeklini projeksiyon garanti etmelidir.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
+
+
+def fast_json_enabled() -> bool:
+    return settings.FAST_JSON_RESPONSES
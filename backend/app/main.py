@@ -1,20 +1,59 @@
+import asyncio
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.core.config import settings
-from app.core.database import connect_to_mongo, close_mongo_connection
+from app.core.database import connect_to_mongo, close_mongo_connection, ensure_indexes, get_database
 from app.services.movies.routes import router as movies_router
 from app.services.auth.routes import router as auth_router
 from app.services.reviews.routes import router as reviews_router
+from app.services.reviews.jobs import backfill_rating_counters
 from app.services.agent.router import router as agent_router
+from app.services.leaderboards.routes import router as leaderboards_router
+from app.services.leaderboards.jobs import ensure_leaderboards
+from app.services.profiling.routes import router as profiling_router
 from app.core.redis import connect_to_redis, close_redis_connection
+from app.core.metrics import MetricsMiddleware, metrics_response
+from app.core.compression import CompressionMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.deadline import DeadlineMiddleware
+from app.core.embeddings import get_embedding_model
+from app.core.jobs import JobWorkers
+from app.services.movies.vector_index import vector_index
+from app.services.movies import autocomplete
+from app.services.movies.jobs import ensure_current_embeddings, schedule_facet_reconciliation
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     
     await connect_to_mongo()
     await connect_to_redis()
+    database = await get_database()
+    await ensure_indexes(database)
+    await backfill_rating_counters(database)
+    # Redis'te liderlik tabloları yoksa Mongo'dan kurulsun (facet uzlaştırması gibi kuyruk işi)
+    await ensure_leaderboards()
+    # Vektör indeksi yüklenmeden önce: eski vektörleri etiketle, model değiştiyse yeniden embed et
+    reembed_task = await ensure_current_embeddings(database)
+    # Embedding modelini ilk istekten önce yükle
+    await run_in_threadpool(get_embedding_model)
+    # Bellek içi indeksler arka planda yüklenir; açılışı bekletmez
+    background_tasks = [
+        asyncio.create_task(vector_index.sync(database)),
+        asyncio.create_task(autocomplete.keep_fresh(database)),
+        asyncio.create_task(schedule_facet_reconciliation()),
+    ]
+    if reembed_task is not None:
+        background_tasks.append(reembed_task)
+    # Türetilmiş veri işleri (ortalama puan, embedding, cache) için worker'lar
+    job_workers = JobWorkers(settings.JOB_WORKER_CONCURRENCY)
+    if settings.JOB_WORKERS_IN_APP:
+        await job_workers.start()
     yield
+    for task in background_tasks:
+        task.cancel()
+    await job_workers.stop()
     await close_redis_connection()
     await close_mongo_connection()
     
@@ -31,14 +70,27 @@ origins = [
 
 
 
+# İstek zaman bütçesi: Mongo/Redis/embedding/LLM çağrıları kalan süreyi buradan okur
+app.add_middleware(DeadlineMiddleware)
+
+# Sadece uygulamanın kendisini profiller (X-Profile başlığı yoksa dokunmaz)
+app.add_middleware(ProfilingMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins, # Hangi adreslerden istek gelebilir?
     allow_credentials=True,
     allow_methods=["*"],   # GET, POST, PUT, DELETE... hepsine izin ver
     allow_headers=["*"],   # Tüm başlıklara izin ver
+    expose_headers=["X-Total-Count", "Retry-After"],  # Tarayıcı JS'i safelist dışı yanıt başlıklarını ancak böyle okur
 )
 
+# Sıkıştırma CORS'un dışında; böylece CORS başlıkları eklenmiş son yanıt sıkıştırılır
+app.add_middleware(CompressionMiddleware)
+
+# En dışta durmalı ki CORS dahil tüm isteklerin süresini ölçsün
+app.add_middleware(MetricsMiddleware)
+
 
 
 
@@ -47,6 +99,14 @@ app.include_router(reviews_router, prefix="/api/reviews", tags=["Reviews"])
 app.include_router(movies_router, prefix="/api/movies", tags=["Movies"])
 app.include_router(auth_router, prefix="/api/auth", tags=["Auth"])
 app.include_router(agent_router, prefix="/api/agent", tags=["Agent"])
+app.include_router(leaderboards_router, prefix="/api/leaderboards", tags=["Leaderboards"])
+app.include_router(profiling_router, prefix="/api/admin/profiles", tags=["Admin"])
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint'i."""
+    return metrics_response()
 
 # if __name__ == "__main__":
 #     import uvicorn
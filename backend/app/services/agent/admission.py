@@ -0,0 +1,126 @@
+"""
+/api/agent/chat için kabul kontrolü.
+
+1) Hız sınırı: Redis'te kullanıcı başına ve global iki token bucket. İkisi tek
+   Lua script'iyle atomik olarak kontrol edilir; biri boşsa hiçbirinden token
+   düşülmez ve 429 + Retry-After döner.
+2) Eşzamanlılık: süreç başına en fazla AGENT_MAX_CONCURRENT ajan çalışır.
+   Slot AGENT_QUEUE_TIMEOUT_SECONDS içinde boşalmazsa 503 + Retry-After döner.
+
+Redis erişilemezse hız sınırı atlanır (fail-open); eşzamanlılık sınırı yine geçerlidir.
+"""
+import asyncio
+import math
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException, status
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.metrics import AGENT_ADMISSION
+from app.core.redis import get_redis
+
+USER_BUCKET_PREFIX = "agent:rl:user:"
+GLOBAL_BUCKET_KEY = "agent:rl:global"
+
+# KEYS: kullanıcı ve global bucket. ARGV: her biri için (dakikalık hız, kapasite).
+# Dönüş: {izin (1/0), bekleme ms, reddeden bucket indeksi}
+TOKEN_BUCKET_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local tokens = {}
+local wait_ms, denied_by = 0, 0
+
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i * 2 - 1]) / 60000
+    local capacity = tonumber(ARGV[i * 2])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local current = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    current = math.min(capacity, current + (now - ts) * rate)
+    tokens[i] = current
+    if current < 1 then
+        local needed = math.ceil((1 - current) / rate)
+        if needed > wait_ms then
+            wait_ms, denied_by = needed, i
+        end
+    end
+end
+
+local allowed = denied_by == 0 and 1 or 0
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i * 2 - 1]) / 60000
+    local capacity = tonumber(ARGV[i * 2])
+    redis.call('HSET', key, 'tokens', tokens[i] - allowed, 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate) + 1000)
+end
+return {allowed, wait_ms, denied_by}
+"""
+
+_script = None
+_semaphore: asyncio.Semaphore | None = None
+
+
+def _too_many(detail: str, retry_after: float, code: int = status.HTTP_429_TOO_MANY_REQUESTS) -> HTTPException:
+    return HTTPException(
+        status_code=code,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+async def check_rate_limit(user_id: str) -> None:
+    """Kullanıcı ve global bucket'tan birer token düşer; yoksa 429 fırlatır."""
+    global _script
+    redis = get_redis()
+    if not redis:
+        return
+    if _script is None:
+        _script = redis.register_script(TOKEN_BUCKET_SCRIPT)
+
+    try:
+        allowed, wait_ms, denied_by = await _script(
+            keys=[f"{USER_BUCKET_PREFIX}{user_id}", GLOBAL_BUCKET_KEY],
+            args=[
+                settings.AGENT_USER_RATE_PER_MINUTE, settings.AGENT_USER_BURST,
+                settings.AGENT_GLOBAL_RATE_PER_MINUTE, settings.AGENT_GLOBAL_BURST,
+            ],
+        )
+    except RedisError as e:
+        print(f"Ajan hız sınırı kontrol edilemedi, istek kabul ediliyor: {e}")
+        return
+
+    if not allowed:
+        scope = "user" if int(denied_by) == 1 else "global"
+        AGENT_ADMISSION.labels(f"rate_limited_{scope}").inc()
+        if scope == "user":
+            raise _too_many("Çok fazla sohbet isteği gönderdiniz. Lütfen biraz bekleyin.", int(wait_ms) / 1000)
+        raise _too_many("Asistan şu anda yoğun. Lütfen biraz sonra tekrar deneyin.", int(wait_ms) / 1000)
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(settings.AGENT_MAX_CONCURRENT)
+    return _semaphore
+
+
+@asynccontextmanager
+async def agent_slot():
+    """Eşzamanlı ajan sayısını sınırlar; kuyrukta zaman aşımında 503 fırlatır."""
+    semaphore = _get_semaphore()
+    try:
+        await asyncio.wait_for(semaphore.acquire(), timeout=settings.AGENT_QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        AGENT_ADMISSION.labels("queue_timeout").inc()
+        raise _too_many(
+            "Asistan şu anda yoğun. Lütfen biraz sonra tekrar deneyin.",
+            settings.AGENT_QUEUE_TIMEOUT_SECONDS,
+            code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+    AGENT_ADMISSION.labels("admitted").inc()
+    try:
+        yield
+    finally:
+        semaphore.release()
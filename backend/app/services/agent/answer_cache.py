@@ -0,0 +1,65 @@
+"""
+Ajanın nihai cevabı için Redis önbelleği.
+
+"bana hüzünlü bir film öner" gibi tekrar tekrar sorulan sorular tüm ajan döngüsünü
+ve LLM çağrılarını yeniden çalıştırmasın diye cevap saklanır. Anahtar:
+
+    agent_answer:{katalog versiyonu}:{model parmak izi}:{md5(normalize(geçmiş + mesaj))}
+
+- Metin autocomplete ile aynı şekilde normalize edilir (aksansız, küçük harf,
+  noktalama yok); "Hüzünlü bir film öner!" ile "huzunlu bir film oner" aynı anahtardır.
+- Katalog değişince increment_cache_version() versiyonu artırır, eski cevaplar
+  okunmaz ve TTL ile düşer (semantic_search önbelleğiyle aynı mekanizma).
+- Model veya sistem prompt'u değişince parmak izi değişir.
+- Yazma aracı (add_movie) çalıştıran cevaplar saklanmaz; hem yan etkisi vardır
+  hem de kullanıcının rolüne göre değişir.
+"""
+import hashlib
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import record_cache_lookup
+from app.core.redis import get_cache_version, get_redis
+from app.services.movies.autocomplete import normalize
+
+
+def _key_text(user_input: str, chat_history: List[Dict[str, str]]) -> str:
+    turns = [f"{msg['role']}:{normalize(msg['content'])}" for msg in chat_history]
+    turns.append(f"user:{normalize(user_input)}")
+    return "\n".join(turns)
+
+
+async def answer_cache_key(user_input: str, chat_history: List[Dict[str, str]], fingerprint: str) -> Optional[str]:
+    if not settings.AGENT_ANSWER_CACHE_ENABLED or not get_redis():
+        return None
+    if len(chat_history) > settings.AGENT_ANSWER_CACHE_MAX_HISTORY or not normalize(user_input):
+        return None
+    try:
+        version = await get_cache_version()
+    except Exception as e:
+        # Önbellek hatası sohbeti düşürmez
+        print(f"Ajan cevap önbelleği versiyonu okunamadı: {e}")
+        return None
+    digest = hashlib.md5(_key_text(user_input, chat_history).encode()).hexdigest()
+    return f"agent_answer:{version}:{fingerprint}:{digest}"
+
+
+async def get_cached_answer(key: Optional[str]) -> Optional[str]:
+    if key is None:
+        return None
+    try:
+        answer = await get_redis().get(key)
+    except Exception as e:
+        print(f"Ajan cevap önbelleği okunamadı: {e}")
+        return None
+    record_cache_lookup("agent_answer", answer is not None)
+    return answer
+
+
+async def store_answer(key: Optional[str], answer: str) -> None:
+    if key is None or not answer:
+        return
+    try:
+        await get_redis().set(key, answer, ex=settings.AGENT_ANSWER_CACHE_TTL_SECONDS)
+    except Exception as e:
+        print(f"Ajan cevabı önbelleğe yazılamadı: {e}")
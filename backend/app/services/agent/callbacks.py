@@ -0,0 +1,83 @@
+import time
+from typing import Any, Dict, List
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from app.core.metrics import LLM_LATENCY, LLM_TOKENS
+
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """
+    Ajan döngüsündeki her LLM çağrısının süresini ve token kullanımını Prometheus'a yazar.
+    Sadece sayaç güncellediği için event loop içinde (inline) çalıştırılır.
+    """
+
+    run_inline = True
+
+    def __init__(self):
+        self._started: Dict[UUID, tuple[float, str]] = {}
+
+    @staticmethod
+    def _model_name(kwargs: Dict[str, Any]) -> str:
+        params = kwargs.get("invocation_params") or {}
+        return str(params.get("model") or params.get("model_name") or "unknown")
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = (time.perf_counter(), self._model_name(kwargs))
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = (time.perf_counter(), self._model_name(kwargs))
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        start, model = started
+        model = self._provider_name(response) or model
+        LLM_LATENCY.labels(model, "ok").observe(time.perf_counter() - start)
+
+        input_tokens, output_tokens = self._token_usage(response)
+        if input_tokens:
+            LLM_TOKENS.labels(model, "input").inc(input_tokens)
+        if output_tokens:
+            LLM_TOKENS.labels(model, "output").inc(output_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        start, model = started
+        LLM_LATENCY.labels(model, "error").observe(time.perf_counter() - start)
+
+    @staticmethod
+    def _provider_name(response: LLMResult) -> str | None:
+        """LLM router üzerinden gelen yanıtta cevabı veren sağlayıcı ("llm-router" yerine)."""
+        for generations in response.generations:
+            for generation in generations:
+                metadata = getattr(getattr(generation, "message", None), "response_metadata", None) or {}
+                if metadata.get("llm_provider"):
+                    return metadata["llm_provider"]
+        return None
+
+    @staticmethod
+    def _token_usage(response: LLMResult) -> tuple[int, int]:
+        """Önce mesajdaki usage_metadata'ya, yoksa sağlayıcının llm_output'una bakar."""
+        input_tokens = output_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    input_tokens += usage.get("input_tokens", 0)
+                    output_tokens += usage.get("output_tokens", 0)
+
+        if not (input_tokens or output_tokens) and response.llm_output:
+            usage = response.llm_output.get("token_usage") or {}
+            input_tokens = usage.get("prompt_tokens", 0)
+            output_tokens = usage.get("completion_tokens", 0)
+
+        return input_tokens, output_tokens
+
+
+llm_metrics_callback = LLMMetricsCallback()
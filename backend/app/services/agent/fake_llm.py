@@ -0,0 +1,91 @@
+import asyncio
+import random
+import re
+import time
+import zlib
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+YEAR_PATTERN = re.compile(r"\b(18[89]\d|19\d{2}|20\d{2})\b")
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Yük testi ve yerel geliştirme için deterministik sahte sohbet modeli.
+    Groq/OpenRouter yerine AgentService'e enjekte edilir; ağ çağrısı yapmaz.
+
+    Davranış:
+    - Son mesaj bir araç çıktısı değilse bir araç çağrısı üretir
+      (mesajda yıl geçiyorsa `search_movies_by_filter`, yoksa `semantic_search_movies`).
+    - Son mesaj araç çıktısıysa sabit kalıpla bir cevap döner.
+    - `latency` saniye kadar bekleyerek gerçek sağlayıcı gecikmesini taklit eder.
+    - `failure_rate` olasılıkla (bekledikten sonra) hata fırlatır; LLM router'ın
+      failover davranışı yerelde bu şekilde denenir.
+    """
+
+    latency: float = 0.0
+    failure_rate: float = 0.0
+    model_name: str = "fake-chat"
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model_name": self.model_name, "latency": self.latency, "failure_rate": self.failure_rate}
+
+    def _get_invocation_params(self, stop: Optional[List[str]] = None, **kwargs: Any) -> dict:
+        params = super()._get_invocation_params(stop=stop, **kwargs)
+        params["model"] = self.model_name
+        return params
+
+    def bind_tools(self, tools: Any, **kwargs: Any):
+        # Araç şemalarına ihtiyacımız yok; çağrılacak araç adları sabit.
+        return self
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        last = messages[-1] if messages else None
+
+        if isinstance(last, ToolMessage):
+            return AIMessage(
+                content=f"Veritabanında bulduklarım şunlar: {str(last.content)[:300]}",
+                usage_metadata={"input_tokens": 64, "output_tokens": 32, "total_tokens": 96},
+            )
+
+        user_input = ""
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage):
+                user_input = str(message.content)
+                break
+
+        if (match := YEAR_PATTERN.search(user_input)):
+            tool_call = {"name": "search_movies_by_filter", "args": {"year": int(match.group(1)), "limit": 5}}
+        else:
+            tool_call = {"name": "semantic_search_movies", "args": {"user_query": user_input, "limit": 5}}
+
+        tool_call["id"] = f"call_{zlib.crc32(user_input.encode()):08x}"
+        return AIMessage(
+            content="",
+            tool_calls=[tool_call],
+            usage_metadata={"input_tokens": 128, "output_tokens": 16, "total_tokens": 144},
+        )
+
+    def _maybe_fail(self) -> None:
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise RuntimeError(f"{self.model_name}: simüle edilmiş sağlayıcı hatası")
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        self._maybe_fail()
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self._maybe_fail()
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
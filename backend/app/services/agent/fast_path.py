@@ -0,0 +1,229 @@
+"""
+Ajan için LLM'siz hızlı yol.
+
+"Nolan'ın 2010 yapımı filmi", "korku filmleri 2019", "Inception hakkında bilgi"
+gibi saf filtre / detay sorguları yerel olarak çözülür:
+
+- Yıl: 4 haneli sayı.
+- Yönetmen ve tür: katalogdan (movie_facets sayaçları) kurulan sözlükler;
+  yönetmen tam adı veya katalogda tekil olan soyadıyla, tür İngilizce adı veya
+  Türkçe karşılığıyla ("korku" -> Horror) tanınır.
+- Detay: "hakkında / bilgi / konusu" gibi bir kelime ve geri kalanı birebir film adı
+  (otomatik tamamlama indeksinden).
+
+Tanınan varlıklar ve dolgu kelimeleri çıkarıldıktan sonra cümlede başka kelime
+kalmıyorsa sorgu araçlarla doğrudan çalıştırılır ve cevap şablondan üretilir.
+Kalan her kelime ("hüzünlü", "peki", "benzer"...) açık uçlu kabul edilir ve LLM'e gider.
+Sohbet geçmişi olan mesajlar (takip soruları) her zaman LLM'e gider.
+"""
+import asyncio
+import re
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import get_database
+from app.services.movies.autocomplete import autocomplete_index, normalize
+from app.services.movies.facets import FACETS_COLLECTION
+from app.services.agent.tools import find_movie_by_id, find_movies_by_filter
+
+YEAR_PATTERN = re.compile(r"^(18[89]\d|19\d{2}|20\d{2})$")
+NOT_FOUND = "Veritabanımızda buna uygun bir kayıt bulamadım."
+
+# Anahtarlar normalize() edilmiş halde (aksansız, küçük harf)
+GENRE_ALIASES = {
+    "dram": "Drama", "komedi": "Comedy", "aksiyon": "Action", "bilim kurgu": "Sci-Fi",
+    "bilimkurgu": "Sci-Fi", "gerilim": "Thriller", "korku": "Horror", "romantik": "Romance",
+    "animasyon": "Animation", "suc": "Crime", "belgesel": "Documentary", "macera": "Adventure",
+    "fantastik": "Fantasy", "savas": "War", "muzikal": "Musical", "gizem": "Mystery",
+    "biyografi": "Biography", "aile": "Family", "tarih": "History",
+}
+
+# Anlam taşımayan (filtreyi değiştirmeyen) kelimeler; Türkçe ekler kesme işaretinden ayrılır
+FILLER_WORDS = {
+    "film", "filmi", "filmler", "filmleri", "filmlerini", "filmini", "filme", "filmlerden",
+    "yapimi", "yapim", "yili", "yilinda", "yilindan", "yilinin", "cikan", "cekilen", "cektigi",
+    "yonetmen", "yonetmeni", "yonetmenin", "yonettigi", "yonetmenligini",
+    "tur", "turu", "turunde", "turundeki", "turdeki",
+    "in", "un", "nin", "nun", "ye", "ya", "de", "da", "te", "ta", "ait", "olan", "yapilan",
+    "bana", "goster", "gosterir", "misin", "listele", "bul", "getir", "hangi", "hangileri",
+    "neler", "nelerdir", "var", "mi", "mu", "tum", "butun", "lutfen", "bir", "birkac",
+    "oner", "onerir", "onerin", "onerebilir",
+}
+LOOKUP_WORDS = {"hakkinda", "bilgi", "ver", "detay", "detaylari", "detaylarini", "anlat", "konusu", "nedir"}
+
+
+class CatalogVocabulary:
+    """Katalogdaki tür ve yönetmen adları; AGENT_FAST_PATH_VOCAB_SECONDS'da bir tazelenir."""
+
+    def __init__(self):
+        self.genres: Dict[str, str] = {}      # normalize edilmiş ifade -> katalogdaki tür
+        self.directors: Dict[str, str] = {}   # tam ad veya tekil soyad -> katalogdaki ad
+        self.loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def ensure_fresh(self, db) -> None:
+        if time.monotonic() - self.loaded_at < settings.AGENT_FAST_PATH_VOCAB_SECONDS:
+            return
+        async with self._lock:
+            if time.monotonic() - self.loaded_at < settings.AGENT_FAST_PATH_VOCAB_SECONDS:
+                return
+            try:
+                await self._load(db)
+            except Exception as e:
+                print(f"Hızlı yol sözlüğü yüklenemedi: {e}")
+            # Hata olsa da bir süre tekrar denenmez; eski sözlükle devam edilir
+            self.loaded_at = time.monotonic()
+
+    async def _load(self, db) -> None:
+        rows = await db[FACETS_COLLECTION].find(
+            {"facet": {"$in": ["genre", "director"]}, "count": {"$gt": 0}}, {"facet": 1, "value": 1}
+        ).to_list(length=None)
+
+        genres = {normalize(row["value"]): row["value"] for row in rows if row["facet"] == "genre"}
+        catalog_genres = set(genres.values())
+        for alias, genre in GENRE_ALIASES.items():
+            if genre in catalog_genres:
+                genres.setdefault(alias, genre)
+
+        names = [row["value"] for row in rows if row["facet"] == "director"]
+        directors = {normalize(name): name for name in names}
+        surnames = Counter(normalize(name).split()[-1] for name in names if normalize(name))
+        for name in names:
+            words = normalize(name).split()
+            # Soyadı tek bir yönetmene aitse ve başka bir şeyle karışmıyorsa tek başına yeter
+            if len(words) > 1 and surnames[words[-1]] == 1 and words[-1] not in genres and words[-1] not in FILLER_WORDS:
+                directors.setdefault(words[-1], name)
+
+        self.genres, self.directors = genres, directors
+
+
+vocabulary = CatalogVocabulary()
+
+
+def _match_phrases(tokens: List[str], used: List[bool], lexicon: Dict[str, str], max_words: int) -> List[str]:
+    """En uzun eşleşme önce: kullanılmamış ardışık kelime gruplarını sözlükte arar."""
+    found = []
+    for size in range(max_words, 0, -1):
+        for start in range(len(tokens) - size + 1):
+            if any(used[start:start + size]):
+                continue
+            phrase = " ".join(tokens[start:start + size])
+            if phrase in lexicon:
+                found.append(lexicon[phrase])
+                for i in range(start, start + size):
+                    used[i] = True
+    return found
+
+
+def _exact_title(phrase: str) -> Optional[str]:
+    matches = [
+        s for s in autocomplete_index.suggest(phrase, limit=20)
+        if s["type"] == "movie" and normalize(s["text"]) == phrase
+    ]
+    return matches[0]["movie_id"] if len(matches) == 1 else None
+
+
+def _parse_lookup(rest: List[str]) -> Optional[dict]:
+    """
+    Dolgu kelimeleri sadece baştan/sondan atılır; başlığın içindekiler korunur
+    ("Bir Zamanlar Anadolu'da filmi" -> "bir zamanlar anadolu da"). En uzun eşleşme kazanır.
+    """
+    for size in range(len(rest), 0, -1):
+        for start in range(len(rest) - size + 1):
+            outside = rest[:start] + rest[start + size:]
+            if all(t in FILLER_WORDS for t in outside):
+                movie_id = _exact_title(" ".join(rest[start:start + size]))
+                if movie_id:
+                    return {"kind": "lookup", "movie_id": movie_id}
+    return None
+
+
+def parse_query(text: str) -> Optional[dict]:
+    """
+    Saf filtre sorgusu için {"kind": "filter", "year", "director", "genre"},
+    film detayı için {"kind": "lookup", "movie_id"}; açık uçluysa None.
+    """
+    tokens = normalize(text).split()
+    if not tokens:
+        return None
+
+    if LOOKUP_WORDS & set(tokens):
+        return _parse_lookup([t for t in tokens if t not in LOOKUP_WORDS])
+
+    used = [False] * len(tokens)
+    years = []
+    for i, token in enumerate(tokens):
+        if YEAR_PATTERN.match(token):
+            years.append(int(token))
+            used[i] = True
+    genres = _match_phrases(tokens, used, vocabulary.genres, max_words=2)
+    directors = _match_phrases(tokens, used, vocabulary.directors, max_words=4)
+
+    leftover = [t for t, is_used in zip(tokens, used) if not is_used and t not in FILLER_WORDS]
+    if leftover or not (years or genres or directors):
+        return None
+    if len(set(years)) > 1 or len(set(genres)) > 1 or len(set(directors)) > 1:
+        return None  # "2010 ve 2012", "dram ya da komedi": LLM yorumlasın
+
+    return {
+        "kind": "filter",
+        "year": years[0] if years else None,
+        "genre": genres[0] if genres else None,
+        "director": directors[0] if directors else None,
+    }
+
+
+def _movie_line(movie: dict) -> str:
+    parts = [f"{movie.get('title')} ({movie.get('year')})"]
+    if movie.get("director"):
+        parts.append(f"Yönetmen: {movie['director']}")
+    if movie.get("genre"):
+        parts.append(f"Tür: {', '.join(movie['genre'])}")
+    if movie.get("average_rating"):
+        parts.append(f"Puan: {movie['average_rating']:.1f}")
+    return " | ".join(parts)
+
+
+def render_filter_answer(intent: dict, movies: List[dict]) -> str:
+    if not movies:
+        return NOT_FOUND
+    criteria = ", ".join(str(intent[key]) for key in ("director", "year", "genre") if intent.get(key))
+    lines = [f"{criteria} için veritabanında bulduğum filmler:"]
+    lines += [f"{i}. {_movie_line(movie)}" for i, movie in enumerate(movies, start=1)]
+    return "\n".join(lines)
+
+
+def render_lookup_answer(movie: Optional[dict]) -> str:
+    if not movie:
+        return NOT_FOUND
+    lines = [_movie_line(movie)]
+    if movie.get("cast"):
+        lines.append(f"Oyuncular: {', '.join(movie['cast'])}")
+    if movie.get("description"):
+        lines.append("")
+        lines.append(movie["description"])
+    return "\n".join(lines)
+
+
+async def answer_structured_query(user_input: str) -> Optional[str]:
+    """Sorgu yerel olarak çözülebiliyorsa şablon cevabı, değilse None (LLM'e gidilir)."""
+    db = await get_database()
+    await vocabulary.ensure_fresh(db)
+
+    intent = parse_query(user_input)
+    if intent is None:
+        return None
+
+    if intent["kind"] == "lookup":
+        return render_lookup_answer(await find_movie_by_id(intent["movie_id"]))
+
+    # Katalogdaki adlar birebir aranır (araçtaki regex "Drama"yı "Melodrama"da da bulurdu)
+    movies = await find_movies_by_filter(
+        director=f"^{re.escape(intent['director'])}$" if intent["director"] else None,
+        genre=f"^{re.escape(intent['genre'])}$" if intent["genre"] else None,
+        year=intent["year"],
+        limit=settings.AGENT_FAST_PATH_LIMIT,
+    )
+    return render_filter_answer(intent, movies)
@@ -0,0 +1,325 @@
+"""
+Birden fazla LLM sağlayıcısı üzerinde gecikme farkındalıklı yönlendirme.
+
+Yapılandırılmış her sağlayıcı (Groq, OpenRouter, OpenAI veya sahte modeller) için
+son LLM_ROUTER_WINDOW çağrının gecikmesi ve hata oranı tutulur. Her çağrı:
+
+1) Sağlıklı sağlayıcılar arasından beklenen gecikmesi en düşük olana gider
+   (medyan gecikme, hata oranıyla cezalandırılır).
+2) Yanıt hedge süresi içinde gelmezse sıradaki sağlayıcıya paralel bir istek
+   daha atılır (en fazla LLM_MAX_PARALLEL_CALLS); ilk gelen yanıt kullanılır.
+3) Hata veya LLM_CALL_TIMEOUT_SECONDS aşımında sıradakine geçilir (failover).
+   Her çağrının süresi isteğin kalan zaman bütçesiyle de sınırlıdır.
+
+Art arda LLM_ROUTER_FAILURE_THRESHOLD hata veren sağlayıcı LLM_ROUTER_COOLDOWN_SECONDS
+boyunca sona atılır (devre kesici); süre dolunca tekrar denenir.
+
+Metrikler: ajan seviyesindeki çağrı (llm_call_duration_seconds, token sayıları)
+llm_metrics_callback ile bir kez, yanıtı veren sağlayıcının adıyla yazılır.
+Sağlayıcı denemeleri callback'lere gönderilmez; her denemenin süresi ayrıca
+llm_provider_call_duration_seconds'a gider.
+"""
+import asyncio
+import statistics
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from app.core.config import settings
+from app.core.deadline import DeadlineExceeded, cap_timeout, check_deadline, remaining
+from app.core.metrics import LLM_PROVIDER_LATENCY
+from app.services.agent.fake_llm import FakeChatModel
+
+
+# Sağlayıcı denemeleri üst çağrının callback'lerini miras almaz (çift sayım olmasın)
+PROVIDER_CALL_CONFIG = {"callbacks": []}
+
+
+class LLMRouterError(RuntimeError):
+    """Tüm sağlayıcılar başarısız oldu."""
+
+
+class ProviderStats:
+    """Bir sağlayıcının kayan penceredeki gecikme/hata istatistikleri."""
+
+    def __init__(self, name: str, window: int):
+        self.name = name
+        self.samples: deque = deque(maxlen=window)  # (gecikme sn, başarılı mı)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.in_flight = 0
+        self.total_calls = 0
+        self.total_errors = 0
+
+    def record(self, latency: float, ok: bool) -> None:
+        self.samples.append((latency, ok))
+        self.total_calls += 1
+        if ok:
+            self.consecutive_failures = 0
+            return
+        self.total_errors += 1
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= settings.LLM_ROUTER_FAILURE_THRESHOLD:
+            self.open_until = time.monotonic() + settings.LLM_ROUTER_COOLDOWN_SECONDS
+
+    def _latencies(self) -> List[float]:
+        return sorted(latency for latency, ok in self.samples if ok)
+
+    def latency_quantile(self, q: float) -> Optional[float]:
+        latencies = self._latencies()
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    @property
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.open_until
+
+    def expected_latency(self) -> float:
+        """Sıralama anahtarı. Hiç ölçümü olmayan sağlayıcı 0 alır; böylece bir kez denenir."""
+        latencies = self._latencies()
+        median = statistics.median(latencies) if latencies else 0.0
+        return median / max(0.05, 1.0 - self.error_rate)
+
+    def snapshot(self) -> dict:
+        p50, p95 = self.latency_quantile(0.5), self.latency_quantile(0.95)
+        return {
+            "provider": self.name,
+            "healthy": self.healthy,
+            "in_flight": self.in_flight,
+            "window_calls": len(self.samples),
+            "error_rate": round(self.error_rate, 4),
+            "p50_seconds": round(p50, 4) if p50 is not None else None,
+            "p95_seconds": round(p95, 4) if p95 is not None else None,
+            "consecutive_failures": self.consecutive_failures,
+            "total_calls": self.total_calls,
+            "total_errors": self.total_errors,
+        }
+
+
+# Sağlayıcı adı -> istatistik; süreç genelinde tek, stats endpoint'i buradan okur
+provider_stats: Dict[str, ProviderStats] = {}
+
+
+def _stats_for(name: str) -> ProviderStats:
+    if name not in provider_stats:
+        provider_stats[name] = ProviderStats(name, settings.LLM_ROUTER_WINDOW)
+    return provider_stats[name]
+
+
+class RoutedChatModel(BaseChatModel):
+    """
+    Sağlayıcı listesini tek bir sohbet modeli gibi gösterir; AgentExecutor'a
+    doğrudan verilir. `bind_tools` araçları her sağlayıcıya ayrı ayrı bağlar.
+    """
+
+    providers: List[Tuple[str, Any]]
+    bound: Optional[List[Any]] = None
+    model_name: str = "llm-router"
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        # Henüz çağrı almamış sağlayıcılar da stats endpoint'inde görünsün
+        for name, _ in self.providers:
+            _stats_for(name)
+
+    @property
+    def _llm_type(self) -> str:
+        return "llm-router"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model_name": self.model_name, "providers": [name for name, _ in self.providers]}
+
+    def _get_invocation_params(self, stop: Optional[List[str]] = None, **kwargs: Any) -> dict:
+        params = super()._get_invocation_params(stop=stop, **kwargs)
+        params["model"] = self.model_name
+        return params
+
+    def bind_tools(self, tools: Any, **kwargs: Any):
+        return self.model_copy(update={"bound": [model.bind_tools(tools, **kwargs) for _, model in self.providers]})
+
+    def _runnable(self, index: int):
+        return self.bound[index] if self.bound else self.providers[index][1]
+
+    def _ranked(self) -> List[int]:
+        """Sağlıklılar beklenen gecikmeye göre, devresi açık olanlar en sonda."""
+        def key(index: int):
+            stats = _stats_for(self.providers[index][0])
+            return (not stats.healthy, stats.expected_latency(), index)
+        return sorted(range(len(self.providers)), key=key)
+
+    def _hedge_delay(self, index: int) -> float:
+        """Birincil sağlayıcının p95'i (yeterli ölçüm varsa), ayarlanan üst sınırla."""
+        stats = _stats_for(self.providers[index][0])
+        p95 = stats.latency_quantile(0.95) if len(stats.samples) >= 10 else None
+        ceiling = settings.LLM_HEDGE_AFTER_SECONDS
+        return min(ceiling, p95) if p95 else ceiling
+
+    async def _call(self, index: int, messages: List[BaseMessage], stop: Optional[List[str]]) -> Tuple[int, Any]:
+        name = self.providers[index][0]
+        stats = _stats_for(name)
+        stats.in_flight += 1
+        start = time.perf_counter()
+        try:
+            message = await asyncio.wait_for(
+                self._runnable(index).ainvoke(messages, stop=stop, config=PROVIDER_CALL_CONFIG),
+                timeout=cap_timeout(settings.LLM_CALL_TIMEOUT_SECONDS),
+            )
+        except asyncio.CancelledError:
+            # Hedge'i kaybeden istek iptal edildi; sağlayıcının suçu değil
+            raise
+        except Exception as e:
+            latency = time.perf_counter() - start
+            stats.record(latency, ok=False)
+            status = "timeout" if isinstance(e, asyncio.TimeoutError) else "error"
+            LLM_PROVIDER_LATENCY.labels(name, status).observe(latency)
+            print(f"LLM sağlayıcısı başarısız ({name}, {status}): {e!r}")
+            raise
+        finally:
+            stats.in_flight -= 1
+
+        latency = time.perf_counter() - start
+        stats.record(latency, ok=True)
+        LLM_PROVIDER_LATENCY.labels(name, "ok").observe(latency)
+        return index, message
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        check_deadline()
+        order = self._ranked()
+        next_position = 0
+        pending: Dict[asyncio.Task, int] = {}
+        errors: List[str] = []
+
+        def launch() -> None:
+            nonlocal next_position
+            index = order[next_position]
+            next_position += 1
+            pending[asyncio.create_task(self._call(index, messages, stop))] = index
+
+        launch()
+        try:
+            while pending:
+                can_hedge = next_position < len(order) and len(pending) < settings.LLM_MAX_PARALLEL_CALLS
+                timeout = self._hedge_delay(order[0]) if can_hedge and settings.LLM_HEDGE_AFTER_SECONDS > 0 else None
+                if timeout is not None:
+                    timeout = cap_timeout(timeout)
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    launch()  # Hedge: birincil yavaş, sıradakine de sor
+                    continue
+
+                for task in done:
+                    index = pending.pop(task)
+                    if task.exception() is None:
+                        _, message = task.result()
+                        message.response_metadata["llm_provider"] = self.providers[index][0]
+                        return ChatResult(generations=[ChatGeneration(message=message)])
+                    errors.append(f"{self.providers[index][0]}: {task.exception()!r}")
+
+                # Failover: hata veren isteğin yerine sıradakini hemen başlat
+                if next_position < len(order) and len(pending) < settings.LLM_MAX_PARALLEL_CALLS:
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if remaining() == 0.0:
+            raise DeadlineExceeded()  # Sağlayıcılar değil, isteğin bütçesi tükendi
+        raise LLMRouterError("Hiçbir LLM sağlayıcısı yanıt veremedi: " + "; ".join(errors))
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        # Senkron yol (ajan async çalışır): hedge yok, sırayla failover
+        errors: List[str] = []
+        for index in self._ranked():
+            name = self.providers[index][0]
+            stats = _stats_for(name)
+            start = time.perf_counter()
+            try:
+                message = self._runnable(index).invoke(messages, stop=stop, config=PROVIDER_CALL_CONFIG)
+            except Exception as e:
+                stats.record(time.perf_counter() - start, ok=False)
+                errors.append(f"{name}: {e!r}")
+                continue
+            stats.record(time.perf_counter() - start, ok=True)
+            message.response_metadata["llm_provider"] = name
+            return ChatResult(generations=[ChatGeneration(message=message)])
+        raise LLMRouterError("Hiçbir LLM sağlayıcısı yanıt veremedi: " + "; ".join(errors))
+
+
+def _fake_providers() -> List[Tuple[str, Any]]:
+    """
+    AGENT_FAKE_LLM_PROVIDERS="hizli:300:0.2,yavas:1500:0" -> ad:gecikme_ms:hata_oranı.
+    Boşsa AGENT_FAKE_LLM_LATENCY_MS ile tek sahte sağlayıcı.
+    """
+    spec = settings.AGENT_FAKE_LLM_PROVIDERS.strip()
+    if not spec:
+        return [("fake", FakeChatModel(latency=settings.AGENT_FAKE_LLM_LATENCY_MS / 1000))]
+
+    providers = []
+    for item in spec.split(","):
+        name, latency_ms, failure_rate = (item.strip().split(":") + ["0", "0"])[:3]
+        providers.append((
+            f"fake-{name}",
+            FakeChatModel(latency=float(latency_ms) / 1000, failure_rate=float(failure_rate), model_name=f"fake-{name}"),
+        ))
+    return providers
+
+
+def build_providers() -> List[Tuple[str, Any]]:
+    """API anahtarı tanımlı tüm sağlayıcılar, tercih sırasıyla. Yeniden deneme router'dadır (max_retries=0)."""
+    if settings.AGENT_FAKE_LLM:
+        return _fake_providers()
+
+    # Importlar burada: sahte modelle çalışırken sağlayıcı paketleri gerekmez
+    from langchain_groq import ChatGroq
+    from langchain_openai import ChatOpenAI
+
+    timeout = settings.LLM_CALL_TIMEOUT_SECONDS
+    providers = []
+    if settings.GROQ_API_KEY:
+        providers.append(("groq", ChatGroq(
+            model="openai/gpt-oss-120b",
+            temperature=0.2,
+            max_tokens=None,
+            timeout=timeout,
+            max_retries=0,
+            api_key=settings.GROQ_API_KEY
+        )))
+    if settings.OPENROUTER_API_KEY:
+        providers.append(("openrouter", ChatOpenAI(
+            model="amazon/nova-2-lite-v1:free",
+            temperature=0.2,
+            timeout=timeout,
+            max_retries=0,
+            api_key=settings.OPENROUTER_API_KEY,
+            base_url="https://openrouter.ai/api/v1",
+            default_headers={
+                "HTTP-Referer": "http://localhost:3000",
+                "X-Title": "FilmFlow AI"
+            }
+        )))
+    if settings.OPENAI_API_KEY:
+        providers.append(("openai", ChatOpenAI(
+            model="gpt-3.5-turbo",
+            temperature=0.2,
+            timeout=timeout,
+            max_retries=0,
+            api_key=settings.OPENAI_API_KEY
+        )))
+    return providers
+
+
+def get_provider_stats() -> List[dict]:
+    return [stats.snapshot() for stats in provider_stats.values()]
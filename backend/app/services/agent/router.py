@@ -1,9 +1,12 @@
+from typing import List
 from fastapi import APIRouter, HTTPException, Body, Depends
-from app.services.auth.utils import get_current_user
+from app.services.auth.utils import get_current_user, get_current_admin_user
 
 from app.services.agent.service import agent_service
 from app.services.agent.context import user_context_var
-from .schemas import ChatResponse, ChatRequest
+from app.services.agent.admission import agent_slot, check_rate_limit
+from app.services.agent.llm_router import get_provider_stats
+from .schemas import ChatResponse, ChatRequest, LLMProviderStats
 
 router = APIRouter()
 
@@ -13,7 +16,11 @@ async def chat_endpoint(request: ChatRequest = Body(...), current_user=Depends(g
     """
     AI Ajanı ile sohbet etmek için kullanılır.
     Frontend, kullanıcının son mesajını ve (varsa) geçmiş mesajları gönderir.
+    Hız sınırı aşılırsa 429, ajan kapasitesi doluysa 503 (ikisi de Retry-After ile) döner.
     """
+    # Ucuz kontroller önce: reddedilen istek ajan/LLM maliyeti doğurmaz
+    await check_rate_limit(str(current_user["_id"]))
+
     try:
         # Pydantic modelini dict listesine çevir (LangChain servisi için)
         chat_history = [msg.model_dump() for msg in request.history]
@@ -23,16 +30,29 @@ async def chat_endpoint(request: ChatRequest = Body(...), current_user=Depends(g
         
         try:
             # Ajanı çalıştır
-            ai_response = await agent_service.chat(
-                user_input=request.message,
-                chat_history=chat_history
-            )
+            async with agent_slot():
+                ai_response = await agent_service.chat(
+                    user_input=request.message,
+                    chat_history=chat_history
+                )
         finally:
             # Context'i temizle
             user_context_var.reset(token)
         
         return ChatResponse(response=ai_response)
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Agent Hatası: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# --- LLM Sağlayıcı İstatistikleri (Admin) ---
+@router.get("/llm/stats", response_model=List[LLMProviderStats])
+async def llm_provider_stats(current_user=Depends(get_current_admin_user)):
+    """
+    LLM router'ın sağlayıcı bazında kayan pencere istatistikleri
+    (gecikme p50/p95, hata oranı, devre kesici durumu). Değerler bu sürece aittir.
+    """
+    return get_provider_stats()
@@ -9,4 +9,16 @@ class ChatRequest(BaseModel):
     history: List[Message] = Field(default=[], description="Sohbet geçmişi (Context için)")
 
 class ChatResponse(BaseModel):
-    response: str
\ No newline at end of file
+    response: str
+
+class LLMProviderStats(BaseModel):
+    provider: str
+    healthy: bool
+    in_flight: int
+    window_calls: int
+    error_rate: float
+    p50_seconds: Optional[float] = None
+    p95_seconds: Optional[float] = None
+    consecutive_failures: int
+    total_calls: int
+    total_errors: int
@@ -1,9 +1,9 @@
+import hashlib
 import os
+import time
 from typing import List, Dict, Any
 
 # LangChain Importları
-from langchain_groq import ChatGroq
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import HumanMessage, AIMessage
 
@@ -14,58 +14,42 @@ except ImportError:
     from langchain_classic.agents import AgentExecutor, create_tool_calling_agent
 
 # Bizim Modüllerimiz
-from app.services.agent.tools import tools_list
+from app.services.agent.tools import WRITE_TOOLS, tools_list
 from app.services.agent.prompts import get_system_prompt
 from app.core.config import settings
+from app.core.metrics import AGENT_CHAT_LATENCY
+from app.core.deadline import run_with_deadline
+from app.services.agent.callbacks import llm_metrics_callback
+from app.services.agent.llm_router import RoutedChatModel, build_providers
+from app.services.agent.fast_path import answer_structured_query
+from app.services.agent.answer_cache import answer_cache_key, get_cached_answer, store_answer
 
 class AgentService:
-    def __init__(self):
-        self.llm = self._initialize_llm()
+    def __init__(self, llm=None):
+        # llm verilirse (ör. testlerde FakeChatModel) sağlayıcı seçimi atlanır
+        self.llm = llm or self._initialize_llm()
         self.tools = tools_list
         self.agent_executor = self._create_agent()
+        self.fingerprint = self._fingerprint()
 
     def _initialize_llm(self):
         """
-        .env dosyasındaki ayarlara göre LLM'i seçer.
+        .env dosyasındaki anahtarı tanımlı tüm sağlayıcıları (Groq, OpenRouter, OpenAI)
+        veya AGENT_FAKE_LLM ile sahte modelleri bir LLM router arkasında toplar.
         """
-        # 1. Groq Kontrolü
-        if settings.GROQ_API_KEY:
-            print("AI Agent: Groq (GPT-OSS-120b) Modeli Kullanılıyor.")
-            return ChatGroq(
-                model="openai/gpt-oss-120b", 
-                temperature=0.2,
-                max_tokens=None,
-                timeout=None,
-                max_retries=2,
-                api_key=settings.GROQ_API_KEY
-            )
-        
-        # 2. OpenRouter Kontrolü (Önerilen)
-        if settings.OPENROUTER_API_KEY:
-            print("AI Agent: OpenRouter Modeli Kullanılıyor.")
-            return ChatOpenAI(
-                model="amazon/nova-2-lite-v1:free", 
-                temperature=0.2,
-                api_key=settings.OPENROUTER_API_KEY,
-                base_url="https://openrouter.ai/api/v1",
-                default_headers={
-                    "HTTP-Referer": "http://localhost:3000",
-                    "X-Title": "FilmFlow AI"
-                }
-            )
-
-        # 3. OpenAI Kontrolü
-        elif settings.OPENAI_API_KEY:
-            print("AI Agent: Standart OpenAI Modeli Kullanılıyor.")
-            return ChatOpenAI(
-                model="gpt-3.5-turbo",
-                temperature=0.2,
-                api_key=settings.OPENAI_API_KEY
-            )
-        
-        else:
+        providers = build_providers()
+        if not providers:
             raise ValueError("HATA: API Key bulunamadı! Lütfen .env dosyasına OPENROUTER_API_KEY, GROQ_API_KEY veya OPENAI_API_KEY ekleyin.")
 
+        print(f"AI Agent: LLM router sağlayıcıları: {', '.join(name for name, _ in providers)}")
+        return RoutedChatModel(providers=providers)
+
+    def _fingerprint(self) -> str:
+        """Model(ler) ve sistem prompt'u; biri değişince önbellekteki cevaplar kullanılmaz."""
+        providers = getattr(self.llm, "providers", None) or [("llm", self.llm)]
+        models = [f"{name}/{getattr(model, 'model_name', None) or type(model).__name__}" for name, model in providers]
+        return hashlib.md5("|".join(models + [get_system_prompt()]).encode()).hexdigest()[:12]
+
     def _create_agent(self) -> AgentExecutor:
         """Tool Calling Agent oluşturur."""
         prompt = ChatPromptTemplate.from_messages([
@@ -81,11 +65,35 @@ class AgentService:
             agent=agent, 
             tools=self.tools, 
             verbose=True, 
-            handle_parsing_errors=True
+            handle_parsing_errors=True,
+            return_intermediate_steps=True,  # Yazma aracı çalıştı mı? (cevap önbelleği)
+            # Tur sayısı ve toplam süre sınırlı; istek bütçesi ayrıca chat() içinde uygulanır
+            max_iterations=settings.AGENT_MAX_ITERATIONS,
+            max_execution_time=settings.AGENT_REQUEST_TIMEOUT_SECONDS,
         )
 
     async def chat(self, user_input: str, chat_history: List[Dict[str, str]] = []) -> str:
         """Sohbeti başlatan fonksiyon."""
+        start = time.perf_counter()
+        cache_key = await answer_cache_key(user_input, chat_history, self.fingerprint)
+        cached = await get_cached_answer(cache_key)
+        if cached is not None:
+            AGENT_CHAT_LATENCY.labels("cache").observe(time.perf_counter() - start)
+            return cached
+
+        # Takip sorusu ("peki 2010?") önceki turlara bağlıdır; hızlı yol sadece ilk mesajda
+        if settings.AGENT_FAST_PATH_ENABLED and not chat_history:
+            start = time.perf_counter()
+            try:
+                answer = await answer_structured_query(user_input)
+            except Exception as e:
+                # Hızlı yol hiçbir zaman sohbeti düşürmez; LLM yoluna devam edilir
+                print(f"Hızlı yol başarısız, LLM kullanılıyor: {e}")
+                answer = None
+            if answer is not None:
+                AGENT_CHAT_LATENCY.labels("fast_path").observe(time.perf_counter() - start)
+                return answer
+
         langchain_history = []
         for msg in chat_history:
             if msg["role"] == "user":
@@ -93,11 +101,27 @@ class AgentService:
             elif msg["role"] == "ai" or msg["role"] == "assistant":
                 langchain_history.append(AIMessage(content=msg["content"]))
 
-        response = await self.agent_executor.ainvoke({
-            "input": user_input,
-            "chat_history": langchain_history
-        })
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            response = await run_with_deadline(self.agent_executor.ainvoke(
+                {
+                    "input": user_input,
+                    "chat_history": langchain_history
+                },
+                config={"callbacks": [llm_metrics_callback]}
+            ))
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            AGENT_CHAT_LATENCY.labels(status).observe(time.perf_counter() - start)
 
+        # Yazma aracı çalıştıran veya tur/süre sınırına takılan cevaplar saklanmaz
+        steps = response.get("intermediate_steps", [])
+        stopped = len(steps) >= settings.AGENT_MAX_ITERATIONS or response["output"].startswith("Agent stopped")
+        if not stopped and not any(action.tool in WRITE_TOOLS for action, _ in steps):
+            await store_answer(cache_key, response["output"])
         return response["output"]
 
 # Global Singleton instance
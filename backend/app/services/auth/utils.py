@@ -3,6 +3,7 @@
 from typing import Optional, Annotated
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime
 
 from fastapi import Depends, HTTPException, status
@@ -35,22 +36,8 @@ async def create_user(db: AsyncIOMotorDatabase, user_in: schemas.UserCreate) ->
     """
     Yeni kullanıcı oluştur.
     E-posta doğrulama vs. yok. Direkt aktif kullanıcı oluşturuyoruz.
+    E-posta / kullanıcı adı tekilliğini ön sorgu yerine unique index'ler garanti eder.
     """
-    # Önce e-posta  kontrolü
-    existing = await get_user_by_email(db, user_in.email)
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Bu e-posta ile kayıtlı bir kullanıcı zaten var.",
-        )
-    # Sonra kullanıcı adı kontrolü
-    existing = await get_user_by_username(db, user_in.username)
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Bu kullanıcı adı zaten alınmış.",
-        )
-
     hashed_pw = get_password_hash(user_in.password)
 
     user_doc = {
@@ -61,7 +48,16 @@ async def create_user(db: AsyncIOMotorDatabase, user_in: schemas.UserCreate) ->
         "role": schemas.UserRole.USER.value,  # Her zaman "user" - enum kullanarak
         "created_at": datetime.utcnow(),
     }
-    result = await db.users.insert_one(user_doc)
+    try:
+        result = await db.users.insert_one(user_doc)
+    except DuplicateKeyError as e:
+        # Hangi index'in ihlal edildiğini keyPattern söyler
+        if "email" in (e.details or {}).get("keyPattern", {}):
+            detail = "Bu e-posta ile kayıtlı bir kullanıcı zaten var."
+        else:
+            detail = "Bu kullanıcı adı zaten alınmış."
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
     user_doc["_id"] = str(result.inserted_id)
     return user_doc
 
@@ -0,0 +1 @@
+"""Leaderboards module package."""
@@ -0,0 +1,37 @@
+from redis.exceptions import RedisError
+
+from app.core.database import get_database
+from app.core.jobs import enqueue_job, job_handler
+from app.core.redis import get_redis
+from .store import TOP_KEY, rebuild_from_mongo
+
+# --- Türetilmiş Veri İşleri (Liderlik Tabloları) ---
+REBUILD_LEADERBOARDS = "rebuild_leaderboards"
+
+
+@job_handler(REBUILD_LEADERBOARDS)
+async def rebuild_leaderboards_job(payload: dict):
+    await rebuild_from_mongo(await get_database())
+
+
+async def enqueue_leaderboard_rebuild() -> bool:
+    return await enqueue_job(REBUILD_LEADERBOARDS, {}, key="leaderboards:rebuild")
+
+
+async def ensure_leaderboards() -> bool:
+    """
+    Açılışta: tablolar Redis'te yoksa (ilk kurulum, Redis boşaltıldı) yeniden
+    kurma işi bırakılır. Tablolar sadece yorum yazımında güncellendiği için
+    aksi halde ilk yoruma kadar boş kalırlar. İş bırakıldıysa True döner.
+    """
+    redis = get_redis()
+    if not redis:
+        return False
+    try:
+        if await redis.exists(TOP_KEY):
+            return False
+    except RedisError as e:
+        print(f"Liderlik tabloları kontrol edilemedi: {e}")
+        return False
+    print("Liderlik tabloları bulunamadı; yeniden kurma işi bırakılıyor.")
+    return await enqueue_leaderboard_rebuild()
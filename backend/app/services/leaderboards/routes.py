@@ -0,0 +1,78 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Literal, Optional
+from bson import ObjectId
+from redis.exceptions import RedisError
+
+from app.core.database import get_database
+from app.core.redis import get_redis
+from app.services.auth.utils import get_current_admin_user
+from app.services.movies.search import fetch_movies_in_order
+from . import store
+from .jobs import enqueue_leaderboard_rebuild
+from .schemas import LeaderboardEntry
+
+router = APIRouter()
+
+
+async def _resolve(db, ranking) -> List[dict]:
+    """(movie_id, skor) listesini tek $in sorgusuyla filmlere çevirir, sırayı korur."""
+    scores = {ObjectId(movie_id): score for movie_id, score in ranking}
+    movies = await fetch_movies_in_order(db, list(scores))
+    return [
+        {"rank": rank, "score": scores[movie["_id"]], "movie": movie}
+        for rank, movie in enumerate(movies, start=1)
+    ]
+
+
+def _unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Liderlik tabloları şu anda kullanılamıyor."
+    )
+
+
+def _require_redis():
+    if not get_redis():
+        raise _unavailable()
+
+
+# --- GET (En Yüksek Puanlılar) ---
+@router.get("/top", response_model=List[LeaderboardEntry])
+async def top_rated_movies(
+    genre: Optional[str] = Query(None, description="Sadece bu türdeki filmler"),
+    limit: int = Query(10, ge=1, le=100),
+    db=Depends(get_database)
+):
+    """Ağırlıklı puana göre sıralı; az yorumlu filmler katalog ortalamasına çekilir."""
+    _require_redis()
+    try:
+        ranking = await store.top_rated(genre, limit)
+    except RedisError:
+        raise _unavailable()
+    return await _resolve(db, ranking)
+
+
+# --- GET (Trend Olanlar) ---
+@router.get("/trending", response_model=List[LeaderboardEntry])
+async def trending_movies(
+    window: Literal["24h", "7d"] = Query("24h", description="Kayan pencere"),
+    limit: int = Query(10, ge=1, le=100),
+    db=Depends(get_database)
+):
+    """Pencere içinde en çok yorum alan filmler."""
+    _require_redis()
+    try:
+        ranking = await store.trending(window, limit)
+    except RedisError:
+        raise _unavailable()
+    return await _resolve(db, ranking)
+
+
+# --- POST (Yeniden Kurulum) - Sadece Admin ---
+@router.post("/rebuild", status_code=status.HTTP_202_ACCEPTED)
+async def rebuild_leaderboards(admin: dict = Depends(get_current_admin_user)):
+    """Tabloları Mongo'dan baştan kurar (arka plan işi)."""
+    _require_redis()
+    if await enqueue_leaderboard_rebuild():
+        return {"message": "Liderlik tablosu yeniden kurulumu kuyruğa alındı."}
+    return {"message": "Liderlik tablosu yeniden kurulumu zaten kuyrukta veya tamamlandı."}
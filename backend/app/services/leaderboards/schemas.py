@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+from app.services.movies.schemas import MovieDB
+
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    score: float  # Top listelerde ağırlıklı puan, trend listesinde pencere içi yorum sayısı
+    movie: MovieDB
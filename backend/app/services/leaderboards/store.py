@@ -0,0 +1,203 @@
+"""
+Redis sorted set'leri üzerinde liderlik tabloları.
+
+    lb:top                  en yüksek puanlı filmler (tümü)
+    lb:top:genre:<tür>      türe göre en yüksek puanlılar
+    lb:trend:<saat>         o saatte gelen yorum sayısı (saatlik kova)
+    lb:trend:window:<24h>   son N saatin kovalarının birleşimi (kısa süre önbellekli)
+
+Puan, az yorumlu filmlerin tabloyu ele geçirmemesi için ağırlıklı (Bayes) ortalamadır:
+    (v * R + m * C) / (v + m)
+v: yorum sayısı, R: filmin ortalaması, m: LEADERBOARD_MIN_REVIEWS, C: katalog ortalaması.
+Okumalar O(log N + k); tüm yazmalar idempotent ZADD/ZREM veya tek ZINCRBY'dir.
+"""
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+TOP_KEY = "lb:top"
+GENRE_PREFIX = "lb:top:genre:"
+TREND_PREFIX = "lb:trend:"
+WINDOW_PREFIX = "lb:trend:window:"
+GLOBAL_MEAN_KEY = "lb:global_mean"
+DEFAULT_GLOBAL_MEAN = 6.0
+
+TRENDING_WINDOWS = {"24h": 24, "7d": 24 * 7}
+BUCKET_TTL_SECONDS = (24 * 7 + 2) * 3600  # En uzun pencere + pay
+
+
+def genre_key(genre: str) -> str:
+    return f"{GENRE_PREFIX}{genre}"
+
+
+def _hour_bucket(at: Optional[datetime] = None) -> int:
+    timestamp = (at - datetime(1970, 1, 1)).total_seconds() if at else time.time()
+    return int(timestamp // 3600)
+
+
+def weighted_rating(average: float, count: int, global_mean: float) -> float:
+    m = settings.LEADERBOARD_MIN_REVIEWS
+    return round((count * average + m * global_mean) / (count + m), 4)
+
+
+# --- Yazma ---
+async def update_movie_score(movie_id: str, average: float, count: int, genres: Iterable[str]) -> None:
+    """Puan yeniden hesaplandıktan sonra çağrılır; yorumu kalmayan film tablolardan çıkar."""
+    redis = get_redis()
+    if not redis:
+        return
+    global_mean = float(await redis.get(GLOBAL_MEAN_KEY) or DEFAULT_GLOBAL_MEAN)
+
+    keys = [TOP_KEY] + [genre_key(genre) for genre in genres]
+    async with redis.pipeline(transaction=False) as pipe:
+        for key in keys:
+            if count > 0:
+                pipe.zadd(key, {movie_id: weighted_rating(average, count, global_mean)})
+            else:
+                pipe.zrem(key, movie_id)
+        await pipe.execute()
+
+
+async def move_movie_genres(movie_id: str, old_genres: Iterable[str], new_genres: Iterable[str]) -> None:
+    """Filmin türleri değişti: skor genel tablodan okunup yeni tür tablolarına taşınır."""
+    redis = get_redis()
+    if not redis:
+        return
+    old_genres, new_genres = set(old_genres or []), set(new_genres or [])
+    score = await redis.zscore(TOP_KEY, movie_id)
+    async with redis.pipeline(transaction=False) as pipe:
+        for genre in old_genres - new_genres:
+            pipe.zrem(genre_key(genre), movie_id)
+        if score is not None:
+            for genre in new_genres - old_genres:
+                pipe.zadd(genre_key(genre), {movie_id: score})
+        await pipe.execute()
+
+
+async def remove_movie(movie_id: str, genres: Iterable[str]) -> None:
+    redis = get_redis()
+    if not redis:
+        return
+    async with redis.pipeline(transaction=False) as pipe:
+        for key in [TOP_KEY] + [genre_key(genre) for genre in genres or []]:
+            pipe.zrem(key, movie_id)
+        await pipe.execute()
+
+
+async def record_review_activity(movie_id: str, delta: int = 1, at: Optional[datetime] = None) -> None:
+    """Yorumun geldiği saatin kovasını artırır (silmede -1). Tek round trip."""
+    redis = get_redis()
+    if not redis:
+        return
+    bucket = _hour_bucket(at)
+    if bucket <= _hour_bucket() - max(TRENDING_WINDOWS.values()):
+        return  # Hiçbir pencereye girmeyen eski yorum
+    key = f"{TREND_PREFIX}{bucket}"
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.zincrby(key, delta, movie_id)
+            pipe.expire(key, BUCKET_TTL_SECONDS)
+            await pipe.execute()
+    except RedisError as e:
+        # Trend tablosu için yorum yazımı başarısız olmaz; sonraki rebuild düzeltir
+        print(f"Trend kovası güncellenemedi: {e}")
+
+
+# --- Okuma ---
+async def top_rated(genre: Optional[str], limit: int) -> List[Tuple[str, float]]:
+    redis = get_redis()
+    key = genre_key(genre) if genre else TOP_KEY
+    return await redis.zrevrange(key, 0, limit - 1, withscores=True)
+
+
+async def trending(window: str, limit: int) -> List[Tuple[str, float]]:
+    """
+    Pencere kovalarının birleşimi ZUNIONSTORE ile bir kez hesaplanır ve
+    TRENDING_WINDOW_CACHE_SECONDS boyunca tekrar kullanılır.
+    """
+    redis = get_redis()
+    window_key = f"{WINDOW_PREFIX}{window}"
+    if not await redis.exists(window_key):
+        current = _hour_bucket()
+        buckets = [f"{TREND_PREFIX}{hour}" for hour in range(current - TRENDING_WINDOWS[window] + 1, current + 1)]
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.zunionstore(window_key, buckets)
+            # Silinen yorumlar yüzünden sıfıra inen filmler listelenmez
+            pipe.zremrangebyscore(window_key, "-inf", 0)
+            pipe.expire(window_key, settings.TRENDING_WINDOW_CACHE_SECONDS)
+            await pipe.execute()
+    return await redis.zrevrange(window_key, 0, limit - 1, withscores=True)
+
+
+# --- Mongo'dan Yeniden Kurulum ---
+async def rebuild_from_mongo(db) -> dict:
+    """
+    Tüm tabloları Mongo'dan baştan kurar. Yeni tablolar geçici anahtarlara yazılıp
+    RENAME ile atomik olarak yer değiştirir; okuyucular yarım tablo görmez.
+    """
+    redis = get_redis()
+    started = time.perf_counter()
+    suffix = f":rebuild:{int(time.time())}"
+
+    totals = await db.movies.aggregate([
+        {"$group": {"_id": None, "rating_sum": {"$sum": "$rating_sum"}, "review_count": {"$sum": "$review_count"}}}
+    ]).to_list(1)
+    global_mean = DEFAULT_GLOBAL_MEAN
+    if totals and totals[0]["review_count"]:
+        global_mean = totals[0]["rating_sum"] / totals[0]["review_count"]
+
+    cursor = db.movies.find(
+        {"review_count": {"$gt": 0}}, {"average_rating": 1, "review_count": 1, "genre": 1}
+    ).batch_size(5000)
+    temp_keys = set()
+    movie_count = 0
+    pipe = redis.pipeline(transaction=False)
+    async for movie in cursor:
+        movie_id = str(movie["_id"])
+        score = weighted_rating(movie.get("average_rating") or 0.0, movie["review_count"], global_mean)
+        for key in [TOP_KEY] + [genre_key(genre) for genre in movie.get("genre") or []]:
+            pipe.zadd(key + suffix, {movie_id: score})
+            temp_keys.add(key)
+        movie_count += 1
+        if len(pipe) >= 5000:
+            await pipe.execute()
+    await pipe.execute()
+
+    # Trend kovaları: son 7 günün yorumları saat bazında
+    since = datetime.utcnow() - timedelta(hours=max(TRENDING_WINDOWS.values()))
+    buckets = db.reviews.aggregate([
+        {"$match": {"created_at": {"$gte": since}}},
+        {"$group": {
+            "_id": {"movie_id": "$movie_id", "hour": {"$dateTrunc": {"date": "$created_at", "unit": "hour"}}},
+            "count": {"$sum": 1},
+        }},
+    ], allowDiskUse=True)
+    async for row in buckets:
+        key = f"{TREND_PREFIX}{_hour_bucket(row['_id']['hour'])}"
+        pipe.zadd(key + suffix, {row["_id"]["movie_id"]: row["count"]})
+        temp_keys.add(key)
+        if len(pipe) >= 5000:
+            await pipe.execute()
+    await pipe.execute()
+
+    # Eski tablolar silinir, yeniler yerlerine taşınır
+    stale = [key async for key in redis.scan_iter(match="lb:*") if ":rebuild:" not in key]
+    async with redis.pipeline(transaction=True) as swap:
+        for key in stale:
+            if key not in temp_keys:
+                swap.delete(key)
+        for key in temp_keys:
+            swap.rename(key + suffix, key)
+            if key.startswith(TREND_PREFIX):
+                swap.expire(key, BUCKET_TTL_SECONDS)
+        swap.set(GLOBAL_MEAN_KEY, global_mean)
+        await swap.execute()
+
+    duration = round(time.perf_counter() - started, 3)
+    print(f"Liderlik tabloları yeniden kuruldu: {movie_count} film, {duration} sn.")
+    return {"movies": movie_count, "keys": len(temp_keys), "duration_seconds": duration}
@@ -0,0 +1,201 @@
+"""
+Başlık / yönetmen / oyuncu otomatik tamamlama için bellek içi önek indeksi.
+
+Normalize edilmiş anahtarlar sıralı bir listede tutulur; bir önek için eşleşen
+aralık iki `bisect` ile bulunur. Sonuçlar popülerliğe göre sıralanır:
+    film:   average_rating * log(1 + review_count)
+    kişi:   oynadığı/yönettiği filmlerin popülerlik toplamı
+Açılışta ve AUTOCOMPLETE_REBUILD_SECONDS'da bir baştan kurulur (puan değişimleri
+bu yolla gelir); film ekleme/güncelleme/silme anında yerel olarak işlenir.
+"""
+import asyncio
+import math
+import re
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+MAX_LIMIT = 20
+SCAN_LIMIT = 5000          # Bundan geniş aralıklar bir kez taranıp önbelleğe alınır
+TOP_CACHE_SIZE = 10_000
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text: str) -> str:
+    """'Ağır Roman' -> 'agir roman'. Türkçe ı/İ dahil aksanlar atılır, noktalama boşluğa döner."""
+    text = text.replace("ı", "i").replace("İ", "i")
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+def _suffix_keys(text: str) -> List[str]:
+    """Kelime başlarından başlayan tüm son ekler: 'the dark knight' -> ['the dark knight', 'dark knight', 'knight']."""
+    words = normalize(text).split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+def popularity(movie: dict) -> float:
+    return float(movie.get("average_rating") or 0.0) * math.log1p(movie.get("review_count") or 0)
+
+
+class AutocompleteIndex:
+    def __init__(self):
+        self._entries: List[Tuple[str, str]] = []          # (anahtar, ref), sıralı
+        self._suggestions: Dict[str, dict] = {}             # ref -> öneri
+        self._movies: Dict[str, tuple] = {}                 # movie_id -> (title, people, score)
+        self._people: Dict[str, Tuple[float, int]] = {}     # ref -> (skor toplamı, film sayısı)
+        self._top_cache: Dict[str, List[str]] = {}
+        self.built_at = 0.0
+
+    # --- Sorgu ---
+    def suggest(self, query: str, limit: int = 10) -> List[dict]:
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        limit = min(limit, MAX_LIMIT)
+
+        refs = self._top_cache.get(prefix)
+        if refs is None:
+            lo = bisect_left(self._entries, (prefix,))
+            hi = bisect_left(self._entries, (prefix + "\uffff",), lo)
+            candidates = {ref for _key, ref in self._entries[lo:hi]}
+            refs = sorted(candidates, key=lambda ref: self._suggestions[ref]["score"], reverse=True)[:MAX_LIMIT]
+            if hi - lo > SCAN_LIMIT:
+                if len(self._top_cache) >= TOP_CACHE_SIZE:
+                    self._top_cache.clear()
+                self._top_cache[prefix] = refs
+
+        return [self._suggestions[ref] for ref in refs[:limit]]
+
+    # --- Yazma ---
+    def upsert_movie(self, movie: dict) -> None:
+        movie_id = str(movie["_id"])
+        self.remove_movie(movie_id)
+
+        score = popularity(movie)
+        people = [("director", movie.get("director"))] + [("cast", name) for name in movie.get("cast") or []]
+        people = [(kind, name) for kind, name in people if name]
+
+        ref = f"m:{movie_id}"
+        self._suggestions[ref] = {"type": "movie", "text": movie["title"], "movie_id": movie_id, "score": round(score, 4)}
+        for key in _suffix_keys(movie["title"]):
+            insort(self._entries, (key, ref))
+
+        for kind, name in people:
+            self._add_person(kind, name, score)
+        self._movies[movie_id] = (movie["title"], tuple(people), score)
+        self._top_cache.clear()
+
+    def remove_movie(self, movie_id: str) -> None:
+        stored = self._movies.pop(movie_id, None)
+        if stored is None:
+            return
+        title, people, score = stored
+        ref = f"m:{movie_id}"
+        for key in _suffix_keys(title):
+            self._remove_entry(key, ref)
+        self._suggestions.pop(ref, None)
+        for kind, name in people:
+            self._remove_person(kind, name, score)
+        self._top_cache.clear()
+
+    def _add_person(self, kind: str, name: str, score: float) -> None:
+        ref = f"{kind[0]}:{normalize(name)}"
+        total, count = self._people.get(ref, (0.0, 0))
+        if count == 0:
+            self._suggestions[ref] = {"type": kind, "text": name, "movie_id": None, "score": 0.0}
+            for key in _suffix_keys(name):
+                insort(self._entries, (key, ref))
+        self._people[ref] = (total + score, count + 1)
+        self._suggestions[ref]["score"] = round(total + score, 4)
+
+    def _remove_person(self, kind: str, name: str, score: float) -> None:
+        ref = f"{kind[0]}:{normalize(name)}"
+        total, count = self._people.get(ref, (0.0, 0))
+        if count <= 1:
+            self._people.pop(ref, None)
+            self._suggestions.pop(ref, None)
+            for key in _suffix_keys(name):
+                self._remove_entry(key, ref)
+            return
+        self._people[ref] = (total - score, count - 1)
+        self._suggestions[ref]["score"] = round(total - score, 4)
+
+    def _remove_entry(self, key: str, ref: str) -> None:
+        i = bisect_left(self._entries, (key, ref))
+        if i < len(self._entries) and self._entries[i] == (key, ref):
+            del self._entries[i]
+
+    # --- Toplu Kurulum ---
+    @classmethod
+    def build(cls, movies: List[dict]) -> "AutocompleteIndex":
+        """Tek tek insort yerine tüm anahtarları toplayıp bir kez sıralar."""
+        index = cls()
+        for movie in movies:
+            movie_id = str(movie["_id"])
+            score = popularity(movie)
+            ref = f"m:{movie_id}"
+            index._suggestions[ref] = {"type": "movie", "text": movie["title"], "movie_id": movie_id, "score": round(score, 4)}
+            index._entries.extend((key, ref) for key in _suffix_keys(movie["title"]))
+
+            people = [("director", movie.get("director"))] + [("cast", name) for name in movie.get("cast") or []]
+            people = tuple((kind, name) for kind, name in people if name)
+            for kind, name in people:
+                person_ref = f"{kind[0]}:{normalize(name)}"
+                total, count = index._people.get(person_ref, (0.0, 0))
+                if count == 0:
+                    index._suggestions[person_ref] = {"type": kind, "text": name, "movie_id": None, "score": 0.0}
+                    index._entries.extend((key, person_ref) for key in _suffix_keys(name))
+                index._people[person_ref] = (total + score, count + 1)
+            index._movies[movie_id] = (movie["title"], people, score)
+
+        for ref, (total, _count) in index._people.items():
+            index._suggestions[ref]["score"] = round(total, 4)
+        index._entries.sort()
+        index.built_at = time.time()
+        return index
+
+    def replace_with(self, other: "AutocompleteIndex") -> None:
+        self._entries, self._suggestions, self._movies = other._entries, other._suggestions, other._movies
+        self._people, self._top_cache, self.built_at = other._people, {}, other.built_at
+
+
+async def rebuild(db) -> None:
+    """Mongo'dan baştan kurar; sıralama CPU işi olduğu için thread'de yapılır."""
+    started = time.perf_counter()
+    movies = await db["movies"].find(
+        {}, {"title": 1, "director": 1, "cast": 1, "average_rating": 1, "review_count": 1}
+    ).batch_size(5000).to_list(length=None)
+    fresh = await run_in_threadpool(AutocompleteIndex.build, movies)
+    autocomplete_index.replace_with(fresh)
+    print(f"Otomatik tamamlama indeksi kuruldu: {len(movies)} film, {time.perf_counter() - started:.2f} sn.")
+
+
+async def keep_fresh(db) -> None:
+    """Açılışta kurar, sonra periyodik olarak yeniler (puan değişimleri, diğer süreçlerin yazmaları)."""
+    while True:
+        try:
+            await rebuild(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Otomatik tamamlama indeksi kurulamadı: {e}")
+        await asyncio.sleep(settings.AUTOCOMPLETE_REBUILD_SECONDS)
+
+
+# Süreç başına tek indeks
+autocomplete_index = AutocompleteIndex()
+
+
+def record_movie_write(movie: Optional[dict] = None, deleted_id: Optional[str] = None) -> None:
+    """Film yazma endpoint'lerinden çağrılır; bu süreçteki indeks anında güncellenir."""
+    if deleted_id:
+        autocomplete_index.remove_movie(deleted_id)
+    elif movie and movie.get("title"):
+        autocomplete_index.upsert_movie(movie)
@@ -0,0 +1,157 @@
+"""
+Tür / yıl / yönetmen için materyalize edilmiş film sayıları.
+
+Sayaçlar `movie_facets` koleksiyonunda tutulur ({_id: "genre:Drama", facet,
+value, count}). Film yazmaları sadece eski ve yeni halin farkını $inc ile
+uygular; tüm koleksiyon üzerinde $group sadece periyodik uzlaştırmada çalışır.
+"""
+import hashlib
+import json
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from pymongo import ReplaceOne, UpdateOne
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.metrics import record_cache_lookup
+from app.core.redis import get_cache_version, get_redis
+
+FACETS_COLLECTION = "movie_facets"
+FACET_FIELDS = ("genre", "year", "director")
+
+
+def _facet_values(movie: Optional[dict]) -> Counter:
+    """Bir filmin katkı verdiği (facet, değer) çiftleri."""
+    values: Counter = Counter()
+    if not movie:
+        return values
+    for genre in set(movie.get("genre") or []):
+        values[("genre", genre)] += 1
+    if movie.get("year") is not None:
+        values[("year", movie["year"])] += 1
+    if movie.get("director"):
+        values[("director", movie["director"])] += 1
+    return values
+
+
+def _facet_id(facet: str, value) -> str:
+    return f"{facet}:{value}"
+
+
+async def apply_movie_change(db, before: Optional[dict], after: Optional[dict]) -> None:
+    """
+    Ekleme (before=None), silme (after=None) veya güncellemede sadece değişen
+    sayaçları tek bulk_write ile günceller. Tür listesi değişmediyse hiç yazma olmaz.
+    """
+    delta = _facet_values(after)
+    delta.subtract(_facet_values(before))
+
+    operations = [
+        UpdateOne(
+            {"_id": _facet_id(facet, value)},
+            # Uzlaştırma sırasında eklenen değer o turun temizliğinde silinmesin
+            {"$inc": {"count": change}, "$setOnInsert": {"facet": facet, "value": value, "reconciled_at": datetime.utcnow()}},
+            upsert=True,
+        )
+        for (facet, value), change in delta.items()
+        if change
+    ]
+    if operations:
+        await db[FACETS_COLLECTION].bulk_write(operations, ordered=False)
+
+
+async def get_facets(db, facets: Iterable[str] = FACET_FIELDS, limit: int = 50) -> Dict[str, List[dict]]:
+    """Her facet için en çok filme sahip `limit` değer (count > 0)."""
+    result = {}
+    for facet in facets:
+        cursor = db[FACETS_COLLECTION].find(
+            {"facet": facet, "count": {"$gt": 0}}, {"_id": 0, "value": 1, "count": 1}
+        ).sort("count", -1).limit(limit)
+        result[facet] = await cursor.to_list(length=limit)
+    return result
+
+
+FACET_PIPELINES = {
+    "genre": [{"$unwind": "$genre"}, {"$group": {"_id": "$genre", "count": {"$sum": 1}}}],
+    "year": [{"$group": {"_id": "$year", "count": {"$sum": 1}}}],
+    "director": [{"$group": {"_id": "$director", "count": {"$sum": 1}}}],
+}
+RECONCILE_WRITE_BATCH = 1000
+
+
+async def reconcile_facets(db) -> int:
+    """
+    Sayaçları movies koleksiyonundan baştan hesaplar. Artımlı güncellemelerde
+    oluşabilecek kaymayı (yarış, elle yapılan DB değişiklikleri, toplu import) düzeltir.
+
+    Her facet ayrı bir $group ile hesaplanır ve sonuç cursor'dan akıtılarak
+    parça parça yazılır. Tek $facet aşaması sonucu tek dokümana (16 MB sınırı)
+    sığdırmak zorundaydı; milyon filmlik katalogda yönetmen listesi bunu aşar.
+    """
+    started_at = datetime.utcnow()
+    collection = db[FACETS_COLLECTION]
+    written = 0
+    operations: List[ReplaceOne] = []
+
+    for facet in FACET_FIELDS:
+        cursor = db.movies.aggregate(FACET_PIPELINES[facet], allowDiskUse=True, batchSize=RECONCILE_WRITE_BATCH)
+        async for row in cursor:
+            if row["_id"] is None:
+                continue
+            operations.append(ReplaceOne(
+                {"_id": _facet_id(facet, row["_id"])},
+                {"facet": facet, "value": row["_id"], "count": row["count"], "reconciled_at": started_at},
+                upsert=True,
+            ))
+            if len(operations) >= RECONCILE_WRITE_BATCH:
+                await collection.bulk_write(operations, ordered=False)
+                written += len(operations)
+                operations = []
+    if operations:
+        await collection.bulk_write(operations, ordered=False)
+        written += len(operations)
+
+    # Bu turda görülmeyen değerler artık hiçbir filmde yok (tüm yazmalardan sonra)
+    await collection.delete_many({"reconciled_at": {"$lt": started_at}})
+    print(f"Facet sayaçları uzlaştırıldı: {written} değer.")
+    return written
+
+
+async def total_count(db, query: dict) -> int:
+    """
+    Filtreli listeleme için toplam film sayısı (X-Total-Count).
+    Tek tür/yıl filtresi facet sayacından okunur; diğer filtrelerin sonucu
+    cache versiyonuna bağlı olarak Redis'te kısa süre tutulur.
+    """
+    if not query:
+        return await db.movies.estimated_document_count()
+
+    if len(query) == 1:
+        (field, value), = query.items()
+        if field in ("genre", "year") and not isinstance(value, dict):
+            facet = await db[FACETS_COLLECTION].find_one({"_id": _facet_id(field, value)}, {"count": 1})
+            return max(facet["count"], 0) if facet else 0
+
+    redis = get_redis()
+    cache_key = None
+    if redis:
+        version = await get_cache_version()
+        query_hash = hashlib.md5(json.dumps(query, sort_keys=True, default=str).encode()).hexdigest()
+        cache_key = f"movie_count:{version}:{query_hash}"
+        try:
+            cached = await redis.get(cache_key)
+            record_cache_lookup("movie_count", cached is not None)
+            if cached is not None:
+                return int(cached)
+        except RedisError:
+            cache_key = None
+
+    count = await db.movies.count_documents(query)
+    if cache_key:
+        try:
+            await redis.set(cache_key, count, ex=settings.TOTAL_COUNT_CACHE_SECONDS)
+        except RedisError:
+            pass
+    return count
@@ -0,0 +1,63 @@
+"""
+Seyrek alan seçimi (`fields=title,year,poster_url`) için yardımcılar.
+
+İstenen alanlar MovieDB şemasına göre doğrulanır, Mongo projeksiyonuna çevrilir
+ve yanıt, sadece bu alanları içeren (önbellekli) bir alt model ile serileştirilir.
+Böylece hem Mongo'dan gelen veri hem de JSON yükü küçülür.
+"""
+from functools import lru_cache
+from typing import List, Optional, Tuple, Type
+
+from fastapi import Response
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+
+from .schemas import MovieDB
+
+SELECTABLE_FIELDS = tuple(MovieDB.model_fields)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """'title, year' -> ('title', 'year'). Bilinmeyen alan varsa ValueError."""
+    if not fields:
+        return None
+    selected = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in selected if name not in SELECTABLE_FIELDS]
+    if unknown:
+        raise ValueError(
+            f"Bilinmeyen alan(lar): {', '.join(unknown)}. Geçerli alanlar: {', '.join(SELECTABLE_FIELDS)}"
+        )
+    return selected or None
+
+
+def projection_for(selected: Tuple[str, ...]) -> dict:
+    # `id` alanı Mongo'da `_id`; _id zaten her zaman döner
+    return {name: 1 for name in selected if name != "id"}
+
+
+@lru_cache(maxsize=256)
+def subset_model(selected: Tuple[str, ...]) -> Type[BaseModel]:
+    """MovieDB'nin sadece seçili alanlarını (tip, alias ve doğrulamalarıyla) içeren model."""
+    definitions = {name: (MovieDB.model_fields[name].annotation, MovieDB.model_fields[name]) for name in selected}
+    return create_model(
+        "MovieFields",
+        __config__=ConfigDict(populate_by_name=True),
+        **definitions,
+    )
+
+
+@lru_cache(maxsize=256)
+def _list_adapter(selected: Tuple[str, ...]) -> TypeAdapter:
+    return TypeAdapter(List[subset_model(selected)])
+
+
+def subset_response(selected: Tuple[str, ...], data) -> Response:
+    """
+    Tek film (dict) veya film listesi için JSON yanıtı. Endpoint'in tam MovieDB
+    response_model'i atlanır; aksi halde eksik zorunlu alanlar doğrulamayı düşürürdü.
+    """
+    if isinstance(data, list):
+        content = _list_adapter(selected).dump_json(_list_adapter(selected).validate_python(data), by_alias=True)
+    else:
+        model = subset_model(selected)
+        content = model.model_validate(data).model_dump_json(by_alias=True)
+    return Response(content=content, media_type="application/json")
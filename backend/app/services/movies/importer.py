@@ -0,0 +1,223 @@
+import asyncio
+import csv
+import json
+import time
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from app.core.embeddings import current_embedding_model, generate_embeddings, movie_embedding_text
+from app.core.redis import increment_cache_version
+from .jobs import enqueue_facet_reconcile, enqueue_similar_rebuild
+from .schemas import MovieCreate, MovieImportReport, ImportRowError
+
+# Rapor belleği sınırlı kalsın diye en fazla bu kadar satır hatası döndürülür
+MAX_REPORTED_ERRORS = 1000
+CSV_LIST_SEPARATOR = "|"
+CSV_LIST_FIELDS = {"genre", "cast", "similar_movies"}
+
+
+# --- Akış Ayrıştırıcılar ---
+INVALID_UTF8 = "Geçersiz UTF-8 kodlaması."
+
+
+def _decode_line(line: bytes) -> Optional[str]:
+    try:
+        return line.decode("utf-8-sig").rstrip("\r")
+    except UnicodeDecodeError:
+        return None
+
+
+async def _iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[Optional[str]]:
+    """
+    Request gövdesini tamamını belleğe almadan satır satır okur.
+    UTF-8 olmayan satır için None üretilir; çağıran satır hatası olarak raporlar.
+    """
+    buffer = b""
+    async for chunk in stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield _decode_line(line)
+    if buffer:
+        yield _decode_line(buffer)
+
+
+async def iter_ndjson_rows(stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """(satır no, kayıt, hata) üçlüleri üretir; boş satırlar atlanır."""
+    row_number = 0
+    async for line in _iter_lines(stream):
+        if line is None:
+            row_number += 1
+            yield row_number, None, INVALID_UTF8
+            continue
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, None, f"Geçersiz JSON: {e.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield row_number, None, "Her satır bir JSON nesnesi olmalı."
+            continue
+        yield row_number, record, None
+
+
+async def iter_csv_rows(stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """
+    Başlık satırlı CSV okur. Tırnak içinde satır sonu olan alanlar için
+    çift tırnak sayısı dengelenene kadar satırlar birleştirilir.
+    Liste alanları (genre, cast) `|` ile ayrılır.
+    """
+    header: Optional[List[str]] = None
+    pending = ""
+    row_number = 0
+
+    async for line in _iter_lines(stream):
+        if line is None:
+            # Yarım kalan tırnaklı kayıt da bu satırla birlikte geçersiz sayılır
+            pending = ""
+            row_number += 1
+            yield row_number, None, INVALID_UTF8
+            continue
+        pending = f"{pending}\n{line}" if pending else line
+        if pending.count('"') % 2:
+            continue
+        record_line, pending = pending, ""
+        if not record_line.strip():
+            continue
+
+        values = next(csv.reader([record_line]))
+        if header is None:
+            header = [column.strip() for column in values]
+            continue
+
+        row_number += 1
+        if len(values) != len(header):
+            yield row_number, None, f"Sütun sayısı başlıkla uyuşmuyor ({len(values)} != {len(header)})."
+            continue
+
+        record = {}
+        for column, value in zip(header, values):
+            value = value.strip()
+            if value == "":
+                continue
+            if column in CSV_LIST_FIELDS:
+                record[column] = [item.strip() for item in value.split(CSV_LIST_SEPARATOR) if item.strip()]
+            else:
+                record[column] = value
+        yield row_number, record, None
+
+    if pending.strip():
+        yield row_number + 1, None, "Kapanmamış tırnak ile biten satır."
+
+
+def _format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in exc.errors())
+
+
+# --- İçe Aktarma ---
+class MovieImporter:
+    """
+    Satırları chunk'lar halinde MovieCreate ile doğrular, açıklamaları batch
+    halinde embed eder ve sırasız `insert_many` ile yazar. Bir chunk yazılırken
+    sonraki chunk'ın embedding'i hesaplanır. Cache versiyonu iş sonunda bir kez artırılır.
+    """
+
+    def __init__(self, db, chunk_size: int = 1000, embed: bool = True):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.embed = embed
+        self.report = MovieImportReport()
+        self._pending_write: Optional[asyncio.Task] = None
+
+    def _add_error(self, row: int, error: str) -> None:
+        self.report.failed += 1
+        if len(self.report.errors) < MAX_REPORTED_ERRORS:
+            self.report.errors.append(ImportRowError(row=row, error=error))
+        else:
+            self.report.errors_truncated = True
+
+    async def run(self, rows: AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]) -> MovieImportReport:
+        started = time.perf_counter()
+        chunk: List[Tuple[int, dict]] = []
+
+        async for row_number, record, error in rows:
+            self.report.total_rows += 1
+            if error:
+                self._add_error(row_number, error)
+                continue
+            chunk.append((row_number, record))
+            if len(chunk) >= self.chunk_size:
+                await self._process_chunk(chunk)
+                chunk = []
+
+        if chunk:
+            await self._process_chunk(chunk)
+        if self._pending_write:
+            await self._pending_write
+
+        if self.report.inserted:
+            await increment_cache_version()
+            await enqueue_facet_reconcile()
+            if self.embed:
+                # Toplu eklemede film başına artımlı güncelleme yerine tek tam hesaplama
+                await enqueue_similar_rebuild()
+
+        self.report.duration_seconds = round(time.perf_counter() - started, 3)
+        return self.report
+
+    async def _process_chunk(self, chunk: List[Tuple[int, dict]]) -> None:
+        row_numbers: List[int] = []
+        documents: List[dict] = []
+        # Tek saat (UTC): vector_index.sync ve yeniden embed işi embedding_updated_at'i UTC ile karşılaştırır
+        created_at = datetime.utcnow()
+
+        for row_number, record in chunk:
+            try:
+                movie = MovieCreate.model_validate(record)
+            except ValidationError as e:
+                self._add_error(row_number, _format_validation_error(e))
+                continue
+            document = jsonable_encoder(movie)
+            document["created_at"] = created_at
+            document["rating_sum"] = 0
+            document["review_count"] = 0
+            row_numbers.append(row_number)
+            documents.append(document)
+
+        if not documents:
+            return
+
+        if self.embed:
+            texts = [movie_embedding_text(document) for document in documents]
+            vectors = await run_in_threadpool(generate_embeddings, texts)
+            for document, vector in zip(documents, vectors):
+                document["embedding"] = vector
+                document["embedding_model"] = current_embedding_model()
+                document["embedding_updated_at"] = created_at
+
+        # Önceki chunk'ın yazımı bitmeden yenisini başlatma (en fazla bir yazım havada)
+        if self._pending_write:
+            await self._pending_write
+        self._pending_write = asyncio.create_task(self._write(row_numbers, documents))
+
+    async def _write(self, row_numbers: List[int], documents: List[dict]) -> None:
+        try:
+            result = await self.db["movies"].insert_many(documents, ordered=False)
+            self.report.inserted += len(result.inserted_ids)
+        except BulkWriteError as e:
+            self.report.inserted += e.details.get("nInserted", 0)
+            for write_error in e.details.get("writeErrors", []):
+                self._add_error(row_numbers[write_error["index"]], write_error.get("errmsg", "Yazma hatası"))
+        except PyMongoError as e:
+            # Ağ hatası / zaman aşımı: chunk'ın yazılıp yazılmadığı bilinmez, satırlar başarısız
+            # sayılır; hata sonraki chunk'ın await'inden sızıp tüm raporu kaybettirmez
+            for row_number in row_numbers:
+                self._add_error(row_number, f"Yazma hatası: {e}")
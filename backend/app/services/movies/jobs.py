@@ -0,0 +1,239 @@
+import asyncio
+from datetime import datetime
+from typing import Optional
+
+from bson import ObjectId
+from fastapi.concurrency import run_in_threadpool
+from pymongo import UpdateOne
+
+from app.core.config import settings
+from app.core.database import get_database
+from app.core.embeddings import (
+    LEGACY_EMBEDDING_MODEL,
+    current_embedding_model,
+    generate_embedding,
+    generate_embeddings,
+    movie_embedding_text,
+)
+from app.core.jobs import enqueue_job, job_handler
+from app.core.redis import get_redis, increment_cache_version
+from .facets import reconcile_facets
+from .similar import rebuild_similar_movies, refresh_similar_for_movie
+
+# --- Türetilmiş Veri İşleri (Filmler) ---
+EMBED_MOVIE = "embed_movie"
+INVALIDATE_CACHE = "invalidate_cache"
+REFRESH_SIMILAR = "refresh_similar"
+REBUILD_SIMILAR = "rebuild_similar"
+RECONCILE_FACETS = "reconcile_facets"
+REEMBED_MOVIES = "reembed_movies"
+
+# Bu alanlardan biri değişirse filmin embedding'i yeniden hesaplanır
+EMBEDDING_SOURCE_FIELDS = {"title", "director", "genre", "description"}
+
+
+@job_handler(INVALIDATE_CACHE)
+async def invalidate_cache_job(payload: dict):
+    await increment_cache_version()
+
+
+@job_handler(EMBED_MOVIE)
+async def embed_movie_job(payload: dict):
+    """Filmin güncel metninden embedding üretir; film silinmişse sessizce biter."""
+    db = await get_database()
+    movie = await db["movies"].find_one(
+        {"_id": ObjectId(payload["movie_id"])},
+        {"title": 1, "director": 1, "genre": 1, "description": 1}
+    )
+    if not movie:
+        return
+
+    # ONNX çıkarımı CPU'ya bağlı; event loop'u bloklamasın
+    vector = await run_in_threadpool(generate_embedding, movie_embedding_text(movie))
+    await db["movies"].update_one(
+        {"_id": movie["_id"]},
+        {"$set": {"embedding": vector, "embedding_model": current_embedding_model(), "embedding_updated_at": datetime.utcnow()}}
+    )
+
+    # Semantik arama sonuçları ve komşuluklar değişti
+    await enqueue_cache_invalidation()
+    await enqueue_similar_refresh(payload["movie_id"])
+
+
+@job_handler(REFRESH_SIMILAR)
+async def refresh_similar_job(payload: dict):
+    """Film eklendi/değişti/silindi; sadece etkilenen benzer film listeleri yenilenir."""
+    await refresh_similar_for_movie(await get_database(), payload["movie_id"])
+
+
+@job_handler(REBUILD_SIMILAR)
+async def rebuild_similar_job(payload: dict):
+    await rebuild_similar_movies(await get_database())
+
+
+@job_handler(RECONCILE_FACETS)
+async def reconcile_facets_job(payload: dict):
+    await reconcile_facets(await get_database())
+
+
+REEMBED_CHECKPOINT_PREFIX = "reembed:checkpoint:"
+REEMBED_CHECKPOINT_TTL_SECONDS = 7 * 24 * 3600
+
+
+async def _load_reembed_checkpoint(model: str) -> Optional[ObjectId]:
+    redis = get_redis()
+    if not redis:
+        return None
+    try:
+        last_id = await redis.get(f"{REEMBED_CHECKPOINT_PREFIX}{model}")
+    except Exception as e:
+        print(f"Yeniden embed checkpoint'i okunamadı: {e}")
+        return None
+    return ObjectId(last_id) if last_id else None
+
+
+async def _save_reembed_checkpoint(model: str, last_id: Optional[ObjectId]) -> None:
+    """last_id None ise checkpoint silinir (iş bitti)."""
+    redis = get_redis()
+    if not redis:
+        return
+    key = f"{REEMBED_CHECKPOINT_PREFIX}{model}"
+    try:
+        if last_id is None:
+            await redis.delete(key)
+        else:
+            await redis.set(key, str(last_id), ex=REEMBED_CHECKPOINT_TTL_SECONDS)
+    except Exception as e:
+        print(f"Yeniden embed checkpoint'i yazılamadı: {e}")
+
+
+async def _reembed_pass(db, model: str, last_id: Optional[ObjectId]) -> int:
+    """
+    Koleksiyonu `_id` sırasıyla bir kez dolaşır; her batch `_id > last_id` ile
+    başladığı için işlenmiş dokümanlar tekrar taranmaz (toplam maliyet doğrusal).
+    Her batch sonrası last_id Redis'e yazılır.
+    """
+    batch_size = settings.EMBEDDING_REEMBED_BATCH
+    total = 0
+    while True:
+        query = {"embedding_model": {"$ne": model}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        movies = await db["movies"].find(
+            query, {"title": 1, "director": 1, "genre": 1, "description": 1}
+        ).sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+        if not movies:
+            return total
+
+        vectors = await run_in_threadpool(generate_embeddings, [movie_embedding_text(m) for m in movies], batch_size)
+        now = datetime.utcnow()
+        await db["movies"].bulk_write([
+            UpdateOne(
+                {"_id": movie["_id"]},
+                {"$set": {"embedding": vector, "embedding_model": model, "embedding_updated_at": now}}
+            )
+            for movie, vector in zip(movies, vectors)
+        ], ordered=False)
+        total += len(movies)
+        last_id = movies[-1]["_id"]
+        await _save_reembed_checkpoint(model, last_id)
+
+
+@job_handler(REEMBED_MOVIES)
+async def reembed_movies_job(payload: dict):
+    """
+    Embedding'i başka modelle üretilmiş (veya hiç olmayan) filmleri EMBEDDING_REEMBED_BATCH'lik
+    gruplar halinde `_id` sırasıyla yeniden embed eder. İlerleme (son `_id`) Redis'te
+    tutulur; iş yarıda kalırsa (yeniden deneme, süreç yeniden başlatma) kaldığı yerden devam eder.
+    """
+    model = current_embedding_model()
+    if payload.get("model") != model:
+        print(f"Yeniden embed işi atlandı: iş {payload.get('model')} için, bu worker {model} kullanıyor.")
+        return
+
+    db = await get_database()
+    checkpoint = await _load_reembed_checkpoint(model)
+    total = await _reembed_pass(db, model, checkpoint)
+    # Checkpoint eski bir çalışmadan kalmış olabilir (ör. model arada değişip geri döndü);
+    # gerisinde kalan eski vektör varsa baştan bir tur daha
+    if checkpoint is not None and await db["movies"].count_documents({"embedding_model": {"$ne": model}}, limit=1):
+        total += await _reembed_pass(db, model, None)
+    await _save_reembed_checkpoint(model, None)
+
+    print(f"Yeniden embed tamamlandı ({model}): {total} film.")
+    if total:
+        await enqueue_cache_invalidation()
+        await enqueue_similar_rebuild()
+
+
+async def _reembed_in_background(payload: dict) -> None:
+    try:
+        await reembed_movies_job(payload)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"Yeniden embed (arka plan) başarısız: {e}")
+
+
+async def _queue_available() -> bool:
+    redis = get_redis()
+    if not redis:
+        return False
+    try:
+        await redis.ping()
+        return True
+    except Exception:
+        return False
+
+
+async def ensure_current_embeddings(db) -> Optional[asyncio.Task]:
+    """
+    Açılışta çağrılır. `embedding_model` alanı olmayan eski vektörleri LEGACY modeline
+    etiketler; seçili modelden farklı vektörü olan film varsa yeniden embed işini kuyruğa atar.
+    Redis yoksa iş inline çalışıp açılışı bekletmesin diye arka plan task'ı olarak
+    başlatılır ve döndürülür (lifespan kapanışta iptal eder).
+    """
+    await db["movies"].update_many(
+        {"embedding": {"$exists": True}, "embedding_model": {"$exists": False}},
+        {"$set": {"embedding_model": LEGACY_EMBEDDING_MODEL}}
+    )
+    model = current_embedding_model()
+    stale = await db["movies"].count_documents({"embedding_model": {"$ne": model}}, limit=1)
+    if not stale or not settings.EMBEDDING_REEMBED_ON_CHANGE:
+        return None
+
+    print(f"Embedding modeli {model}: eski vektörlü filmler yeniden embed edilecek.")
+    payload = {"model": model}
+    if await _queue_available():
+        await enqueue_job(REEMBED_MOVIES, payload, key=f"reembed:{model}")
+        return None
+    print("Redis erişilemiyor; yeniden embed bu süreçte arka planda çalışacak.")
+    return asyncio.create_task(_reembed_in_background(payload))
+
+
+async def enqueue_cache_invalidation():
+    """Art arda gelen yazmalar tek bir versiyon artışına iner."""
+    await enqueue_job(INVALIDATE_CACHE, {}, key="cache:invalidate")
+
+
+async def enqueue_movie_embedding(movie_id: str):
+    await enqueue_job(EMBED_MOVIE, {"movie_id": movie_id}, key=f"embed:{movie_id}")
+
+
+async def enqueue_similar_refresh(movie_id: str):
+    await enqueue_job(REFRESH_SIMILAR, {"movie_id": movie_id}, key=f"similar:{movie_id}")
+
+
+async def enqueue_similar_rebuild() -> bool:
+    return await enqueue_job(REBUILD_SIMILAR, {}, key="similar:rebuild")
+
+
+async def enqueue_facet_reconcile() -> bool:
+    return await enqueue_job(RECONCILE_FACETS, {}, key="facets:reconcile")
+
+
+async def schedule_facet_reconciliation() -> None:
+    """Her API sürecinden periyodik olarak iş bırakır; dedupe anahtarı tek bir çalışmaya indirir."""
+    while True:
+        await enqueue_facet_reconcile()
+        await asyncio.sleep(settings.FACETS_RECONCILE_SECONDS)
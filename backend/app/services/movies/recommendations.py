@@ -0,0 +1,208 @@
+"""
+Yorum geçmişinden kişisel film önerisi.
+
+Kullanıcının zevk vektörü, yorumladığı filmlerin embedding'lerinin puana göre
+ağırlıklı toplamıdır (beğenmediği filmler negatif ağırlıkla uzaklaştırır).
+Vektör Redis'te tutulur ve her yorum yazımında artımlı güncellenir; öneri
+isteği LLM çağırmadan süreç içi vektör indeksi üzerinde tek bir top-k yapar.
+"""
+import base64
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from bson import ObjectId
+from fastapi.concurrency import run_in_threadpool
+from redis.exceptions import RedisError, WatchError
+
+from app.core.config import settings
+from app.core.embeddings import current_embedding_model
+from app.core.redis import get_redis
+from .vector_index import vector_index
+
+TASTE_PREFIX = "taste:"
+VECTOR_FIELD = "vector"
+MODEL_FIELD = "model"          # Vektörü üreten embedding modeli
+MOVIE_FIELD_PREFIX = "m:"      # m:<movie_id> -> vektöre uygulanmış ağırlık
+PENDING_FIELD_PREFIX = "p:"    # p:<movie_id> -> filmin vektörü indekste olmadığı için uygulanmamış ağırlık
+RATING_CENTER = 5.5            # 1-10 ölçeğinin ortası; altı negatif ağırlık
+RATING_SPREAD = 4.5
+
+
+def rating_weight(rating: Optional[int]) -> float:
+    """1 → -1.0, 10 → +1.0; yorum yoksa 0."""
+    if rating is None:
+        return 0.0
+    return (rating - RATING_CENTER) / RATING_SPREAD
+
+
+def _encode(vector: np.ndarray) -> str:
+    # İstemci decode_responses=True; ham byte yerine base64 metin saklanır
+    return base64.b64encode(vector.astype(np.float32).tobytes()).decode("ascii")
+
+
+def _decode(value: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(value), dtype=np.float32).copy()
+
+
+def _taste_key(user_id: str) -> str:
+    return f"{TASTE_PREFIX}{user_id}"
+
+
+def _weighted_sum(weights: Dict[str, float]) -> Tuple[np.ndarray, Dict[str, float]]:
+    """
+    (vektör, uygulanan ağırlıklar). İndekste vektörü olmayan filmin ağırlığı
+    uygulanmış sayılmaz; film sonradan embed edilince apply_review_change onu
+    0'dan eksiksiz ekler.
+    """
+    snapshot = vector_index.snapshot()
+    vector = np.zeros(snapshot.dim or 0, dtype=np.float32)
+    applied = {}
+    for movie_id, weight in weights.items():
+        movie_vector = snapshot.vector_of(ObjectId(movie_id))
+        if movie_vector is None:
+            continue
+        vector += weight * movie_vector
+        applied[movie_id] = weight
+    return vector, applied
+
+
+async def _build_taste(db, user_id: str) -> Tuple[np.ndarray, Dict[str, float]]:
+    """Zevk vektörünü Mongo'daki yorumlardan baştan kurar ve Redis'e yazar."""
+    reviews = await db.reviews.find({"user_id": user_id}, {"movie_id": 1, "rating": 1}).to_list(length=None)
+    all_weights = {review["movie_id"]: rating_weight(review["rating"]) for review in reviews}
+    vector, weights = _weighted_sum(all_weights)
+    pending = {movie_id: weight for movie_id, weight in all_weights.items() if movie_id not in weights}
+
+    redis = get_redis()
+    if redis:
+        key = _taste_key(user_id)
+        mapping = {VECTOR_FIELD: _encode(vector), MODEL_FIELD: current_embedding_model()}
+        mapping.update({f"{MOVIE_FIELD_PREFIX}{movie_id}": weight for movie_id, weight in weights.items()})
+        mapping.update({f"{PENDING_FIELD_PREFIX}{movie_id}": weight for movie_id, weight in pending.items()})
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                pipe.hset(key, mapping=mapping)
+                pipe.expire(key, settings.RECOMMENDATION_TASTE_TTL_SECONDS)
+                await pipe.execute()
+        except RedisError as e:
+            print(f"Zevk vektörü Redis'e yazılamadı: {e}")
+    return vector, all_weights
+
+
+async def get_taste(db, user_id: str) -> Tuple[np.ndarray, Dict[str, float]]:
+    """
+    (zevk vektörü, yorumlanan tüm filmler {movie_id: ağırlık}); Redis'te yoksa,
+    bayatsa veya bekleyen (vektörsüz) filmlerden biri artık indekste ise yeniden kurulur.
+    """
+    redis = get_redis()
+    cached = {}
+    if redis:
+        try:
+            cached = await redis.hgetall(_taste_key(user_id))
+        except RedisError:
+            cached = {}
+
+    if cached.get(VECTOR_FIELD):
+        vector = _decode(cached[VECTOR_FIELD])
+        # Embedding modeli değiştiyse önbellek geçersiz
+        if vector.shape[0] == vector_index.dim and cached.get(MODEL_FIELD) == current_embedding_model():
+            weights = {
+                field[len(MOVIE_FIELD_PREFIX):]: float(value)
+                for field, value in cached.items()
+                if field.startswith(MOVIE_FIELD_PREFIX)
+            }
+            pending = {
+                field[len(PENDING_FIELD_PREFIX):]: float(value)
+                for field, value in cached.items()
+                if field.startswith(PENDING_FIELD_PREFIX)
+            }
+            if not any(vector_index.vector_of(ObjectId(movie_id)) is not None for movie_id in pending):
+                return vector, {**pending, **weights}
+
+    return await _build_taste(db, user_id)
+
+
+async def apply_review_change(db, user_id: str, movie_id: str) -> None:
+    """
+    Bir yorum eklendi/değişti/silindi: vektöre sadece fark (yeni ağırlık - uygulanmış
+    ağırlık) eklenir. Hedef ağırlık yorumun Mongo'daki güncel halinden okunur; bu
+    yüzden iş tekrar çalışsa veya sırası karışsa da sonuç aynıdır.
+    Önbellekte vektör yoksa yapılacak bir şey yoktur; ilk istek baştan kurar.
+    """
+    redis = get_redis()
+    if not redis:
+        return
+
+    vector_index.refresh_in_background(db)
+    movie_vector = vector_index.vector_of(ObjectId(movie_id))
+    review = await db.reviews.find_one({"movie_id": movie_id, "user_id": user_id}, {"rating": 1})
+    target = rating_weight(review["rating"]) if review else 0.0
+
+    key = _taste_key(user_id)
+    field = f"{MOVIE_FIELD_PREFIX}{movie_id}"
+
+    for _ in range(5):
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                await pipe.watch(key)
+                encoded, applied, model = await pipe.hmget(key, VECTOR_FIELD, field, MODEL_FIELD)
+                if encoded is None:
+                    return
+                applied = float(applied or 0.0)
+                if math.isclose(applied, target):
+                    return
+
+                if movie_vector is None:
+                    # Filmin vektörü yok (henüz embed edilmedi): önbellek düşürülür
+                    pipe.multi()
+                    pipe.delete(key)
+                    await pipe.execute()
+                    return
+
+                vector = _decode(encoded)
+                if vector.shape[0] != movie_vector.shape[0] or model != current_embedding_model():
+                    pipe.multi()
+                    pipe.delete(key)
+                    await pipe.execute()
+                    return
+                vector += (target - applied) * movie_vector
+
+                pipe.multi()
+                pipe.hset(key, VECTOR_FIELD, _encode(vector))
+                pipe.hdel(key, f"{PENDING_FIELD_PREFIX}{movie_id}")  # Artık vektöre uygulandı
+                if review:
+                    pipe.hset(key, field, target)
+                else:
+                    pipe.hdel(key, field)
+                await pipe.execute()
+                return
+        except WatchError:
+            continue  # Aynı kullanıcı için eşzamanlı başka güncelleme; tekrar dene
+
+
+async def recommend_movie_ids(db, user_id: str, limit: int) -> List[ObjectId]:
+    """Zevk vektörüne en yakın, kullanıcının henüz yorumlamadığı filmler (sıralı)."""
+    vector_index.refresh_in_background(db)
+    if not vector_index.size:
+        return []
+
+    vector, weights = await get_taste(db, user_id)
+    if not np.any(vector):
+        return []
+
+    seen = {ObjectId(movie_id) for movie_id in weights}
+    # N×d matris çarpımı event loop'u bloklamasın (search.py ile aynı)
+    hits = await run_in_threadpool(vector_index.search, vector, limit, seen)
+    return [oid for oid, _score in hits]
+
+
+async def popular_movie_ids(db, user_id: str, limit: int) -> List[ObjectId]:
+    """Soğuk başlangıç: yorumu olmayan kullanıcıya en yüksek puanlı filmler."""
+    seen = await db.reviews.distinct("movie_id", {"user_id": user_id})
+    movies = await db.movies.find(
+        {"_id": {"$nin": [ObjectId(movie_id) for movie_id in seen]}, "review_count": {"$gt": 0}},
+        {"_id": 1}
+    ).sort([("average_rating", -1), ("review_count", -1)]).limit(limit).to_list(length=limit)
+    return [movie["_id"] for movie in movies]
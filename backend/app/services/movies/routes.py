@@ -1,30 +1,69 @@
-from fastapi import APIRouter, HTTPException, Body, status, Depends, Query
-from fastapi.encoders import jsonable_encoder
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Body, status, Depends, Query, Request, Response
+from typing import List, Optional, Literal
 from motor.motor_asyncio import AsyncIOMotorClient
 from bson import ObjectId
 from bson.errors import InvalidId
+from pymongo import ReturnDocument
 
 from app.core.database import get_database
+from app.core.export import ExportFormat, export_response, resume_filter
+from app.core.responses import FastJSONResponse, fast_json_enabled
 from app.services.auth.utils import get_current_admin_user, get_current_active_user  # DÜZELTİLDİ
-from .schemas import MovieCreate, MovieDB, MovieUpdate 
-from app.core.redis import increment_cache_version 
+from app.services.leaderboards import store as leaderboard_store
+from .recommendations import popular_movie_ids, recommend_movie_ids
+from .search import build_filters, fetch_movies_in_order, hybrid_search
+from .schemas import (
+    AutocompleteSuggestion,
+    MovieBatchRequest,
+    MovieBatchResponse,
+    MovieCreate,
+    MovieDB,
+    MovieFacets,
+    MovieImportReport,
+    MovieUpdate,
+)
+from .autocomplete import autocomplete_index, record_movie_write
+from .serializers import MOVIE_PROJECTION, movie_response, movies_response, shape_movie
+from .fields import parse_fields, projection_for, subset_response
+from .facets import FACET_FIELDS, apply_movie_change as apply_facet_change, get_facets, total_count
+from .importer import MovieImporter, iter_csv_rows, iter_ndjson_rows
+from .writes import insert_movie
+from .jobs import (
+    EMBEDDING_SOURCE_FIELDS,
+    enqueue_cache_invalidation,
+    enqueue_movie_embedding,
+    enqueue_similar_rebuild,
+    enqueue_similar_refresh,
+)
 
 router = APIRouter()
 
 no_embedding_fields = {"embedding": 0}
 
+
+def _selected_fields(fields: Optional[str]):
+    """fields= parametresini MovieDB alanlarına göre doğrular (400 ile reddeder)."""
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 # --- GET (Listeleme ve Arama) ---
 @router.get("/", response_description="Filmleri listele ve filtrele", response_model=List[MovieDB])
 async def list_movies(
+    response: Response,
     limit: int = 10, 
     skip: int = 0,
     title: Optional[str] = Query(None, description="Film adında arama yap"),
     director: Optional[str] = Query(None, description="Yönetmen adına göre filtrele"),
     year: Optional[int] = Query(None, description="Yapım yılına göre filtrele"),
     genre: Optional[str] = Query(None, description="Türe göre filtrele"),
+    include_total: bool = Query(False, description="Toplam sonuç sayısını X-Total-Count başlığında döndür"),
+    fields: Optional[str] = Query(None, description="Sadece bu alanlar, ör. title,year,poster_url,average_rating"),
     db: AsyncIOMotorClient = Depends(get_database)
 ):
+    selected = _selected_fields(fields)
     search_query = {}
 
     if title:
@@ -36,9 +75,92 @@ async def list_movies(
     if genre:
         search_query["genre"] = genre
 
-    movies_cursor = db["movies"].find(search_query, no_embedding_fields).skip(skip).limit(limit)
+    projection = projection_for(selected) if selected else MOVIE_PROJECTION
+    movies_cursor = db["movies"].find(search_query, projection).skip(skip).limit(limit)
     movies = await movies_cursor.to_list(length=limit)
-    return movies
+
+    result = subset_response(selected, movies) if selected else movies_response(movies)
+    if include_total:
+        # Dönen bir Response varsa FastAPI `response` başlıklarını ona taşımaz
+        target = result if isinstance(result, Response) else response
+        target.headers["X-Total-Count"] = str(await total_count(db, search_query))
+    return result
+
+
+# --- GET (Facet Sayıları) ---
+@router.get("/facets", response_description="Tür/yıl/yönetmen bazında film sayıları", response_model=MovieFacets)
+async def movie_facets(
+    limit: int = Query(50, ge=1, le=500, description="Facet başına en fazla değer"),
+    db: AsyncIOMotorClient = Depends(get_database)
+):
+    """Materyalize sayaçlardan okunur; movies koleksiyonunda $group çalışmaz."""
+    return await get_facets(db, limit=limit)
+
+
+# --- GET (Otomatik Tamamlama) ---
+@router.get("/autocomplete", response_description="Başlık/yönetmen/oyuncu önek önerileri", response_model=List[AutocompleteSuggestion])
+async def autocomplete_movies(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=20),
+):
+    """Her tuş vuruşunda çağrılabilir: Mongo'ya gitmez, bellek içi önek indeksinden döner."""
+    return autocomplete_index.suggest(q, limit)
+
+
+# --- GET (Hibrit Arama) ---
+@router.get("/search", response_description="Anahtar kelime + anlamsal hibrit arama", response_model=List[MovieDB])
+async def search_movies(
+    q: str = Query(..., min_length=1, max_length=200, description="Serbest metin, ör. 'hüzünlü hapishane kaçışı'"),
+    limit: int = Query(10, ge=1, le=50),
+    director: Optional[str] = Query(None, description="Yönetmen adına göre ön filtre"),
+    year: Optional[int] = Query(None, description="Yapım yılına göre ön filtre"),
+    genre: Optional[str] = Query(None, description="Türe göre ön filtre"),
+    db: AsyncIOMotorClient = Depends(get_database)
+):
+    return movies_response(await hybrid_search(db, q, limit=limit, year=year, genre=genre, director=director))
+
+
+# --- GET (Kişisel Öneriler) ---
+@router.get("/recommendations", response_description="Yorum geçmişine göre film önerileri", response_model=List[MovieDB])
+async def recommend_movies(
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncIOMotorClient = Depends(get_database),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Kullanıcının puana göre ağırlıklı zevk vektörüne en yakın, henüz yorumlamadığı
+    filmler. LLM çağrısı yok; yorumu olmayan kullanıcıya en yüksek puanlılar döner.
+    """
+    user_id = str(current_user["_id"])
+    movie_ids = await recommend_movie_ids(db, user_id, limit)
+    if not movie_ids:
+        movie_ids = await popular_movie_ids(db, user_id, limit)
+    return movies_response(await fetch_movies_in_order(db, movie_ids))
+
+
+# --- GET (Dışa Aktarım) - Sadece Admin ---
+MOVIE_EXPORT_COLUMNS = [
+    "_id", "title", "year", "director", "genre", "cast", "description",
+    "average_rating", "review_count", "poster_url", "created_at",
+]
+
+
+@router.get("/export", response_description="Filmleri NDJSON/CSV olarak akıt")
+async def export_movies(
+    format: ExportFormat = Query("ndjson"),
+    after: Optional[str] = Query(None, description="Kaldığı yerden devam: son alınan satırın _id'si"),
+    year: Optional[int] = None,
+    genre: Optional[str] = None,
+    director: Optional[str] = None,
+    db: AsyncIOMotorClient = Depends(get_database),
+    admin: dict = Depends(get_current_admin_user)
+):
+    """
+    Katalog `_id` sırasıyla, sabit bellekle akıtılır (embedding ve benzer listeleri hariç).
+    Bağlantı koparsa son satırın `_id`'si `after` ile verilerek devam edilir.
+    """
+    query = {**build_filters(year, genre, director), **resume_filter(after)}
+    return export_response(db["movies"], query, MOVIE_EXPORT_COLUMNS, format, "movies")
 
 
 # --- POST (Oluşturma) - Sadece Admin ---
@@ -48,30 +170,104 @@ async def create_movie(
     db: AsyncIOMotorClient = Depends(get_database),
     admin: dict = Depends(get_current_admin_user)  # DÜZELTİLDİ
 ):
-    movie_data = jsonable_encoder(movie)
-    new_movie = await db["movies"].insert_one(movie_data)
-    created_movie = await db["movies"].find_one({"_id": new_movie.inserted_id}, no_embedding_fields)
-    
-    # Cache Invalidation
-    await increment_cache_version()
-    
-    return created_movie
+    # Yanıt, tekrar okumak yerine yazdığımız dokümandan kurulur (tek round trip)
+    return await insert_movie(db, movie)
+
+
+# --- POST (Toplu Getirme) ---
+@router.post("/batch", response_description="Birden çok filmi tek istekte getir", response_model=MovieBatchResponse)
+async def batch_movies(
+    request: MovieBatchRequest = Body(...),
+    db: AsyncIOMotorClient = Depends(get_database)
+):
+    """
+    İzleme listesi / öneri satırı gibi kart listeleri için: film başına bir
+    GET yerine tek $in sorgusu. Sıra korunur, bulunamayan id'ler ayrıca döner.
+    """
+    requested = {}
+    missing = []
+    for movie_id in request.ids:
+        try:
+            requested.setdefault(ObjectId(movie_id), movie_id)  # Tekrarları at, sırayı koru
+        except InvalidId:
+            missing.append(movie_id)
+
+    movies = await fetch_movies_in_order(db, list(requested))
+    found = {movie["_id"] for movie in movies}
+    missing.extend(movie_id for oid, movie_id in requested.items() if oid not in found)
+    if fast_json_enabled():
+        return FastJSONResponse({"movies": [shape_movie(movie) for movie in movies], "missing": missing})
+    return {"movies": movies, "missing": missing}
+
+
+# --- POST (Toplu İçe Aktarma) - Sadece Admin ---
+@router.post("/import", response_description="NDJSON/CSV ile toplu film ekle", response_model=MovieImportReport)
+async def import_movies(
+    request: Request,
+    format: Optional[Literal["ndjson", "csv"]] = Query(None, description="Boşsa Content-Type'tan çıkarılır"),
+    chunk_size: int = Query(1000, ge=1, le=10000, description="Doğrulama/embedding/yazma chunk boyutu"),
+    embed: bool = Query(True, description="Açıklamalar için embedding üret"),
+    db: AsyncIOMotorClient = Depends(get_database),
+    admin: dict = Depends(get_current_admin_user)
+):
+    """
+    Gövde tamamen belleğe alınmadan akış olarak okunur. Hatalı satırlar işi
+    durdurmaz; satır numarasıyla birlikte raporda döner.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "ndjson"
+
+    rows = iter_csv_rows(request.stream()) if format == "csv" else iter_ndjson_rows(request.stream())
+    importer = MovieImporter(db, chunk_size=chunk_size, embed=embed)
+    return await importer.run(rows)
+
+
+# --- POST (Benzer Filmleri Yeniden Hesapla) - Sadece Admin ---
+@router.post("/similar/rebuild", response_description="Tüm benzer film listelerini yeniden hesapla", status_code=status.HTTP_202_ACCEPTED)
+async def rebuild_similar(admin: dict = Depends(get_current_admin_user)):
+    queued = await enqueue_similar_rebuild()
+    if queued:
+        return {"message": "Benzer film hesaplaması kuyruğa alındı."}
+    return {"message": "Benzer film hesaplaması zaten kuyrukta veya tamamlandı."}
 
 
 # --- GET (Tekil Detay) ---
 @router.get("/{id}", response_description="Tek bir filmi getir", response_model=MovieDB)
-async def show_movie(id: str, db: AsyncIOMotorClient = Depends(get_database)):
+async def show_movie(
+    id: str,
+    fields: Optional[str] = Query(None, description="Sadece bu alanlar, ör. title,year,poster_url"),
+    db: AsyncIOMotorClient = Depends(get_database)
+):
+    selected = _selected_fields(fields)
     try:
         oid = ObjectId(id)
     except InvalidId:
         raise HTTPException(status_code=404, detail="Geçersiz ID formatı.")
 
-    if (movie := await db["movies"].find_one({"_id": oid}, no_embedding_fields)) is not None:
-        return movie
+    projection = projection_for(selected) if selected else MOVIE_PROJECTION
+    if (movie := await db["movies"].find_one({"_id": oid}, projection)) is not None:
+        return subset_response(selected, movie) if selected else movie_response(movie)
     
     raise HTTPException(status_code=404, detail=f"{id} ID'li film bulunamadı.")
 
 
+# --- GET (Benzer Filmler) ---
+@router.get("/{id}/similar", response_description="Önceden hesaplanmış benzer filmler", response_model=List[MovieDB])
+async def show_similar_movies(id: str, db: AsyncIOMotorClient = Depends(get_database)):
+    try:
+        oid = ObjectId(id)
+    except InvalidId:
+        raise HTTPException(status_code=404, detail="Geçersiz ID formatı.")
+
+    movie = await db["movies"].find_one({"_id": oid}, {"similar_movies": 1})
+    if movie is None:
+        raise HTTPException(status_code=404, detail=f"{id} ID'li film bulunamadı.")
+
+    # Komşular arka planda hesaplandı; burada sadece tek bir $in sorgusu var
+    return movies_response(await fetch_movies_in_order(db, movie.get("similar_movies") or []))
+
+
 # --- PUT (Güncelleme) - Sadece Admin ---
 @router.put("/{id}", response_description="Filmi güncelle", response_model=MovieDB)
 async def update_movie(
@@ -88,16 +284,28 @@ async def update_movie(
     movie_data = {k: v for k, v in movie.model_dump(exclude_unset=True).items()}
 
     if len(movie_data) >= 1:
-        update_result = await db["movies"].update_one(
-            {"_id": oid}, {"$set": movie_data}
+        # Eski hal tek round trip'te döner; yeni hal $set'ten yerel olarak kurulur.
+        # Facet sayaçları için eski/yeni tür listesi farkı gerekiyor.
+        previous_movie = await db["movies"].find_one_and_update(
+            {"_id": oid},
+            {"$set": movie_data},
+            projection=no_embedding_fields,
+            return_document=ReturnDocument.BEFORE
         )
-        if update_result.modified_count == 1:
-            if (updated_movie := await db["movies"].find_one({"_id": oid}, no_embedding_fields)) is not None:
-                # Cache Invalidation
-                await increment_cache_version()
-                return updated_movie
+        if previous_movie is not None:
+            updated_movie = {**previous_movie, **movie_data}
+            record_movie_write(updated_movie)
+            if movie_data.keys() & FACET_FIELDS:
+                await apply_facet_change(db, previous_movie, updated_movie)
+            if "genre" in movie_data:
+                await leaderboard_store.move_movie_genres(id, previous_movie.get("genre"), updated_movie.get("genre"))
+            # Metin alanları değiştiyse embedding yenilenir; Cache Invalidation arka planda
+            if EMBEDDING_SOURCE_FIELDS & movie_data.keys():
+                await enqueue_movie_embedding(id)
+            await enqueue_cache_invalidation()
+            return updated_movie
 
-    if (existing_movie := await db["movies"].find_one({"_id": oid}, no_embedding_fields)) is not None:
+    elif (existing_movie := await db["movies"].find_one({"_id": oid}, no_embedding_fields)) is not None:
         return existing_movie
 
     raise HTTPException(status_code=404, detail=f"{id} ID'li film bulunamadı.")
@@ -115,11 +323,15 @@ async def delete_movie(
     except InvalidId:
         raise HTTPException(status_code=404, detail="Geçersiz ID formatı.")
         
-    delete_result = await db["movies"].delete_one({"_id": oid})
+    deleted_movie = await db["movies"].find_one_and_delete({"_id": oid}, projection={field: 1 for field in FACET_FIELDS})
 
-    if delete_result.deleted_count == 1:
-        # Cache Invalidation
-        await increment_cache_version()
+    if deleted_movie is not None:
+        await apply_facet_change(db, deleted_movie, None)
+        await leaderboard_store.remove_movie(id, deleted_movie.get("genre"))
+        # Cache Invalidation; filmi listesinde tutanların komşuları yenilenir
+        await enqueue_cache_invalidation()
+        await enqueue_similar_refresh(id)
+        record_movie_write(deleted_id=id)
         return {"message": "Film başarıyla silindi."}
 
     raise HTTPException(status_code=404, detail=f"{id} ID'li film bulunamadı.")
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict, BeforeValidator
-from typing import Optional, List, Annotated
+from typing import Optional, List, Annotated, Literal, Union
 from datetime import datetime
 
 # MongoDB ObjectId'sini string'e çevirmek için helper
@@ -37,4 +37,46 @@ class MovieDB(MovieBase):
         populate_by_name=True,
         arbitrary_types_allowed=True,
         json_encoders={datetime: lambda dt: dt.isoformat()}
-    )
\ No newline at end of file
+    )
+
+
+# --- Toplu Getirme (Batch) ---
+class MovieBatchRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=200)
+
+class MovieBatchResponse(BaseModel):
+    movies: List[MovieDB] = []   # İstekteki sırayla
+    missing: List[str] = []      # Geçersiz veya bulunamayan id'ler
+
+
+# --- Toplu İçe Aktarma (Bulk Import) ---
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+class MovieImportReport(BaseModel):
+    total_rows: int = 0
+    inserted: int = 0
+    failed: int = 0
+    errors: List[ImportRowError] = []
+    errors_truncated: bool = False
+    duration_seconds: float = 0.0
+
+
+# --- Otomatik Tamamlama ---
+class AutocompleteSuggestion(BaseModel):
+    type: Literal["movie", "director", "cast"]
+    text: str
+    movie_id: Optional[str] = None  # Sadece type == "movie" için
+    score: float
+
+
+# --- Facet Sayıları ---
+class FacetCount(BaseModel):
+    value: Union[int, str]
+    count: int
+
+class MovieFacets(BaseModel):
+    genre: List[FacetCount] = []
+    year: List[FacetCount] = []
+    director: List[FacetCount] = []
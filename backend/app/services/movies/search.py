@@ -0,0 +1,121 @@
+"""
+Hibrit film araması: anahtar kelime ($text) + vektör (süreç içi indeks),
+reciprocal-rank fusion (RRF) ile birleştirilir.
+
+Hem `GET /api/movies/search` hem de ajanın `semantic_search_movies` aracı bu
+motoru kullanır; arama kutusu LLM tool-calling döngüsüne girmeden çalışır.
+"""
+import asyncio
+from typing import Dict, List, Optional
+
+import numpy as np
+from bson import ObjectId
+from fastapi.concurrency import run_in_threadpool
+from pymongo.errors import OperationFailure
+
+from app.core.config import settings
+from app.core.deadline import run_with_deadline
+from app.core.embeddings import generate_embedding
+from .serializers import MOVIE_PROJECTION
+from .vector_index import IndexSnapshot, vector_index
+
+RRF_K = 60  # Standart RRF sabiti; üst sıralar arasındaki farkı yumuşatır
+
+
+def build_filters(year: Optional[int] = None, genre: Optional[str] = None, director: Optional[str] = None) -> dict:
+    """list_movies ile aynı filtre anlamı: yıl eşitlik, tür listede, yönetmen içerir (büyük/küçük harf duyarsız)."""
+    filters = {}
+    if year:
+        filters["year"] = year
+    if genre:
+        filters["genre"] = genre
+    if director:
+        filters["director"] = {"$regex": director, "$options": "i"}
+    return filters
+
+
+async def fetch_movies_in_order(db, ids: List[ObjectId]) -> List[dict]:
+    """Verilen id sırasını koruyarak filmleri tek $in sorgusuyla getirir."""
+    movies = await db["movies"].find({"_id": {"$in": ids}}, MOVIE_PROJECTION).to_list(length=len(ids))
+    by_id = {movie["_id"]: movie for movie in movies}
+    return [by_id[oid] for oid in ids if oid in by_id]
+
+
+async def _keyword_ranking(db, query: str, filters: dict, limit: int) -> List[ObjectId]:
+    try:
+        cursor = db["movies"].find(
+            {**filters, "$text": {"$search": query}},
+            {"_id": 1, "score": {"$meta": "textScore"}},
+        ).sort([("score", {"$meta": "textScore"})]).limit(limit)
+        return [movie["_id"] for movie in await cursor.to_list(length=limit)]
+    except OperationFailure as e:
+        # Text index yoksa (ör. ensure_indexes çalışmadan) sadece vektör sonuçları kullanılır
+        print(f"Anahtar kelime araması yapılamadı: {e}")
+        return []
+
+
+async def _prefilter_mask(db, filters: dict, snapshot: IndexSnapshot) -> Optional[np.ndarray]:
+    """
+    Filtreye uyan filmlerin indeks satırları için maske. Filtre çok geniş ise
+    (SEARCH_PREFILTER_MAX_IDS'den fazla film) None döner; o zaman vektör sonuçları
+    Mongo'da sonradan filtrelenir.
+    """
+    cap = settings.SEARCH_PREFILTER_MAX_IDS
+    allowed = await db["movies"].find(filters, {"_id": 1}).limit(cap + 1).to_list(length=cap + 1)
+    if len(allowed) > cap:
+        return None
+
+    mask = np.zeros(snapshot.size, dtype=bool)
+    rows = [snapshot.row_of[m["_id"]] for m in allowed if m["_id"] in snapshot.row_of]
+    mask[rows] = True
+    return mask
+
+
+async def _vector_ranking(db, query: str, filters: dict, limit: int) -> List[ObjectId]:
+    # İndeks senkronu isteğin bütçesinden bağımsız arka planda; arama son tutarlı indeksi okur
+    vector_index.refresh_in_background(db)
+    # ONNX çıkarımı event loop'u bloklamasın; istek bütçesi dolarsa beklenmez
+    query_vector = await run_with_deadline(run_in_threadpool(generate_embedding, query))
+
+    # Maske ve arama aynı görüntüden: araya giren tam yükleme satır numaralarını kaydırmaz
+    snapshot = vector_index.snapshot()
+    mask = await _prefilter_mask(db, filters, snapshot) if filters else None
+    if filters and mask is None:
+        # Geniş filtre: fazladan aday al, filtreyi Mongo'da uygula
+        hits = await run_in_threadpool(snapshot.search, query_vector, limit * 10)
+        candidate_ids = [oid for oid, _ in hits]
+        matching = await db["movies"].find({**filters, "_id": {"$in": candidate_ids}}, {"_id": 1}).to_list(length=None)
+        matching_ids = {m["_id"] for m in matching}
+        return [oid for oid in candidate_ids if oid in matching_ids][:limit]
+
+    hits = await run_in_threadpool(snapshot.search, query_vector, limit, None, mask)
+    return [oid for oid, _ in hits]
+
+
+def reciprocal_rank_fusion(*rankings: List[ObjectId], k: int = RRF_K) -> List[ObjectId]:
+    """Her listedeki sıraya göre 1 / (k + sıra) puanlarını toplar; yüksekten düşüğe sıralar."""
+    scores: Dict[ObjectId, float] = {}
+    for ranking in rankings:
+        for rank, oid in enumerate(ranking, start=1):
+            scores[oid] = scores.get(oid, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+async def hybrid_search(
+    db,
+    query: str,
+    limit: int = 10,
+    year: Optional[int] = None,
+    genre: Optional[str] = None,
+    director: Optional[str] = None,
+) -> List[dict]:
+    """Anahtar kelime ve vektör aramasını eşzamanlı çalıştırır, RRF ile birleştirip filmleri döner."""
+    filters = build_filters(year, genre, director)
+    candidates = max(limit * settings.SEARCH_CANDIDATE_MULTIPLIER, limit)
+
+    keyword_ids, vector_ids = await asyncio.gather(
+        _keyword_ranking(db, query, filters, candidates),
+        _vector_ranking(db, query, filters, candidates),
+    )
+    fused = reciprocal_rank_fusion(keyword_ids, vector_ids)[:limit]
+    return await fetch_movies_in_order(db, fused)
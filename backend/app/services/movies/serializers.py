@@ -0,0 +1,37 @@
+"""
+Sıcak okuma endpoint'leri için hızlı yanıt yolu.
+
+Mongo sorguları sadece MovieDB alanlarını projekte eder (MOVIE_PROJECTION);
+eksik opsiyonel alanlar MovieDB varsayılanlarıyla doldurulur ve sonuç
+Pydantic doğrulamasından geçmeden orjson ile yazılır. FAST_JSON_RESPONSES
+kapalıysa ham dokümanlar döner ve FastAPI response_model ile doğrular.
+"""
+from datetime import datetime
+from typing import List
+
+from app.core.responses import FastJSONResponse, fast_json_enabled
+from .schemas import MovieDB
+
+MOVIE_PROJECTION = {name: 1 for name in MovieDB.model_fields if name != "id"}
+
+# Dokümanda yoksa MovieDB'nin dolduracağı değerler (id ve created_at hariç)
+MOVIE_DEFAULTS = {
+    name: field.get_default(call_default_factory=True)
+    for name, field in MovieDB.model_fields.items()
+    if not field.is_required() and name not in ("id", "created_at")
+}
+
+
+def shape_movie(doc: dict) -> dict:
+    movie = {**MOVIE_DEFAULTS, **doc}
+    if "created_at" not in movie:
+        movie["created_at"] = datetime.now()
+    return movie
+
+
+def movie_response(doc: dict):
+    return FastJSONResponse(shape_movie(doc)) if fast_json_enabled() else doc
+
+
+def movies_response(docs: List[dict]):
+    return FastJSONResponse([shape_movie(doc) for doc in docs]) if fast_json_enabled() else docs
@@ -0,0 +1,262 @@
+"""
+Benzer filmler (`similar_movies`) için önceden hesaplanmış kNN.
+
+Detay sayfası komşuları dokümandan okur; sorgu anında vektör araması yapılmaz.
+Tam yeniden hesaplama blok blok matris çarpımıyla yapılır (bellek
+SIMILAR_BLOCK_ROWS x SIMILAR_BLOCK_COLS skor matrisiyle sınırlı), tek film
+eklendiğinde/değiştiğinde/silindiğinde sadece etkilenen komşuluklar yenilenir.
+
+    python -m app.services.movies.similar      # tüm filmler için yeniden hesapla
+"""
+import asyncio
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from bson import ObjectId
+from fastapi.concurrency import run_in_threadpool
+from pymongo import UpdateOne
+
+from app.core.config import settings
+from app.core.embeddings import current_embedding_model
+from .vector_index import IndexSnapshot, top_k_indices, vector_index
+
+SCORE_TOLERANCE = 1e-4
+
+# Aynı süreçteki artımlı güncellemeler aynı komşu listesini aynı anda yazmasın
+_refresh_lock = asyncio.Lock()
+
+
+def blocked_top_k(
+    vectors: np.ndarray,
+    rows: np.ndarray,
+    k: int,
+    dead_rows: Optional[List[int]] = None,
+    block_rows: Optional[int] = None,
+    block_cols: Optional[int] = None,
+) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    `rows` satırlarının `vectors` içindeki en yakın k komşusunu (kendisi hariç)
+    blok blok hesaplar. Her sorgu bloğu için (satırlar, komşu indeksleri, skorlar)
+    üretir; komşular skora göre azalan sıradadır, eksik kalan yerler -inf skorludur.
+
+    Her sütun bloğunda blok-içi ilk k bulunur ve o ana kadarki en iyi k ile
+    birleştirilir; tam N x N skor matrisi hiçbir zaman oluşmaz.
+    """
+    block_rows = block_rows or settings.SIMILAR_BLOCK_ROWS
+    block_cols = block_cols or settings.SIMILAR_BLOCK_COLS
+    n = vectors.shape[0]
+    dead = np.asarray(dead_rows or [], dtype=np.int64)
+
+    for start in range(0, len(rows), block_rows):
+        query_rows = rows[start:start + block_rows]
+        queries = vectors[query_rows]
+        best_scores = np.full((len(query_rows), k), -np.inf, dtype=np.float32)
+        best_idx = np.full((len(query_rows), k), -1, dtype=np.int64)
+
+        for col_start in range(0, n, block_cols):
+            col_end = min(col_start + block_cols, n)
+            scores = queries @ vectors[col_start:col_end].T
+
+            # Kendisi ve silinmiş satırlar aday olamaz
+            own = (query_rows >= col_start) & (query_rows < col_end)
+            scores[np.nonzero(own)[0], query_rows[own] - col_start] = -np.inf
+            dead_in_block = dead[(dead >= col_start) & (dead < col_end)]
+            if dead_in_block.size:
+                scores[:, dead_in_block - col_start] = -np.inf
+
+            block_k = min(k, col_end - col_start)
+            part = np.argpartition(-scores, block_k - 1, axis=1)[:, :block_k]
+            candidate_scores = np.concatenate([best_scores, np.take_along_axis(scores, part, axis=1)], axis=1)
+            candidate_idx = np.concatenate([best_idx, part + col_start], axis=1)
+
+            keep = np.argpartition(-candidate_scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(candidate_scores, keep, axis=1)
+            best_idx = np.take_along_axis(candidate_idx, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1)
+        yield query_rows, np.take_along_axis(best_idx, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+
+def _neighbour_update(ids: List, row: int, idx: np.ndarray, scores: np.ndarray) -> Optional[UpdateOne]:
+    movie_id = ids[row]
+    if movie_id is None:
+        return None
+    neighbours = [(ids[i], float(s)) for i, s in zip(idx, scores) if np.isfinite(s) and ids[i] is not None]
+    return _set_neighbours(movie_id, neighbours)
+
+
+def _set_neighbours(movie_id: ObjectId, neighbours: List[Tuple[ObjectId, float]]) -> UpdateOne:
+    return UpdateOne(
+        {"_id": movie_id},
+        {"$set": {
+            "similar_movies": [oid for oid, _ in neighbours],
+            # Artımlı güncellemede "yeni film bu listeye girer mi?" kararı için
+            "similar_scores": [round(score, 5) for _, score in neighbours],
+        }},
+    )
+
+
+async def _write(db, operations: List[UpdateOne]) -> int:
+    if not operations:
+        return 0
+    result = await db["movies"].bulk_write(operations, ordered=False)
+    return result.modified_count
+
+
+# --- TAM YENİDEN HESAPLAMA ---
+async def rebuild_similar_movies(db, k: Optional[int] = None) -> Dict[str, float]:
+    """Tüm filmlerin komşu listelerini yeniden hesaplar ve bulk_write ile yazar."""
+    k = k or settings.SIMILAR_MOVIES_K
+    started = time.perf_counter()
+    await vector_index.sync(db, force_full=True)
+
+    # Görüntü: hesaplama sürerken gelen eklemeler yeni dizilere yazılır, satırlar kaymaz
+    snapshot = vector_index.snapshot()
+    ids = list(snapshot.ids)
+    vectors = snapshot.vectors
+    dead_rows = list(snapshot.dead_rows)
+    if len(ids) < 2:
+        return {"movies": len(ids), "updated": 0, "duration_seconds": 0.0}
+
+    blocks = blocked_top_k(vectors, np.arange(len(ids)), k, dead_rows)
+    updated = 0
+    pending_write: Optional[asyncio.Task] = None
+
+    while True:
+        block = await run_in_threadpool(next, blocks, None)
+        if block is None:
+            break
+        rows, idx, scores = block
+        operations = [op for r, i, s in zip(rows, idx, scores) if (op := _neighbour_update(ids, r, i, s))]
+
+        # Bir sonraki blok hesaplanırken önceki blok yazılır (en fazla bir yazım havada)
+        if pending_write:
+            updated += await pending_write
+        pending_write = asyncio.create_task(_write(db, operations))
+
+    if pending_write:
+        updated += await pending_write
+
+    duration = round(time.perf_counter() - started, 3)
+    print(f"Benzer filmler yeniden hesaplandı: {len(ids)} film, {updated} güncelleme, {duration} sn.")
+    return {"movies": len(ids), "updated": updated, "duration_seconds": duration}
+
+
+# --- ARTIMLI GÜNCELLEME ---
+async def _recompute_rows(snapshot: IndexSnapshot, rows: List[int], k: int) -> List[UpdateOne]:
+    if not rows:
+        return []
+    ids = list(snapshot.ids)
+    blocks = await run_in_threadpool(
+        lambda: list(blocked_top_k(snapshot.vectors, np.asarray(rows, dtype=np.int64), k, snapshot.dead_rows))
+    )
+    return [
+        op
+        for query_rows, idx, scores in blocks
+        for r, i, s in zip(query_rows, idx, scores)
+        if (op := _neighbour_update(ids, r, i, s))
+    ]
+
+
+async def refresh_similar_for_movie(db, movie_id: str, k: Optional[int] = None) -> int:
+    """
+    Tek bir film eklendi/değişti/silindi: sadece etkilenen komşulukları yeniler.
+
+    - Filmin kendi listesi tek bir matris-vektör çarpımıyla hesaplanır.
+    - Filme en yakın SIMILAR_REFRESH_CANDIDATES film için, yeni skor listedeki en
+      düşük skoru geçiyorsa film listeye eklenir (simetrik benzerlik).
+    - Filmi zaten listesinde tutan ve skoru düşen (veya film silindiyse) filmlerin
+      listesi baştan hesaplanır; boşalan yere (k+1). komşu gelmeli.
+    """
+    k = k or settings.SIMILAR_MOVIES_K
+    oid = ObjectId(movie_id)
+
+    async with _refresh_lock:
+        await vector_index.sync(db)
+        movie = await db["movies"].find_one({"_id": oid}, {"embedding": 1, "embedding_model": 1})
+
+        # Filmi listesinde tutanlar (multikey index: similar_movies)
+        listers = await db["movies"].find(
+            {"similar_movies": oid}, {"similar_movies": 1, "similar_scores": 1}
+        ).to_list(length=None)
+
+        # Satır numaraları bu görüntüye aittir; arka plandaki tam yükleme yeni görüntü kurar
+        snapshot = vector_index.snapshot()
+        if not movie or not movie.get("embedding") or movie.get("embedding_model") != current_embedding_model():
+            snapshot.remove(oid)
+            rows = [snapshot.row_of[d["_id"]] for d in listers if d["_id"] in snapshot.row_of]
+            return await _write(db, await _recompute_rows(snapshot, rows, k))
+
+        snapshot.upsert(oid, movie["embedding"])
+        row = snapshot.row_of.get(oid)
+        if row is None:
+            return 0  # Boyutu indeksle uyuşmayan (eski model) embedding
+
+        ids = snapshot.ids
+        vectors = snapshot.vectors
+        scores = await run_in_threadpool(lambda: vectors @ vectors[row])
+        scores[row] = -np.inf
+        if snapshot.dead_rows:
+            scores[[r for r in snapshot.dead_rows if r < scores.shape[0]]] = -np.inf
+
+        own = top_k_indices(scores, k)
+        operations = [_set_neighbours(oid, [(ids[i], float(scores[i])) for i in own if np.isfinite(scores[i])])]
+
+        candidate_rows = top_k_indices(scores, settings.SIMILAR_REFRESH_CANDIDATES)
+        candidate_ids = [ids[i] for i in candidate_rows if np.isfinite(scores[i])]
+        candidates = await db["movies"].find(
+            {"_id": {"$in": candidate_ids}}, {"similar_movies": 1, "similar_scores": 1}
+        ).to_list(length=None)
+
+        recompute: List[int] = []
+        seen = set()
+        for doc in listers + candidates:
+            other_row = snapshot.row_of.get(doc["_id"])
+            if doc["_id"] in seen or other_row is None:
+                continue
+            seen.add(doc["_id"])
+
+            neighbour_ids = doc.get("similar_movies") or []
+            neighbour_scores = doc.get("similar_scores")
+            new_score = float(scores[other_row])
+
+            # Skorları olmayan (hiç hesaplanmamış/elle girilmiş) listeler tam hesaplanır
+            if neighbour_scores is None or len(neighbour_scores) != len(neighbour_ids):
+                recompute.append(other_row)
+                continue
+
+            neighbours = list(zip(neighbour_ids, neighbour_scores))
+            old_score = next((s for n, s in neighbours if n == oid), None)
+            # Skorlar yuvarlanmış saklanır; küçük farklar düşüş sayılmaz
+            if old_score is not None and new_score < old_score - SCORE_TOLERANCE:
+                recompute.append(other_row)
+                continue
+
+            others = [(n, s) for n, s in neighbours if n != oid]
+            if old_score is None and len(others) >= k and new_score <= min(s for _, s in others):
+                continue
+
+            merged = sorted(others + [(oid, new_score)], key=lambda pair: pair[1], reverse=True)[:k]
+            operations.append(_set_neighbours(doc["_id"], merged))
+
+        operations.extend(await _recompute_rows(snapshot, recompute, k))
+        return await _write(db, operations)
+
+
+async def main(k: Optional[int] = None) -> None:
+    from app.core.database import connect_to_mongo, close_mongo_connection, get_database
+
+    await connect_to_mongo()
+    try:
+        await rebuild_similar_movies(await get_database(), k)
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Tüm filmler için similar_movies listesini yeniden hesaplar.")
+    parser.add_argument("--k", type=int, default=None, help="Film başına komşu sayısı (varsayılan SIMILAR_MOVIES_K)")
+    asyncio.run(main(parser.parse_args().k))
@@ -0,0 +1,263 @@
+import asyncio
+import contextvars
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from bson import ObjectId
+
+from app.core.config import settings
+from app.core.embeddings import current_embedding_model
+
+# Sync sorgusunda saat kayması/yarış için geriye bırakılan pay
+SYNC_OVERLAP = timedelta(seconds=5)
+LOAD_BATCH_SIZE = 5000
+
+
+class IndexSnapshot:
+    """
+    Bir tam yüklemenin ürettiği görüntü: ids, row_of ve matris birlikte durur.
+
+    Tam yeniden yüklemede yeni bir görüntü kurulur ve VectorIndex'e tek referans
+    atamasıyla konur; eski görüntüyü okuyan arama (threadpool'da) onunla tutarlı
+    biter. Görüntü içinde sadece sona ekleme ve mezar taşı vardır, satırlar yer
+    değiştirmez: satır önce matrise, sonra `ids`'e yazılır; okuyucu `len(ids)`'i
+    matristen önce okuduğu için yazılmamış satır görmez.
+    """
+
+    def __init__(self):
+        self.ids: List[Optional[ObjectId]] = []
+        self.row_of: Dict[ObjectId, int] = {}
+        self.dead_rows: List[int] = []
+        self.matrix: Optional[np.ndarray] = None
+        self.dim: Optional[int] = None
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        size = self.size
+        matrix = self.matrix
+        if matrix is None:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        return matrix[:size]
+
+    def vector_of(self, oid: ObjectId) -> Optional[np.ndarray]:
+        row = self.row_of.get(oid)
+        return None if row is None else self.matrix[row]
+
+    def search(self, query_vector, k: int, exclude: Optional[set] = None, mask: Optional[np.ndarray] = None) -> List[Tuple[ObjectId, float]]:
+        """
+        Kosinüs benzerliğine göre en yakın k film. `mask` (bool, satır sayısı
+        uzunluğunda) ön filtre; `exclude` hariç tutulacak ObjectId'ler.
+        """
+        vectors = self.vectors
+        if not vectors.shape[0] or k <= 0:
+            return []
+
+        query = normalize(np.asarray(query_vector, dtype=np.float32))
+        if query.shape[0] != vectors.shape[1]:
+            return []
+        scores = vectors @ query
+
+        if mask is not None:
+            if mask.shape[0] < scores.shape[0]:
+                # Maske kurulduktan sonra eklenen satırlar filtreye dahil değil
+                mask = np.concatenate([mask, np.zeros(scores.shape[0] - mask.shape[0], dtype=bool)])
+            scores = np.where(mask[:scores.shape[0]], scores, -np.inf)
+        if self.dead_rows:
+            dead = [row for row in self.dead_rows if row < scores.shape[0]]
+            scores[dead] = -np.inf
+        for oid in exclude or ():
+            row = self.row_of.get(oid)
+            if row is not None and row < scores.shape[0]:
+                scores[row] = -np.inf
+
+        top = top_k_indices(scores, k)
+        ids = self.ids
+        # Arama sürerken silinen satır (ids[i] None) sonuca girmez
+        return [(ids[i], float(scores[i])) for i in top if np.isfinite(scores[i]) and ids[i] is not None]
+
+    def upsert(self, oid: ObjectId, vector) -> None:
+        vector = np.asarray(vector, dtype=np.float32)
+        if self.dim is None:
+            self.dim = vector.shape[0]
+        if vector.shape[0] != self.dim:
+            return  # Farklı modelle üretilmiş eski vektör; yeniden embed edilene kadar atlanır
+
+        row = self.row_of.get(oid)
+        if row is not None:
+            self.matrix[row] = normalize(vector)
+            return
+        row = self.size
+        self._ensure_capacity(row + 1)
+        self.matrix[row] = normalize(vector)
+        self.ids.append(oid)
+        self.row_of[oid] = row
+
+    def remove(self, oid: ObjectId) -> None:
+        """Satırı mezar taşı olarak işaretler; boşluk bir sonraki tam yüklemede kapanır."""
+        row = self.row_of.pop(oid, None)
+        if row is None:
+            return
+        self.dead_rows.append(row)
+        self.matrix[row] = 0
+        self.ids[row] = None
+
+    def _ensure_capacity(self, rows: int) -> None:
+        capacity = 0 if self.matrix is None else self.matrix.shape[0]
+        if rows <= capacity:
+            return
+        new_matrix = np.empty((max(rows, capacity * 2, 1024), self.dim), dtype=np.float32)
+        if self.matrix is not None:
+            new_matrix[:self.size] = self.matrix[:self.size]
+        self.matrix = new_matrix
+
+
+class VectorIndex:
+    """
+    Tüm film embedding'lerinin süreç içi, L2-normalize float32 matrisi.
+
+    Benzer film (kNN), öneri ve hibrit arama bu matris üzerinde vektörel
+    çalışır; Mongo'ya her sorguda vektör taşınmaz. İlk `sync` tam yükleme
+    yapar, sonrakiler sadece `embedding_updated_at` alanı son senkrondan yeni
+    olan dokümanları çeker. Silinen filmler periyodik tam yeniden yüklemede
+    (veya `remove` ile) düşer; arama sonuçları zaten Mongo'dan okunduğu için
+    arada kalan silinmiş id'ler sonuçtan elenir.
+
+    Veri bir IndexSnapshot'tadır. Birden fazla adımda okuyan (maske kurup sonra
+    arayan, satır numarası alıp sonra çarpan) kod `snapshot()` ile görüntüyü bir
+    kez alıp hep onu kullanmalıdır; araya giren tam yükleme satırları değiştirir.
+    """
+
+    def __init__(self):
+        self._snapshot = IndexSnapshot()
+        self.last_sync: Optional[datetime] = None
+        self.last_full_load = 0.0
+        self._last_check = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    # --- Okuma ---
+    def snapshot(self) -> IndexSnapshot:
+        return self._snapshot
+
+    @property
+    def size(self) -> int:
+        return self._snapshot.size
+
+    @property
+    def dim(self) -> Optional[int]:
+        return self._snapshot.dim
+
+    @property
+    def ids(self) -> List[Optional[ObjectId]]:
+        return self._snapshot.ids
+
+    @property
+    def row_of(self) -> Dict[ObjectId, int]:
+        return self._snapshot.row_of
+
+    @property
+    def dead_rows(self) -> List[int]:
+        return self._snapshot.dead_rows
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._snapshot.vectors
+
+    def vector_of(self, oid: ObjectId) -> Optional[np.ndarray]:
+        return self._snapshot.vector_of(oid)
+
+    def search(self, query_vector, k: int, exclude: Optional[set] = None, mask: Optional[np.ndarray] = None,
+               snapshot: Optional[IndexSnapshot] = None) -> List[Tuple[ObjectId, float]]:
+        """Görüntü başta bir kez okunur; `mask` başka bir görüntüden kurulduysa o verilmelidir."""
+        return (snapshot or self._snapshot).search(query_vector, k, exclude, mask)
+
+    # --- Yazma ---
+    def upsert(self, oid: ObjectId, vector) -> None:
+        self._snapshot.upsert(oid, vector)
+
+    def remove(self, oid: ObjectId) -> None:
+        self._snapshot.remove(oid)
+
+    # --- Mongo ile Senkron ---
+    def refresh_in_background(self, db) -> None:
+        """
+        İstek yolları için: senkron zamanı geldiyse `sync` arka plan task'ında başlar,
+        çağıran beklemez ve son tutarlı indeksi okur. Task boş bir context ile
+        açılır; isteğin zaman bütçesi (request_deadline_var, pymongo.timeout) tam
+        yüklemeye miras kalıp onu yarıda kesmez.
+        """
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        if self.last_sync and time.monotonic() - self._last_check < settings.VECTOR_INDEX_SYNC_SECONDS:
+            return
+        self._refresh_task = asyncio.create_task(self._sync_quietly(db), context=contextvars.Context())
+
+    async def _sync_quietly(self, db) -> None:
+        try:
+            await self.sync(db)
+        except Exception as e:
+            print(f"Vektör indeksi senkronu başarısız: {e}")
+
+    async def sync(self, db, force_full: bool = False) -> None:
+        """
+        En fazla VECTOR_INDEX_SYNC_SECONDS'da bir Mongo'dan yeni embedding'leri çeker;
+        VECTOR_INDEX_FULL_RELOAD_SECONDS'da bir (veya force_full ile) baştan yükler.
+        """
+        now = time.monotonic()
+        if not force_full and self.last_sync and now - self._last_check < settings.VECTOR_INDEX_SYNC_SECONDS:
+            return
+
+        async with self._lock:
+            now = time.monotonic()
+            if not force_full and self.last_sync and now - self._last_check < settings.VECTOR_INDEX_SYNC_SECONDS:
+                return
+            self._last_check = now
+            full = force_full or self.last_sync is None or now - self.last_full_load > settings.VECTOR_INDEX_FULL_RELOAD_SECONDS
+
+            started_at = datetime.utcnow()
+            # Başka modelle üretilmiş vektörler (yeniden embed sürerken) sorgu uzayına karışmaz
+            query = {"embedding": {"$exists": True}, "embedding_model": current_embedding_model()}
+            if not full:
+                query["embedding_updated_at"] = {"$gt": self.last_sync - SYNC_OVERLAP}
+
+            if full:
+                fresh = IndexSnapshot()
+                await _load(db, query, fresh)
+                self._snapshot = fresh  # Tek referans ataması; okuyucular eski ya da yeni görüntüyü bütün görür
+                self.last_full_load = now
+                print(f"Vektör indeksi yüklendi: {self.size} film.")
+            else:
+                await _load(db, query, self._snapshot)
+            self.last_sync = started_at
+
+
+async def _load(db, query: dict, snapshot: IndexSnapshot) -> None:
+    cursor = db["movies"].find(query, {"embedding": 1}).batch_size(LOAD_BATCH_SIZE)
+    async for movie in cursor:
+        if movie.get("embedding"):
+            snapshot.upsert(movie["_id"], movie["embedding"])
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Satır (veya tek vektör) bazında L2 normalizasyon; sıfır vektör sıfır kalır."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Tam sıralama yapmadan (argpartition) en yüksek k skorun indeksleri, azalan sırada."""
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+# Süreç başına tek indeks
+vector_index = VectorIndex()
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+
+from .autocomplete import record_movie_write
+from .facets import apply_movie_change as apply_facet_change
+from .jobs import enqueue_cache_invalidation, enqueue_movie_embedding
+from .schemas import MovieCreate
+
+
+# --- Film Ekleme (ortak yazma yolu) ---
+async def insert_movie(db, movie: MovieCreate) -> dict:
+    """
+    Tek film ekleme: create_movie endpoint'i ve ajanın add_movie aracı bunu kullanır.
+    created_at (UTC, importer ile aynı saat) ve puan sayaçları baştan yazılır;
+    otomatik tamamlama ve facet sayaçları anında, embedding ve cache arka planda güncellenir.
+    Yazılan doküman (`_id` dahil) döner; tekrar okunmaz (tek round trip).
+    """
+    movie_data = jsonable_encoder(movie)
+    movie_data["created_at"] = datetime.utcnow()
+    movie_data["rating_sum"] = 0
+    movie_data["review_count"] = 0
+
+    result = await db["movies"].insert_one(movie_data)
+    movie_data["_id"] = result.inserted_id
+    record_movie_write(movie_data)
+    await apply_facet_change(db, None, movie_data)
+
+    await enqueue_movie_embedding(str(result.inserted_id))
+    await enqueue_cache_invalidation()
+    return movie_data
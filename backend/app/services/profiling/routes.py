@@ -0,0 +1,37 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from app.core.profiling import get_report, list_reports
+from app.services.auth.utils import get_current_admin_user
+from .schemas import ProfileSummary
+
+router = APIRouter()
+
+
+# --- GET (Son Profiller) ---
+@router.get("/", response_model=List[ProfileSummary])
+async def list_profiles(current_user=Depends(get_current_admin_user)):
+    """
+    Bu süreçte alınan son profillerin özeti (en yeni önce).
+    Profil almak için isteğe admin token'ıyla birlikte `X-Profile: sample` veya
+    `X-Profile: cprofile` başlığı eklenir; yanıttaki `X-Profile-Id` rapor id'sidir.
+    """
+    return list_reports()
+
+
+# --- GET (Rapor) ---
+@router.get("/{profile_id}", response_class=PlainTextResponse)
+async def show_profile(profile_id: str, current_user=Depends(get_current_admin_user)):
+    """
+    Ham rapor: `sample` modunda collapsed stacks (flamegraph.pl / speedscope),
+    `cprofile` modunda kümülatif süreye göre pstats çıktısı.
+    """
+    report = get_report(profile_id)
+    if not report:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profil bulunamadı (süresi dolmuş veya başka bir süreçte alınmış olabilir)."
+        )
+    return PlainTextResponse(report["report"])
@@ -0,0 +1,15 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class ProfileSummary(BaseModel):
+    id: str
+    created_at: datetime
+    method: str
+    path: str
+    status: int
+    duration_ms: float
+    mode: str                      # sample | cprofile
+    format: Optional[str] = None   # collapsed | pstats
@@ -0,0 +1,117 @@
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from app.core.database import get_database
+from app.core.jobs import enqueue_job, job_handler
+from app.services.movies.recommendations import apply_review_change
+from app.services.leaderboards import store as leaderboard_store
+
+# --- Türetilmiş Veri İşleri (Yorumlar) ---
+RECOMPUTE_RATING = "recompute_rating"
+UPDATE_TASTE = "update_taste"
+
+
+async def apply_rating_delta(db, movie_id: str, rating_delta: int, count_delta: int):
+    """
+    Yazma yolu: filmin puan toplamını ve yorum sayısını tek bir atomik update ile
+    değiştirir, average_rating'i aynı işlemde yeniden hesaplar (aggregation'sız, tek
+    round trip). Güncel skor liderlik tablolarına yazılır. Film yoksa None döner.
+    Sayaçlar negatife düştüyse (kayma) onarım işi kuyruğa bırakılır.
+    """
+    movie = await db.movies.find_one_and_update(
+        {"_id": ObjectId(movie_id)},
+        [
+            {"$set": {
+                "rating_sum": {"$add": [{"$ifNull": ["$rating_sum", 0]}, rating_delta]},
+                "review_count": {"$add": [{"$ifNull": ["$review_count", 0]}, count_delta]},
+            }},
+            {"$set": {
+                "average_rating": {"$cond": [
+                    {"$gt": ["$review_count", 0]},
+                    {"$round": [{"$divide": ["$rating_sum", "$review_count"]}, 1]},
+                    0.0,
+                ]},
+            }},
+        ],
+        projection={"average_rating": 1, "rating_sum": 1, "review_count": 1, "genre": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    if movie is None:
+        return None
+    if movie["review_count"] < 0 or movie["rating_sum"] < 0:
+        await enqueue_rating_recompute(movie_id)
+    else:
+        await leaderboard_store.update_movie_score(movie_id, movie["average_rating"], movie["review_count"], movie.get("genre") or [])
+    return movie
+
+
+async def update_movie_average_rating(db, movie_id: str):
+    """
+    Onarım: bir filme ait tüm yorumların ortalama puanını baştan hesaplar ve
+    movies koleksiyonundaki average_rating / sayaç alanlarını günceller.
+    Yazma yolları artımlı `apply_rating_delta` kullanır; bu iş sayaç kayması
+    görüldüğünde veya admin istediğinde çalışır. Tüm yorumlardan hesapladığı için
+    idempotenttir; aynı iş iki kez çalışsa da sonuç değişmez.
+    """
+    # Aggregation pipeline ile ortalama hesapla
+    pipeline = [
+        {"$match": {"movie_id": movie_id}},
+        {"$group": {"_id": None, "avg_rating": {"$avg": "$rating"}, "rating_sum": {"$sum": "$rating"}, "review_count": {"$sum": 1}}}
+    ]
+    
+    result = await db.reviews.aggregate(pipeline).to_list(1)
+    
+    if result and result[0].get("avg_rating") is not None:
+        avg_rating = round(result[0]["avg_rating"], 1)
+        rating_sum, review_count = result[0]["rating_sum"], result[0]["review_count"]
+    else:
+        avg_rating, rating_sum, review_count = 0.0, 0, 0
+    
+    # Movies koleksiyonunu güncelle; türler liderlik tabloları için aynı çağrıda döner
+    movie = await db.movies.find_one_and_update(
+        {"_id": ObjectId(movie_id)},
+        {"$set": {"average_rating": avg_rating, "rating_sum": rating_sum, "review_count": review_count}},
+        projection={"genre": 1}
+    )
+    if movie is not None:
+        await leaderboard_store.update_movie_score(movie_id, avg_rating, review_count, movie.get("genre") or [])
+
+
+async def backfill_rating_counters(db):
+    """
+    rating_sum / review_count alanları olmayan (eski) filmler için sayaçları
+    reviews koleksiyonundan tek seferde doldurur. Açılışta, gerekiyorsa çalışır.
+    """
+    if await db.movies.find_one({"review_count": {"$exists": False}}, {"_id": 1}) is None:
+        return
+
+    pipeline = [
+        {"$group": {"_id": "$movie_id", "rating_sum": {"$sum": "$rating"}, "review_count": {"$sum": 1}}},
+        {"$project": {"_id": {"$toObjectId": "$_id"}, "rating_sum": 1, "review_count": 1}},
+        {"$merge": {"into": "movies", "on": "_id", "whenMatched": "merge", "whenNotMatched": "discard"}},
+    ]
+    await db.reviews.aggregate(pipeline).to_list(None)
+    await db.movies.update_many({"review_count": {"$exists": False}}, {"$set": {"review_count": 0, "rating_sum": 0}})
+    print("Film puan sayaçları dolduruldu.")
+
+
+@job_handler(RECOMPUTE_RATING)
+async def recompute_rating_job(payload: dict):
+    db = await get_database()
+    await update_movie_average_rating(db, payload["movie_id"])
+
+
+async def enqueue_rating_recompute(movie_id: str):
+    """Onarım işi; aynı film için bekleyen bir hesaplama varsa yenisi eklenmez."""
+    await enqueue_job(RECOMPUTE_RATING, {"movie_id": movie_id}, key=f"rating:{movie_id}")
+
+
+@job_handler(UPDATE_TASTE)
+async def update_taste_job(payload: dict):
+    db = await get_database()
+    await apply_review_change(db, payload["user_id"], payload["movie_id"])
+
+
+async def enqueue_taste_update(user_id: str, movie_id: str):
+    """Kullanıcının öneri (zevk) vektörü yorumun güncel haline göre düzeltilir."""
+    await enqueue_job(UPDATE_TASTE, {"user_id": user_id, "movie_id": movie_id}, key=f"taste:{user_id}:{movie_id}")
@@ -1,16 +1,20 @@
-from fastapi import APIRouter, Body, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from typing import List, Optional
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 
-from app.services.auth.utils import get_current_user
+from app.services.auth.utils import get_current_admin_user, get_current_user
 from app.core.database import get_database 
-from .schemas import ReviewCreate, ReviewResponse, ReviewUpdate
+from app.core.export import ExportFormat, export_response, resume_filter
+from app.services.leaderboards import store as leaderboard_store
+from .schemas import ReviewCreate, ReviewResponse, ReviewUpdate, ReviewWithAuthor
+from .serializers import REVIEW_PROJECTION, reviews_response
+from .jobs import apply_rating_delta, enqueue_rating_recompute, enqueue_taste_update
 
 router = APIRouter()
 
-no_embedding_fields = {"embedding": 0}
- 
 # --- Yardımcı Fonksiyonlar ---
 def is_valid_object_id(id_str: str) -> bool:
     """ObjectId formatını kontrol eder."""
@@ -21,28 +25,16 @@ def is_valid_object_id(id_str: str) -> bool:
         return False
 
 
-async def update_movie_average_rating(db, movie_id: str):
-    """
-    Bir filme ait tüm yorumların ortalama puanını hesaplar ve
-    movies koleksiyonundaki average_rating alanını günceller.
-    """
-    # Aggregation pipeline ile ortalama hesapla
-    pipeline = [
-        {"$match": {"movie_id": movie_id}},
-        {"$group": {"_id": None, "avg_rating": {"$avg": "$rating"}}}
-    ]
-    
-    result = await db.reviews.aggregate(pipeline).to_list(1)
-    
-    if result and result[0].get("avg_rating") is not None:
-        avg_rating = round(result[0]["avg_rating"], 1)
-    else:
-        avg_rating = 0.0
-    
-    # Movies koleksiyonunu güncelle
-    await db.movies.update_one(
-        {"_id": ObjectId(movie_id)},
-        {"$set": {"average_rating": avg_rating}}
+async def _raise_missing_or_forbidden(db, review_oid: ObjectId, detail: str):
+    """Koşullu yazma eşleşmediğinde: yorum hiç yok mu (404), başkasının mı (403)?"""
+    if await db.reviews.find_one({"_id": review_oid}, {"_id": 1}) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Yorum bulunamadı."
+        )
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail=detail
     )
 
 
@@ -56,6 +48,8 @@ async def create_review(
 ):
     """
     Yeni bir film yorumu oluşturur.
+    Mutlu yolda iki round trip: yorum insert'i + filmin puan sayaçlarının atomik güncellemesi.
+    Öneri vektörü arka planda güncellenir.
     """
     # Movie ID formatını kontrol et
     if not is_valid_object_id(movie_id):
@@ -64,50 +58,75 @@ async def create_review(
             detail="Geçersiz film ID formatı."
         )
     
-    # Filmin var olup olmadığını kontrol et
-    movie = await db.movies.find_one({"_id": ObjectId(movie_id)}, no_embedding_fields)
-    if not movie:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Film bulunamadı."
-        )
-    
-    # Kullanıcının bu filme daha önce yorum yapıp yapmadığını kontrol et
-    existing_review = await db.reviews.find_one({
-        "movie_id": movie_id,
-        "user_id": str(current_user["_id"])
-    })
-    if existing_review:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Bu filme zaten yorum yapmışsınız."
-        )
-    
     review_dict = review.model_dump()
     review_dict["movie_id"] = movie_id
     review_dict["user_id"] = str(current_user["_id"])
     review_dict["created_at"] = datetime.utcnow()
     
-    result = await db.reviews.insert_one(review_dict)
-    created_review = await db.reviews.find_one({"_id": result.inserted_id})
+    # Aynı kullanıcının ikinci yorumunu (movie_id, user_id) unique index'i engeller
+    try:
+        result = await db.reviews.insert_one(review_dict)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bu filme zaten yorum yapmışsınız."
+        )
     
-    if not created_review:
-        raise HTTPException(status_code=500, detail="Yorum oluşturulamadı.")
+    # Filmin ortalama puanını güncelle (film yoksa None döner; varlık kontrolü de budur)
+    if await apply_rating_delta(db, movie_id, review.rating, 1) is None:
+        await db.reviews.delete_one({"_id": result.inserted_id})
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Film bulunamadı."
+        )
     
-    # Filmin ortalama puanını güncelle
-    await update_movie_average_rating(db, movie_id)
+    # Kullanıcının öneri vektörü arka planda güncellenir
+    await enqueue_taste_update(review_dict["user_id"], movie_id)
+    # Trend tablosu: bu saatin kovasına tek ZINCRBY
+    await leaderboard_store.record_review_activity(movie_id)
     
-    return ReviewResponse.model_validate(created_review)
+    review_dict["_id"] = result.inserted_id
+    return ReviewResponse.model_validate(review_dict)
+
+
+# --- EXPORT (Sadece Admin) ---
+REVIEW_EXPORT_COLUMNS = ["_id", "movie_id", "user_id", "rating", "comment", "created_at", "updated_at"]
+
+
+@router.get("/export")
+async def export_reviews(
+    format: ExportFormat = Query("ndjson"),
+    after: Optional[str] = Query(None, description="Kaldığı yerden devam: son alınan satırın _id'si"),
+    movie_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    since: Optional[datetime] = Query(None, description="Bu tarihten sonra yazılan yorumlar"),
+    db=Depends(get_database),
+    admin: dict = Depends(get_current_admin_user)
+):
+    """
+    Yorumları `_id` sırasıyla NDJSON veya CSV olarak akıtır.
+    Bağlantı koparsa son satırın `_id`'si `after` ile verilerek devam edilir.
+    """
+    query = resume_filter(after)
+    if movie_id:
+        query["movie_id"] = movie_id
+    if user_id:
+        query["user_id"] = user_id
+    if since:
+        query["created_at"] = {"$gte": since}
+    return export_response(db.reviews, query, REVIEW_EXPORT_COLUMNS, format, "reviews")
 
 
 # --- GET ALL REVIEWS FOR A MOVIE ---
-@router.get("/{movie_id}", response_model=List[ReviewResponse])
+@router.get("/{movie_id}", response_model=List[ReviewWithAuthor])
 async def get_movie_reviews(
     movie_id: str,
+    include_author: bool = Query(False, description="Yorum sahibinin kullanıcı adını ekle"),
     db=Depends(get_database)
 ):
     """
     Bir filme ait tüm yorumları getirir.
+    include_author=true ise kullanıcı adları yorum başına değil, tek $in sorgusuyla eklenir.
     """
     if not is_valid_object_id(movie_id):
         raise HTTPException(
@@ -115,8 +134,17 @@ async def get_movie_reviews(
             detail="Geçersiz film ID formatı."
         )
     
-    reviews = await db.reviews.find({"movie_id": movie_id}).to_list(100)
-    return [ReviewResponse.model_validate(review) for review in reviews]
+    reviews = await db.reviews.find({"movie_id": movie_id}, REVIEW_PROJECTION).to_list(100)
+    
+    if include_author and reviews:
+        user_ids = {ObjectId(review["user_id"]) for review in reviews if is_valid_object_id(review["user_id"])}
+        users = await db.users.find({"_id": {"$in": list(user_ids)}}, {"username": 1}).to_list(length=len(user_ids))
+        usernames = {str(user["_id"]): user.get("username") for user in users}
+        for review in reviews:
+            review["author_username"] = usernames.get(review["user_id"])
+    
+    # Ham dokümanlar tek seferde serileştirilir (elle model_validate + response_model yok)
+    return reviews_response(reviews)
 
 
 # --- UPDATE ---
@@ -129,6 +157,7 @@ async def update_review(
 ):
     """
     Kullanıcının kendi yorumunu günceller.
+    Sahiplik kontrolü filtrede yapılır; eski hali tek find_one_and_update ile döner.
     """
     if not is_valid_object_id(review_id):
         raise HTTPException(
@@ -136,21 +165,6 @@ async def update_review(
             detail="Geçersiz yorum ID formatı."
         )
     
-    # Yorumu bul
-    existing_review = await db.reviews.find_one({"_id": ObjectId(review_id)})
-    if not existing_review:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Yorum bulunamadı."
-        )
-    
-    # Yorum sahibi mi kontrol et
-    if existing_review["user_id"] != str(current_user["_id"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Bu yorumu düzenleme yetkiniz yok."
-        )
-    
     # Sadece dolu alanları güncelle
     update_data = {k: v for k, v in review_update.model_dump().items() if v is not None}
     
@@ -161,19 +175,24 @@ async def update_review(
         )
     
     update_data["updated_at"] = datetime.utcnow()
+    review_oid = ObjectId(review_id)
     
-    await db.reviews.update_one(
-        {"_id": ObjectId(review_id)},
-        {"$set": update_data}
+    # Yorumu sadece sahibi güncelleyebilir
+    existing_review = await db.reviews.find_one_and_update(
+        {"_id": review_oid, "user_id": str(current_user["_id"])},
+        {"$set": update_data},
+        return_document=ReturnDocument.BEFORE
     )
+    if not existing_review:
+        await _raise_missing_or_forbidden(db, review_oid, "Bu yorumu düzenleme yetkiniz yok.")
     
-    updated_review = await db.reviews.find_one({"_id": ObjectId(review_id)})
-    
-    # Eğer rating güncellendiyse, filmin ortalama puanını güncelle
-    if "rating" in update_data:
-        await update_movie_average_rating(db, existing_review["movie_id"])
+    # Eğer rating değiştiyse, filmin ortalama puanını güncelle
+    rating_delta = update_data.get("rating", existing_review["rating"]) - existing_review["rating"]
+    if rating_delta:
+        await apply_rating_delta(db, existing_review["movie_id"], rating_delta, 0)
+        await enqueue_taste_update(existing_review["user_id"], existing_review["movie_id"])
     
-    return ReviewResponse.model_validate(updated_review)
+    return ReviewResponse.model_validate({**existing_review, **update_data})
 
 
 # --- DELETE ---
@@ -184,7 +203,7 @@ async def delete_review(
     current_user=Depends(get_current_user)
 ):
     """
-    Kullanıcının kendi yorumunu siler.
+    Kullanıcının kendi yorumunu siler (admin herkesinkini silebilir).
     """
     if not is_valid_object_id(review_id):
         raise HTTPException(
@@ -192,28 +211,36 @@ async def delete_review(
             detail="Geçersiz yorum ID formatı."
         )
     
-    # Yorumu bul
-    existing_review = await db.reviews.find_one({"_id": ObjectId(review_id)})
-    if not existing_review:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Yorum bulunamadı."
-        )
+    review_oid = ObjectId(review_id)
     
-    # Yorum sahibi mi veya admin mi kontrol et
-    is_owner = existing_review["user_id"] == str(current_user["_id"])
+    # Yorum sahibi mi veya admin mi kontrol et (filtrede)
     is_admin = current_user.get("role") == "admin"
+    review_filter = {"_id": review_oid} if is_admin else {"_id": review_oid, "user_id": str(current_user["_id"])}
     
-    if not is_owner and not is_admin:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Bu yorumu silme yetkiniz yok."
-        )
-    
-    movie_id = existing_review["movie_id"]
-    await db.reviews.delete_one({"_id": ObjectId(review_id)})
+    deleted_review = await db.reviews.find_one_and_delete(review_filter, projection={"movie_id": 1, "user_id": 1, "rating": 1, "created_at": 1})
+    if not deleted_review:
+        await _raise_missing_or_forbidden(db, review_oid, "Bu yorumu silme yetkiniz yok.")
     
-    # Filmin ortalama puanını güncelle
-    await update_movie_average_rating(db, movie_id)
+    # Filmin ortalama puanını ve yorum sahibinin öneri vektörünü güncelle
+    await apply_rating_delta(db, deleted_review["movie_id"], -deleted_review["rating"], -1)
+    await enqueue_taste_update(deleted_review["user_id"], deleted_review["movie_id"])
+    if deleted_review.get("created_at"):
+        await leaderboard_store.record_review_activity(deleted_review["movie_id"], -1, at=deleted_review["created_at"])
     
     return None
+
+
+# --- ONARIM (Sadece Admin) ---
+@router.post("/{movie_id}/recompute", status_code=status.HTTP_202_ACCEPTED)
+async def recompute_movie_rating(movie_id: str, admin: dict = Depends(get_current_admin_user)):
+    """
+    Filmin puan sayaçlarını tüm yorumlarından baştan hesaplayan onarım işini kuyruğa
+    bırakır. Yazma yolları sayaçları artımlı günceller; bu sadece kayma şüphesinde gerekir.
+    """
+    if not is_valid_object_id(movie_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Geçersiz film ID formatı."
+        )
+    await enqueue_rating_recompute(movie_id)
+    return {"message": "Puan yeniden hesaplama işi kuyruğa alındı."}
@@ -47,4 +47,9 @@ class ReviewResponse(ReviewBase):
                 "user_id": "user123_id_string"
             }
         }
-    )
\ No newline at end of file
+    )
+
+# --- YAZAR BİLGİLİ YANIT ---
+# Listelemede include_author=true ile kullanıcı adı tek toplu sorguyla eklenir.
+class ReviewWithAuthor(ReviewResponse):
+    author_username: Optional[str] = None
@@ -0,0 +1,27 @@
+"""Yorum listeleri için hızlı yanıt yolu (bkz. app/services/movies/serializers.py)."""
+from datetime import datetime
+from typing import List
+
+from app.core.responses import FastJSONResponse, fast_json_enabled
+from .schemas import ReviewWithAuthor
+
+REVIEW_PROJECTION = {name: 1 for name in ReviewWithAuthor.model_fields if name not in ("id", "author_username")}
+
+REVIEW_DEFAULTS = {
+    name: field.get_default(call_default_factory=True)
+    for name, field in ReviewWithAuthor.model_fields.items()
+    if not field.is_required() and name not in ("id", "created_at")
+}
+
+
+def shape_review(doc: dict) -> dict:
+    review = {**REVIEW_DEFAULTS, **doc}
+    if "created_at" not in review:
+        review["created_at"] = datetime.utcnow()
+    return review
+
+
+def reviews_response(docs: List[dict]):
+    if fast_json_enabled():
+        return FastJSONResponse([shape_review(doc) for doc in docs])
+    return docs  # response_model tek başına doğrular
@@ -0,0 +1,42 @@
+"""
+Arka plan işlerini API sürecinden ayrı çalıştırır.
+
+    JOB_WORKERS_IN_APP=false uvicorn app.main:app ...   # API sadece iş bırakır
+    python -m app.worker                                # işleri bu süreç işler
+"""
+import asyncio
+import signal
+
+from app.core.config import settings
+from app.core.database import connect_to_mongo, close_mongo_connection
+from app.core.redis import connect_to_redis, close_redis_connection
+from app.core.jobs import JobWorkers
+
+# Handler'lar import sırasında kaydolur
+from app.services.movies import jobs as movie_jobs  # noqa: F401
+from app.services.reviews import jobs as review_jobs  # noqa: F401
+from app.services.leaderboards import jobs as leaderboard_jobs  # noqa: F401
+
+
+async def main() -> None:
+    await connect_to_mongo()
+    await connect_to_redis()
+
+    workers = JobWorkers(settings.JOB_WORKER_CONCURRENCY)
+    if not await workers.start():
+        await close_mongo_connection()
+        raise SystemExit("İş kuyruğu başlatılamadı: Redis erişilebilir olmalı.")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await stop.wait()
+    await workers.stop()
+    await close_redis_connection()
+    await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1 @@
+"""Mikro-benchmark suite'leri (python -m benchmarks.<suite>)."""
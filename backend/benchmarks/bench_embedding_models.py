@@ -0,0 +1,123 @@
+"""
+Registry'deki embedding modellerini (app.core.embeddings.EMBEDDING_MODELS) kendi
+kataloğumuz üzerinde karşılaştırır. Her model için:
+
+1. Yükleme süresi (model cache'te değilse indirme dahil)
+2. Katalog embed verimi (metin/sn, EMBEDDING_THREADS / --threads ile)
+3. Tek sorgu gecikmesi (arama kutusu yolu)
+4. Geri getirme kalitesi: her filmin açıklaması sorgu, tüm katalog (başlık + yönetmen +
+   tür + açıklama) aday; doğru filmin sırasından recall@1, recall@10 ve MRR.
+   Etiketli veri olmadığı için göreli bir vekil ölçüdür; modeller arası kıyas içindir.
+
+Mongo erişilemezse sentetik metinlerle sadece hız ölçülür.
+
+Kullanım (backend/ dizininden):
+    python -m benchmarks.bench_embedding_models --catalog-size 2000
+    python -m benchmarks.bench_embedding_models --models minilm-l12,minilm-l12-q8 --threads 4 --save
+    python -m benchmarks.bench_embedding_models --check
+
+Seçilen modele geçmek için EMBEDDING_MODEL ayarlanır; açılışta eski vektörler
+arka planda yeniden embed edilir.
+"""
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.core.embeddings import EMBEDDING_MODELS, generate_embeddings, load_embedding_model, movie_embedding_text
+from benchmarks.harness import BenchmarkSuite, run_suite
+
+SAMPLE_TEXT = "Hapishaneden kaçışı anlatan, dostluk ve umut üzerine hüzünlü bir dram filmi."
+BATCH_SIZE = 64
+
+
+async def _load_catalog(limit: int) -> Optional[List[dict]]:
+    from app.core.database import close_mongo_connection, connect_to_mongo, get_database
+
+    try:
+        await connect_to_mongo()
+        db = await get_database()
+        return await db["movies"].find(
+            {"description": {"$nin": [None, ""]}},
+            {"title": 1, "director": 1, "genre": 1, "description": 1}
+        ).limit(limit).to_list(length=limit)
+    except Exception as e:
+        print(f"Katalog okunamadı, sentetik metin kullanılacak: {e}")
+        return None
+    finally:
+        await close_mongo_connection()
+
+
+def _retrieval_quality(doc_vectors: np.ndarray, query_vectors: np.ndarray) -> Tuple[float, float, float]:
+    """i. sorgunun doğru cevabı i. doküman. (recall@1, recall@10, MRR)"""
+    docs = doc_vectors / np.linalg.norm(doc_vectors, axis=1, keepdims=True)
+    queries = query_vectors / np.linalg.norm(query_vectors, axis=1, keepdims=True)
+    ranks = []
+    for start in range(0, len(queries), 512):
+        scores = queries[start:start + 512] @ docs.T
+        correct = scores[np.arange(scores.shape[0]), np.arange(start, start + scores.shape[0])]
+        ranks.extend((scores > correct[:, None]).sum(axis=1) + 1)
+    ranks = np.asarray(ranks)
+    return float(np.mean(ranks <= 1)), float(np.mean(ranks <= 10)), float(np.mean(1.0 / ranks))
+
+
+async def embedding_models_suite(suite: BenchmarkSuite, args) -> None:
+    keys = args.models.split(",") if args.models else list(EMBEDDING_MODELS)
+    catalog = await _load_catalog(args.catalog_size)
+    if catalog:
+        doc_texts = [movie_embedding_text(movie) for movie in catalog]
+        query_texts = [movie["description"] for movie in catalog]
+    else:
+        doc_texts = [f"{SAMPLE_TEXT} #{i}" for i in range(args.catalog_size)]
+        query_texts = None
+
+    for key in keys:
+        if key not in EMBEDDING_MODELS:
+            suite.skip(key, "registry'de yok")
+            continue
+
+        started = time.perf_counter()
+        try:
+            model = load_embedding_model(key, threads=args.threads)
+        except Exception as e:
+            suite.skip(f"{key}_load", f"model yüklenemedi: {e}")
+            continue
+        load_s = time.perf_counter() - started
+
+        # Katalog embed verimi (kalite ölçümü için vektörler de buradan gelir)
+        started = time.perf_counter()
+        doc_vectors = np.asarray(generate_embeddings(doc_texts, BATCH_SIZE, model=model), dtype=np.float32)
+        catalog_s = time.perf_counter() - started
+
+        quality = {}
+        if query_texts:
+            query_vectors = np.asarray(generate_embeddings(query_texts, BATCH_SIZE, model=model), dtype=np.float32)
+            recall_1, recall_10, mrr = _retrieval_quality(doc_vectors, query_vectors)
+            quality = {"recall_at_1": round(recall_1, 4), "recall_at_10": round(recall_10, 4), "mrr": round(mrr, 4)}
+
+        batch = doc_texts[:BATCH_SIZE]
+        suite.bench(
+            f"{key}_batch_{BATCH_SIZE}",
+            lambda: generate_embeddings(batch, BATCH_SIZE, model=model),
+            rounds=5,
+            load_s=round(load_s, 2),
+            catalog_texts_per_s=round(len(doc_texts) / catalog_s, 1),
+        )
+        suite.bench(
+            f"{key}_query",
+            lambda: generate_embeddings([SAMPLE_TEXT], model=model),
+            rounds=50,
+            dim=EMBEDDING_MODELS[key]["dim"],
+            **quality,
+        )
+        del model, doc_vectors
+
+
+def _configure(parser) -> None:
+    parser.add_argument("--models", default="", help="Virgülle ayrılmış registry anahtarları (boşsa hepsi)")
+    parser.add_argument("--catalog-size", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=None, help="ONNX thread sayısı (boşsa EMBEDDING_THREADS)")
+
+
+if __name__ == "__main__":
+    run_suite("embedding_models", embedding_models_suite, _configure)
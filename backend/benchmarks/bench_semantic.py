@@ -0,0 +1,108 @@
+"""
+Semantik arama hattının aşamalarını ayrı ayrı ölçer:
+
+1. `generate_embeddings` gecikmesi (batch boyutu 1..64)
+2. Fallback'teki NumPy kosinüs skorlaması (1k, 10k, 100k, 1M sentetik vektör)
+3. Sonuçların `str()` ile serileştirilmesi
+4. Redis önbellek hit yolu (`semantic_search_movies`, REDIS_URL erişilebilirse)
+
+Kullanım (backend/ dizininden):
+    python -m benchmarks.bench_semantic --check
+    python -m benchmarks.bench_semantic --max-vectors 100000 --save
+
+1M vektör float32 ile ~1.5GB bellek ister; --max-vectors ile sınırlanabilir.
+"""
+import numpy as np
+
+from app.core.embeddings import cosine_scores, generate_embeddings
+from benchmarks.harness import BenchmarkSuite, run_suite
+
+EMBEDDING_DIM = 384
+BATCH_SIZES = [1, 2, 4, 8, 16, 32, 64]
+VECTOR_COUNTS = [1_000, 10_000, 100_000, 1_000_000]
+SAMPLE_TEXT = "Hapishaneden kaçışı anlatan, dostluk ve umut üzerine hüzünlü bir dram filmi."
+
+
+def _synthetic_vectors(count: int, rng: np.random.Generator) -> np.ndarray:
+    vectors = rng.standard_normal((count, EMBEDDING_DIM), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def _synthetic_results(count: int) -> list[dict]:
+    return [
+        {
+            "_id": f"{i:024x}",
+            "title": f"Film {i}",
+            "year": 1990 + i % 30,
+            "director": "Christopher Nolan",
+            "genre": ["Drama", "Sci-Fi"],
+            "poster_url": None,
+            "score": 0.5 + i / (2 * count),
+        }
+        for i in range(count)
+    ]
+
+
+async def _bench_cache_hit(suite: BenchmarkSuite) -> None:
+    from app.core.redis import close_redis_connection, connect_to_redis, get_redis
+    from app.services.agent.tools import semantic_search_movies
+
+    await connect_to_redis()
+    redis = get_redis()
+    try:
+        await redis.ping()
+    except Exception as e:
+        suite.skip("semantic_cache_hit", f"Redis erişilemiyor: {e}")
+        return
+
+    # İlk çağrı önbelleği doldurur (Mongo gerekir); doldurulamazsa hit yolu ölçülemez
+    from app.core.database import close_mongo_connection, connect_to_mongo
+    await connect_to_mongo()
+    query = {"user_query": SAMPLE_TEXT, "limit": 5}
+    try:
+        await semantic_search_movies.ainvoke(query)
+        await suite.abench("semantic_cache_hit", lambda: semantic_search_movies.ainvoke(query), rounds=200)
+    finally:
+        await close_mongo_connection()
+        await close_redis_connection()
+
+
+async def semantic_suite(suite: BenchmarkSuite, args) -> None:
+    rng = np.random.default_rng(42)
+
+    # 1. Embedding çıkarımı
+    for batch_size in BATCH_SIZES:
+        texts = [f"{SAMPLE_TEXT} #{i}" for i in range(batch_size)]
+        result = suite.bench(f"embedding_batch_{batch_size}", lambda: generate_embeddings(texts), rounds=10)
+        result.extra["per_text_ms"] = round(result.median_s * 1e3 / batch_size, 3)
+
+    # 2. Kosinüs skorlaması
+    query_vector = _synthetic_vectors(1, rng)[0]
+    for count in VECTOR_COUNTS:
+        if count > args.max_vectors:
+            suite.skip(f"cosine_scores_{count}", f"--max-vectors={args.max_vectors}")
+            continue
+        doc_vecs = _synthetic_vectors(count, rng)
+        suite.bench(f"cosine_scores_{count}", lambda: cosine_scores(query_vector, doc_vecs), rounds=10 if count >= 100_000 else 30)
+        del doc_vecs
+
+    # 3. str() serileştirme
+    for count in (5, 100, 1000):
+        results = _synthetic_results(count)
+        suite.bench(f"str_serialize_{count}", lambda: str(results), rounds=100)
+
+    # 4. Redis önbellek hit yolu
+    if args.skip_redis:
+        suite.skip("semantic_cache_hit", "--skip-redis")
+    else:
+        await _bench_cache_hit(suite)
+
+
+def _configure(parser) -> None:
+    parser.add_argument("--max-vectors", type=int, default=1_000_000)
+    parser.add_argument("--skip-redis", action="store_true")
+
+
+if __name__ == "__main__":
+    run_suite("semantic", semantic_suite, _configure)
@@ -0,0 +1,109 @@
+"""
+Okuma endpoint'lerinde yanıt serileştirme maliyeti (istek başına CPU):
+
+- "response_model_*": FastAPI'nin varsayılan yolu; ham Mongo dokümanları
+  response_model ile doğrulanır, JSON uyumlu dict'e dökülür ve json.dumps ile yazılır.
+  Yorumlarda handler'ın eski elle `model_validate` çağrısı da dahildir (çift doğrulama).
+- "fast_*": FAST_JSON_RESPONSES yolu; projeksiyonla şekli garanti edilmiş
+  dokümanlar varsayılanlarla tamamlanıp doğrudan orjson ile yazılır.
+
+Mongo/ağ gerekmez; sentetik dokümanlarla sadece CPU ölçülür.
+
+Kullanım (backend/ dizininden):
+    python -m benchmarks.bench_serialization --save
+    python -m benchmarks.bench_serialization --check
+"""
+import json
+import time
+from datetime import datetime
+from typing import List
+
+from bson import ObjectId
+from pydantic import TypeAdapter
+
+from app.core.responses import FastJSONResponse
+from app.services.movies.schemas import MovieDB
+from app.services.movies.serializers import shape_movie
+from app.services.reviews.schemas import ReviewWithAuthor
+from app.services.reviews.serializers import shape_review
+from benchmarks.harness import BenchmarkSuite, run_suite
+
+ROUNDS = 300
+MOVIES_PER_PAGE = 100
+REVIEWS_PER_PAGE = 100
+
+movie_adapter = TypeAdapter(List[MovieDB])
+review_adapter = TypeAdapter(List[ReviewWithAuthor])
+
+
+def _movie_docs(count: int) -> List[dict]:
+    return [
+        {
+            "_id": ObjectId(),
+            "title": f"Film {i}",
+            "year": 1990 + i % 30,
+            "director": "Nuri Bilge Ceylan",
+            "genre": ["Drama", "Sci-Fi"],
+            "cast": [f"Oyuncu {j}" for j in range(5)],
+            "description": "Hapishaneden kaçışı anlatan, dostluk ve umut üzerine hüzünlü bir dram filmi. " * 3,
+            "average_rating": 7.4,
+            "poster_url": f"https://example.com/posters/{i}.jpg",
+            "similar_movies": [ObjectId() for _ in range(10)],
+            "created_at": datetime(2024, 1, 1, 12, 0, i % 60),
+        }
+        for i in range(count)
+    ]
+
+
+def _review_docs(count: int) -> List[dict]:
+    movie_id = str(ObjectId())
+    return [
+        {
+            "_id": ObjectId(),
+            "rating": 1 + i % 10,
+            "comment": "Mükemmel bir filmdi, kesinlikle izleyin.",
+            "movie_id": movie_id,
+            "user_id": str(ObjectId()),
+            "created_at": datetime(2024, 1, 1, 12, 0, i % 60),
+        }
+        for i in range(count)
+    ]
+
+
+def _fastapi_default(adapter: TypeAdapter, content) -> bytes:
+    """fastapi.routing.serialize_response + JSONResponse.render eşleniği."""
+    value = adapter.validate_python(content)
+    jsonable = adapter.dump_python(value, mode="json", by_alias=True)
+    return json.dumps(jsonable, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def _measure(suite: BenchmarkSuite, name: str, fn) -> None:
+    cpu_start = time.process_time()
+    suite.bench(name, fn, rounds=ROUNDS, warmup=10)
+    cpu_ms = (time.process_time() - cpu_start) / (ROUNDS + 10) * 1e3
+    print(f"{'':<48} cpu/istek={cpu_ms:.3f}ms")
+
+
+async def serialization_suite(suite: BenchmarkSuite, args) -> None:
+    movies = _movie_docs(MOVIES_PER_PAGE)
+    reviews = _review_docs(REVIEWS_PER_PAGE)
+
+    _measure(suite, f"response_model_movies_{MOVIES_PER_PAGE}", lambda: _fastapi_default(movie_adapter, movies))
+    _measure(suite, f"fast_movies_{MOVIES_PER_PAGE}", lambda: FastJSONResponse([shape_movie(m) for m in movies]).body)
+
+    _measure(
+        suite,
+        f"response_model_reviews_{REVIEWS_PER_PAGE}",
+        lambda: _fastapi_default(review_adapter, [ReviewWithAuthor.model_validate(r) for r in reviews]),
+    )
+    _measure(suite, f"fast_reviews_{REVIEWS_PER_PAGE}", lambda: FastJSONResponse([shape_review(r) for r in reviews]).body)
+
+    # İki yolun aynı JSON'u ürettiğini kontrol et (anahtar sırası hariç)
+    legacy = json.loads(_fastapi_default(movie_adapter, movies))
+    fast = json.loads(FastJSONResponse([shape_movie(m) for m in movies]).body)
+    if legacy != fast:
+        print("UYARI: hızlı yol ile response_model çıktıları farklı!")
+
+
+if __name__ == "__main__":
+    run_suite("serialization", serialization_suite)
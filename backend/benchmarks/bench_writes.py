@@ -0,0 +1,157 @@
+"""
+Yazma yollarının round-trip sayısı ve gecikmesi: eski sıralı sorgu zinciri ile
+mevcut handler'lar karşılaştırılır.
+
+"legacy_*" ölçümleri eski handler'ların Mongo çağrı sırasını birebir tekrarlar;
+"current_*" ölçümleri route fonksiyonlarını doğrudan çağırır. Her satırda
+işlem başına Mongo komut sayısı (round trip) da yazılır.
+
+Kullanım (backend/ dizininden, yerel mongod gerekir):
+    python -m benchmarks.bench_writes --save
+    python -m benchmarks.bench_writes --check
+
+Ölçümler `<DB_NAME>_bench` veritabanında yapılır ve sonunda o veritabanı silinir.
+Yorum yazarken filmin puan sayaçları atomik tek update ile güncellenir (yazma yolunda).
+Diğer türetilmiş veri işleri (öneri vektörü, embedding, cache) Redis kuyruğuna bırakılır;
+Redis erişilemezse inline çalışır ve "current_*" süreleri buna göre yükselir.
+"""
+import itertools
+from datetime import datetime
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+from app.core.config import settings
+from app.core.database import ensure_indexes
+from app.core.redis import close_redis_connection, connect_to_redis
+from app.core.security import get_password_hash
+from app.services.auth.schemas import UserCreate
+from app.services.auth import utils as auth_utils
+from app.services.auth.utils import create_user
+from app.services.movies.routes import create_movie, update_movie
+from app.services.movies.schemas import MovieCreate, MovieUpdate
+from app.services.reviews.jobs import update_movie_average_rating
+from app.services.reviews.routes import create_review
+from app.services.reviews.schemas import ReviewCreate
+from benchmarks.harness import BenchmarkSuite, run_suite
+
+ROUNDS = 200
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def _movie_payload(i: int) -> MovieCreate:
+    return MovieCreate(title=f"Bench {i}", year=2000, director="Bench Director", genre=["Drama"])
+
+
+# --- Eski handler'ların sorgu zincirleri ---
+async def legacy_create_movie(db, i: int):
+    movie_data = jsonable_encoder(_movie_payload(i))
+    new_movie = await db["movies"].insert_one(movie_data)
+    return await db["movies"].find_one({"_id": new_movie.inserted_id}, {"embedding": 0})
+
+
+async def legacy_update_movie(db, oid: ObjectId, i: int):
+    result = await db["movies"].update_one({"_id": oid}, {"$set": {"title": f"Legacy {i}"}})
+    if result.modified_count == 1:
+        return await db["movies"].find_one({"_id": oid}, {"embedding": 0})
+    return await db["movies"].find_one({"_id": oid}, {"embedding": 0})
+
+
+async def legacy_create_review(db, movie_id: str, user_id: str):
+    await db.movies.find_one({"_id": ObjectId(movie_id)}, {"embedding": 0})
+    await db.reviews.find_one({"movie_id": movie_id, "user_id": user_id})
+    doc = {"rating": 7, "comment": None, "movie_id": movie_id, "user_id": user_id, "created_at": datetime.utcnow()}
+    result = await db.reviews.insert_one(doc)
+    created = await db.reviews.find_one({"_id": result.inserted_id})
+    await update_movie_average_rating(db, movie_id)
+    return created
+
+
+async def legacy_create_user(db, i: int):
+    await db.users.find_one({"email": f"legacy_{i}@bench.example.com"})
+    await db.users.find_one({"username": f"legacy_{i}"})
+    doc = {
+        "email": f"legacy_{i}@bench.example.com", "username": f"legacy_{i}", "hashed_password": BENCH_HASH,
+        "is_active": True, "role": "user", "created_at": datetime.utcnow(),
+    }
+    await db.users.insert_one(doc)
+    return doc
+
+
+BENCH_HASH = ""
+
+
+async def _measure(suite: BenchmarkSuite, counter: CommandCounter, name: str, fn) -> None:
+    before = counter.count
+    result = await suite.abench(name, fn, rounds=ROUNDS, warmup=5)
+    result.extra["round_trips"] = round((counter.count - before) / (ROUNDS + 5), 2)
+    print(f"{'':<48} round_trips/op={result.extra['round_trips']}")
+
+
+async def writes_suite(suite: BenchmarkSuite, args) -> None:
+    global BENCH_HASH
+    BENCH_HASH = get_password_hash("bench123")
+
+    counter = CommandCounter()
+    client = AsyncIOMotorClient(settings.MONGO_URL, event_listeners=[counter])
+    db_name = f"{settings.DB_NAME}_bench"
+    db = client[db_name]
+    await client.drop_database(db_name)
+    await ensure_indexes(db)
+    await connect_to_redis()
+
+    ids = itertools.count()
+    admin = {"_id": ObjectId(), "role": "admin"}
+
+    # Film oluşturma
+    await _measure(suite, counter, "legacy_create_movie", lambda: legacy_create_movie(db, next(ids)))
+    await _measure(suite, counter, "current_create_movie",
+                   lambda: create_movie(movie=_movie_payload(next(ids)), db=db, admin=admin))
+
+    # Film güncelleme
+    target = (await db.movies.insert_one(jsonable_encoder(_movie_payload(0)))).inserted_id
+    await _measure(suite, counter, "legacy_update_movie", lambda: legacy_update_movie(db, target, next(ids)))
+    await _measure(suite, counter, "current_update_movie",
+                   lambda: update_movie(id=str(target), movie=MovieUpdate(title=f"Current {next(ids)}"), db=db, admin=admin))
+
+    # Yorum oluşturma (her seferinde farklı kullanıcı)
+    movie_id = str(target)
+    await _measure(suite, counter, "legacy_create_review", lambda: legacy_create_review(db, movie_id, str(ObjectId())))
+    await _measure(suite, counter, "current_create_review",
+                   lambda: create_review(movie_id=movie_id, review=ReviewCreate(rating=7), db=db, current_user={"_id": ObjectId()}))
+
+    # Kullanıcı kaydı: bcrypt ölçümü domine etmesin diye iki tarafta da hazır hash kullanılır
+    original_hash = auth_utils.get_password_hash
+    auth_utils.get_password_hash = lambda _: BENCH_HASH
+    try:
+        await _measure(suite, counter, "legacy_create_user", lambda: legacy_create_user(db, next(ids)))
+        await _measure(suite, counter, "current_create_user", lambda: create_user(db, _user(next(ids))))
+    finally:
+        auth_utils.get_password_hash = original_hash
+
+    await client.drop_database(db_name)
+    client.close()
+    await close_redis_connection()
+
+
+def _user(i: int) -> UserCreate:
+    return UserCreate(email=f"current_{i}@bench.example.com", username=f"cur_{i}", password="bench123")
+
+
+if __name__ == "__main__":
+    run_suite("writes", writes_suite)
@@ -0,0 +1,142 @@
+"""
+Küçük mikro-benchmark altyapısı (pytest-benchmark benzeri, ek bağımlılık yok).
+
+Her suite sonuçlarını `benchmarks/baselines/<suite>.json` dosyasına kaydedebilir
+ve sonraki çalıştırmalarda medyan süreyi bu baseline ile karşılaştırır:
+
+    python -m benchmarks.bench_semantic --save     # baseline'ı güncelle
+    python -m benchmarks.bench_semantic --check    # %25'ten fazla yavaşlama varsa exit 1
+
+Baseline'lar makineye özgüdür; aynı makinede karşılaştırılmalıdır.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    rounds: int
+    min_s: float
+    median_s: float
+    p95_s: float
+    mean_s: float
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+def _summarize(name: str, timings: List[float], extra: Dict[str, Any]) -> BenchmarkResult:
+    ordered = sorted(timings)
+    p95_index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+    return BenchmarkResult(
+        name=name,
+        rounds=len(ordered),
+        min_s=ordered[0],
+        median_s=statistics.median(ordered),
+        p95_s=ordered[p95_index],
+        mean_s=statistics.fmean(ordered),
+        extra=extra,
+    )
+
+
+class BenchmarkSuite:
+    """Bir grup ölçümü çalıştırır, yazdırır ve baseline ile karşılaştırır."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.results: List[BenchmarkResult] = []
+
+    def bench(self, name: str, fn: Callable[[], Any], *, rounds: int = 20, warmup: int = 2, **extra) -> BenchmarkResult:
+        for _ in range(warmup):
+            fn()
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        return self._record(_summarize(name, timings, extra))
+
+    async def abench(self, name: str, fn: Callable[[], Awaitable[Any]], *, rounds: int = 20, warmup: int = 2, **extra) -> BenchmarkResult:
+        for _ in range(warmup):
+            await fn()
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            await fn()
+            timings.append(time.perf_counter() - start)
+        return self._record(_summarize(name, timings, extra))
+
+    def skip(self, name: str, reason: str) -> None:
+        print(f"{name:<48} ATLANDI ({reason})")
+
+    def _record(self, result: BenchmarkResult) -> BenchmarkResult:
+        self.results.append(result)
+        extra = " ".join(f"{k}={v}" for k, v in result.extra.items())
+        print(
+            f"{result.name:<48} median={result.median_s * 1e3:10.3f}ms "
+            f"p95={result.p95_s * 1e3:10.3f}ms min={result.min_s * 1e3:10.3f}ms {extra}"
+        )
+        return result
+
+    # --- Baseline ---
+    @property
+    def baseline_path(self) -> Path:
+        return BASELINE_DIR / f"{self.name}.json"
+
+    def save(self) -> None:
+        BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "suite": self.name,
+            "machine": platform.node(),
+            "python": platform.python_version(),
+            "results": {result.name: asdict(result) for result in self.results},
+        }
+        self.baseline_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        print(f"\nBaseline kaydedildi: {self.baseline_path}")
+
+    def check(self, tolerance: float) -> bool:
+        if not self.baseline_path.exists():
+            print(f"\nBaseline yok ({self.baseline_path}); önce --save ile oluşturun.")
+            return True
+
+        baseline = json.loads(self.baseline_path.read_text(encoding="utf-8"))["results"]
+        ok = True
+        print(f"\nBaseline karşılaştırması (tolerans %{tolerance * 100:.0f}):")
+        for result in self.results:
+            old = baseline.get(result.name)
+            if not old:
+                print(f"  {result.name:<46} yeni ölçüm")
+                continue
+            change = (result.median_s - old["median_s"]) / old["median_s"] if old["median_s"] else 0.0
+            regressed = change > tolerance
+            ok = ok and not regressed
+            print(f"  {result.name:<46} {change * 100:+7.1f}% {'KÖTÜLEŞME' if regressed else ''}")
+        return ok
+
+
+def run_suite(name: str, body: Callable[[BenchmarkSuite, argparse.Namespace], Awaitable[None]], configure_parser=None) -> None:
+    """Suite'lerin ortak CLI girişi: --save / --check / --tolerance."""
+    parser = argparse.ArgumentParser(description=f"{name} mikro-benchmark'ları")
+    parser.add_argument("--save", action="store_true", help="Sonuçları baseline olarak kaydet")
+    parser.add_argument("--check", action="store_true", help="Baseline'a göre kötüleşme varsa exit 1")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="İzin verilen medyan kötüleşmesi (0.25 = %%25)")
+    if configure_parser:
+        configure_parser(parser)
+    args = parser.parse_args()
+
+    suite = BenchmarkSuite(name)
+    asyncio.run(body(suite, args))
+
+    if args.save:
+        suite.save()
+    if args.check and not suite.check(args.tolerance):
+        sys.exit(1)
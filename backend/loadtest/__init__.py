@@ -0,0 +1 @@
+"""Locust yük testi paketi (senaryolar, veri yükleme ve raporlama)."""
@@ -0,0 +1,27 @@
+"""Seed script'i ile locustfile arasında paylaşılan sabitler."""
+
+LOADTEST_PASSWORD = "loadtest123"
+
+GENRES = ["Drama", "Comedy", "Action", "Sci-Fi", "Thriller", "Horror", "Romance", "Animation", "Crime", "Documentary"]
+
+DIRECTORS = [
+    "Christopher Nolan", "Nuri Bilge Ceylan", "Denis Villeneuve", "Greta Gerwig",
+    "Quentin Tarantino", "Bong Joon-ho", "Sofia Coppola", "Zeki Demirkubuz",
+]
+
+CHAT_PROMPTS = [
+    "Bana hüzünlü bir film öner",
+    "Uzayda geçen macera filmleri",
+    "Nolan'ın 2010 yapımı filmi",
+    "Hapishaneden kaçışı anlatan filmler",
+    "1999 yapımı bilim kurgu filmleri",
+    "Aile ile izlenecek komedi",
+]
+
+
+def user_email(index: int) -> str:
+    return f"load_user_{index}@loadtest.example.com"
+
+
+def user_name(index: int) -> str:
+    return f"load_{index}"
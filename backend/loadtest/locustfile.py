@@ -0,0 +1,153 @@
+"""
+FilmFlow yük testi senaryoları.
+
+Yerel ortam (backend/ dizininden):
+    docker compose up -d mongodb redis                # yerel mongod + redis
+    python -m loadtest.seed --movies 2000 --users 200 --drop
+    AGENT_FAKE_LLM=true AGENT_FAKE_LLM_LATENCY_MS=300 \
+        AGENT_USER_RATE_PER_MINUTE=60 AGENT_USER_BURST=10 uvicorn app.main:app --port 8000
+
+Sohbet kullanıcıları dakikada ~20 istek atar; varsayılan kullanıcı hız sınırıyla
+çoğu 429 alacağından yük testinde sınır yükseltilir.
+
+Çalıştırma:
+    PYTHONPATH=. locust -f loadtest/locustfile.py --host http://localhost:8000 \
+        --headless -u 200 -r 20 -t 5m --release v1.2.0
+
+Test bitince `loadtest/reports/<release>.json` dosyasına endpoint bazında
+p50/p95/p99 ve throughput yazılır; `python -m loadtest.report` ile karşılaştırılır.
+"""
+import random
+
+from locust import HttpUser, between, events, task
+
+from loadtest.common import CHAT_PROMPTS, DIRECTORS, GENRES, LOADTEST_PASSWORD, user_email
+from loadtest.report import write_report
+
+SEEDED_USER_COUNT = 200
+_movie_ids: list[str] = []
+
+
+@events.init_command_line_parser.add_listener
+def _add_arguments(parser):
+    parser.add_argument("--release", type=str, default="local", help="Rapor dosyasının adı (sürüm etiketi)")
+    parser.add_argument("--report-dir", type=str, default="loadtest/reports")
+    parser.add_argument("--seeded-users", type=int, default=SEEDED_USER_COUNT, help="seed.py ile yüklenen kullanıcı sayısı")
+
+
+@events.quitting.add_listener
+def _write_report(environment, **kwargs):
+    options = environment.parsed_options
+    target = write_report(environment.stats, options.release, options.report_dir)
+    print(f"Yük testi raporu yazıldı: {target}")
+
+
+class FilmFlowUser(HttpUser):
+    abstract = True
+    wait_time = between(0.5, 2)
+
+    def movie_id(self) -> str:
+        if not _movie_ids:
+            response = self.client.get("/api/movies/", params={"limit": 100}, name="/api/movies/ [warmup]")
+            if response.ok:
+                _movie_ids.extend(movie["_id"] for movie in response.json())
+        return random.choice(_movie_ids) if _movie_ids else "000000000000000000000000"
+
+    def login(self) -> None:
+        index = random.randrange(self.environment.parsed_options.seeded_users)
+        response = self.client.post(
+            "/api/auth/login",
+            data={"username": user_email(index), "password": LOADTEST_PASSWORD},
+            name="/api/auth/login",
+        )
+        if response.ok:
+            self.client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+
+class BrowsingUser(FilmFlowUser):
+    """Anonim gezinti: filtreli listeleme, sayfalama, detay ve yorumlar."""
+
+    weight = 10
+
+    @task(4)
+    def browse_movies(self):
+        params = {"limit": random.choice([10, 20, 50]), "skip": random.choice([0, 0, 10, 20, 100])}
+        filter_kind = random.random()
+        if filter_kind < 0.3:
+            params["genre"] = random.choice(GENRES)
+        elif filter_kind < 0.5:
+            params["year"] = random.randint(1950, 2025)
+        elif filter_kind < 0.6:
+            params["director"] = random.choice(DIRECTORS).split()[-1]
+        elif filter_kind < 0.7:
+            params["title"] = "Filmi 1"
+        self.client.get("/api/movies/", params=params, name="/api/movies/ [list]")
+
+    @task(3)
+    def movie_detail_with_reviews(self):
+        movie_id = self.movie_id()
+        self.client.get(f"/api/movies/{movie_id}", name="/api/movies/{id}")
+        self.client.get(f"/api/reviews/{movie_id}", name="/api/reviews/{movie_id}")
+
+
+class LoginStormUser(FilmFlowUser):
+    """Aynı anda çok sayıda giriş: bcrypt doğrulamasının maliyetini ölçer."""
+
+    weight = 2
+    wait_time = between(0.1, 0.5)
+
+    @task
+    def login_storm(self):
+        self.login()
+
+
+class ReviewWriterUser(FilmFlowUser):
+    """Yorum yazma, güncelleme ve silme döngüsü."""
+
+    weight = 3
+
+    def on_start(self):
+        self.login()
+
+    @task
+    def write_review(self):
+        movie_id = self.movie_id()
+        with self.client.post(
+            f"/api/reviews/{movie_id}",
+            json={"rating": random.randint(1, 10), "comment": "[loadtest] otomatik yorum"},
+            name="/api/reviews/{movie_id} [create]",
+            catch_response=True,
+        ) as response:
+            if response.status_code == 400:
+                # Aynı filme ikinci yorum: iş kuralı gereği beklenen cevap
+                response.success()
+                return
+            if not response.ok:
+                return
+            review_id = response.json()["_id"]
+
+        if random.random() < 0.5:
+            self.client.put(
+                f"/api/reviews/{review_id}",
+                json={"rating": random.randint(1, 10)},
+                name="/api/reviews/{review_id} [update]",
+            )
+        self.client.delete(f"/api/reviews/{review_id}", name="/api/reviews/{review_id} [delete]")
+
+
+class AgentChatUser(FilmFlowUser):
+    """AI ajanı ile sohbet (sunucu AGENT_FAKE_LLM=true ile çalışmalı)."""
+
+    weight = 1
+    wait_time = between(2, 5)
+
+    def on_start(self):
+        self.login()
+
+    @task
+    def chat(self):
+        self.client.post(
+            "/api/agent/chat",
+            json={"message": random.choice(CHAT_PROMPTS), "history": []},
+            name="/api/agent/chat",
+        )
@@ -0,0 +1,101 @@
+"""
+Locust istatistiklerinden sürümler arası karşılaştırılabilir JSON raporu üretir.
+
+Karşılaştırma (backend/ dizininden):
+    python -m loadtest.report loadtest/reports/v1.0.json loadtest/reports/v1.1.json --threshold 0.10
+
+p95 süresi veya hata oranı eşikten fazla kötüleşen endpoint varsa çıkış kodu 1 olur.
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+PERCENTILES = {"p50": 0.50, "p95": 0.95, "p99": 0.99}
+
+
+def _entry_summary(entry) -> dict:
+    summary = {
+        "requests": entry.num_requests,
+        "failures": entry.num_failures,
+        "failure_ratio": round(entry.fail_ratio, 4),
+        "rps": round(entry.total_rps, 2),
+        "avg_ms": round(entry.avg_response_time, 2),
+        "max_ms": round(entry.max_response_time or 0, 2),
+    }
+    for label, percentile in PERCENTILES.items():
+        summary[f"{label}_ms"] = entry.get_response_time_percentile(percentile) if entry.num_requests else 0
+    return summary
+
+
+def build_report(stats, release: str) -> dict:
+    """Locust `RequestStats` nesnesinden endpoint bazında özet çıkarır."""
+    endpoints = {
+        f"{entry.method} {entry.name}": _entry_summary(entry)
+        for entry in sorted(stats.entries.values(), key=lambda e: (e.name, e.method))
+    }
+    return {
+        "release": release,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "total": _entry_summary(stats.total),
+        "endpoints": endpoints,
+    }
+
+
+def write_report(stats, release: str, report_dir: str) -> Path:
+    path = Path(report_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    target = path / f"{release}.json"
+    target.write_text(json.dumps(build_report(stats, release), indent=2, ensure_ascii=False), encoding="utf-8")
+    return target
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Eşiği aşan kötüleşmeleri döndürür ve tüm satırları tablo olarak basar."""
+    regressions = []
+    names = sorted(set(baseline["endpoints"]) | set(current["endpoints"]))
+
+    print(f"{'endpoint':<45} {'p50':>14} {'p95':>16} {'p99':>16} {'rps':>14}")
+    for name in names + ["TOTAL"]:
+        old = baseline["total"] if name == "TOTAL" else baseline["endpoints"].get(name)
+        new = current["total"] if name == "TOTAL" else current["endpoints"].get(name)
+        if not old or not new:
+            print(f"{name:<45} (sadece bir raporda var)")
+            continue
+
+        cells = []
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            cells.append(f"{old[key]:>6.0f}->{new[key]:<6.0f}")
+        cells.append(f"{old['rps']:>5.1f}->{new['rps']:<5.1f}")
+        print(f"{name:<45} " + " ".join(f"{c:>14}" for c in cells))
+
+        if old["p95_ms"] and (new["p95_ms"] - old["p95_ms"]) / old["p95_ms"] > threshold:
+            regressions.append(f"{name}: p95 {old['p95_ms']}ms -> {new['p95_ms']}ms")
+        if new["failure_ratio"] - old["failure_ratio"] > threshold:
+            regressions.append(f"{name}: hata oranı {old['failure_ratio']} -> {new['failure_ratio']}")
+
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="İki yük testi raporunu karşılaştırır.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10, help="İzin verilen göreli kötüleşme (0.10 = %%10)")
+    args = parser.parse_args()
+
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    current = json.loads(Path(args.current).read_text(encoding="utf-8"))
+
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print("\nKötüleşmeler:")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+    print("\nKötüleşme yok.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Yük testi için yerel MongoDB'ye küçük, deterministik bir veri seti yükler.
+
+Kullanım (backend/ dizininden):
+    python -m loadtest.seed --movies 2000 --users 200 --drop
+
+Kullanıcılar `loadtest.common.user_email(i)` / `LOADTEST_PASSWORD` ile giriş yapabilir.
+"""
+import argparse
+import asyncio
+import random
+from datetime import datetime
+
+import numpy as np
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from loadtest.common import DIRECTORS, GENRES, LOADTEST_PASSWORD, user_email, user_name
+
+EMBEDDING_DIM = 384
+
+
+def build_movies(count: int, rng: random.Random, np_rng: np.random.Generator) -> list[dict]:
+    vectors = np_rng.standard_normal((count, EMBEDDING_DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    movies = []
+    for i in range(count):
+        director = rng.choice(DIRECTORS)
+        movies.append({
+            "title": f"Yük Testi Filmi {i}",
+            "year": rng.randint(1950, 2025),
+            "director": director,
+            "genre": rng.sample(GENRES, k=rng.randint(1, 3)),
+            "cast": [f"Oyuncu {rng.randint(1, 5000)}" for _ in range(4)],
+            "description": f"{director} imzalı, yük testi için üretilmiş {i}. film.",
+            "average_rating": 0.0,
+            "rating_sum": 0,
+            "review_count": 0,
+            "poster_url": None,
+            "similar_movies": [],
+            "created_at": datetime.now(),
+            "embedding": vectors[i].tolist(),
+        })
+    return movies
+
+
+def build_users(count: int) -> list[dict]:
+    # bcrypt pahalı: tüm kullanıcılar aynı şifreyi paylaştığı için tek hash yeterli
+    hashed_pw = get_password_hash(LOADTEST_PASSWORD)
+    return [
+        {
+            "email": user_email(i),
+            "username": user_name(i),
+            "hashed_password": hashed_pw,
+            "is_active": True,
+            "role": "user",
+            "created_at": datetime.utcnow(),
+        }
+        for i in range(count)
+    ]
+
+
+async def seed(movie_count: int, user_count: int, drop: bool, seed_value: int) -> None:
+    client = AsyncIOMotorClient(settings.MONGO_URL)
+    db = client[settings.DB_NAME]
+    rng = random.Random(seed_value)
+    np_rng = np.random.default_rng(seed_value)
+
+    if drop:
+        await db.movies.delete_many({"title": {"$regex": "^Yük Testi Filmi "}})
+        await db.users.delete_many({"email": {"$regex": "@loadtest\\.example\\.com$"}})
+        await db.reviews.delete_many({"comment": {"$regex": "^\\[loadtest\\]"}})
+
+    movies = build_movies(movie_count, rng, np_rng)
+    for start in range(0, len(movies), 1000):
+        await db.movies.insert_many(movies[start:start + 1000], ordered=False)
+    print(f"{movie_count} film eklendi.")
+
+    users = build_users(user_count)
+    if users:
+        await db.users.insert_many(users, ordered=False)
+    print(f"{user_count} kullanıcı eklendi (şifre: {LOADTEST_PASSWORD}).")
+
+    client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Yük testi verisi yükler.")
+    parser.add_argument("--movies", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--drop", action="store_true", help="Önceki yük testi verisini sil")
+    args = parser.parse_args()
+    asyncio.run(seed(args.movies, args.users, args.drop, args.seed))
+
+
+if __name__ == "__main__":
+    main()
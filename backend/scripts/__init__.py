@@ -0,0 +1 @@
+"""Geliştirme ve ölçek testi script'leri (python -m scripts.<ad>)."""
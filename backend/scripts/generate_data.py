@@ -0,0 +1,252 @@
+"""
+Ölçek testleri için sentetik katalog, kullanıcı ve yorum üreticisi.
+
+N film (MovieCreate ile uyumlu, birim normlu embedding'li), M kullanıcı ve
+R yorum üretip MongoDB'ye paralel `insert_many` batch'leri ile yükler.
+Yorumların filmlere dağılımı Zipf'tir: az sayıda film yorumların çoğunu alır.
+
+Kullanım (backend/ dizininden):
+    python -m scripts.generate_data --movies 1000000 --users 200000 --reviews 10000000 --drop
+    python -m scripts.generate_data --movies 5000 --users 500 --reviews 50000 --embeddings model
+
+`--embeddings random` (varsayılan) rastgele birim vektör üretir; `model` açıklamaları
+gerçek ONNX modeli ile embed eder (yavaş, küçük kataloglar için).
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import BulkWriteError
+
+from app.core.config import settings
+from app.core.embeddings import EMBEDDING_MODELS, current_embedding_model
+from app.core.security import get_password_hash
+from app.services.movies.schemas import MovieCreate
+
+EMBEDDING_DIM = EMBEDDING_MODELS[current_embedding_model()]["dim"]
+SYNTHETIC_PASSWORD = "synthetic123"
+SYNTHETIC_MARK = "[synthetic]"
+
+GENRES = [
+    "Drama", "Comedy", "Action", "Sci-Fi", "Thriller", "Horror", "Romance", "Animation",
+    "Crime", "Documentary", "Adventure", "Fantasy", "Mystery", "War", "Western", "Musical",
+]
+FIRST_NAMES = ["Ahmet", "Ayşe", "John", "Maria", "Kenji", "Elif", "David", "Sofia", "Mehmet", "Anna", "Luca", "Zeynep"]
+LAST_NAMES = ["Yılmaz", "Smith", "Kaya", "Rossi", "Tanaka", "Demir", "Müller", "García", "Nolan", "Ceylan", "Kurosawa", "Öztürk"]
+TITLE_WORDS = [
+    "Gece", "Yol", "Sessiz", "Kayıp", "Son", "Işık", "Deniz", "Rüya", "Gölge", "Şehir",
+    "Dark", "Silent", "Last", "River", "Storm", "Echo", "Garden", "Winter", "Mirror", "Horizon",
+]
+
+
+def _person(rng: np.random.Generator) -> str:
+    return f"{FIRST_NAMES[rng.integers(len(FIRST_NAMES))]} {LAST_NAMES[rng.integers(len(LAST_NAMES))]}"
+
+
+def zipf_probabilities(count: int, exponent: float, rng: np.random.Generator) -> np.ndarray:
+    """Rastgele bir popülerlik sıralamasına göre p(i) ∝ 1 / rank^s olasılıkları."""
+    ranks = rng.permutation(count) + 1
+    weights = 1.0 / np.power(ranks, exponent)
+    return weights / weights.sum()
+
+
+def sample_reviews(movie_count: int, user_count: int, review_count: int, args, rng: np.random.Generator):
+    """
+    (film, kullanıcı, puan) üçlülerini üretir. Aynı kullanıcı bir filme tek yorum
+    yapabildiği için tekrar eden çiftler atılır; sonuç R'den biraz az olabilir.
+    """
+    movie_p = zipf_probabilities(movie_count, args.zipf, rng)
+    user_p = zipf_probabilities(user_count, args.user_zipf, rng)
+
+    movie_idx = rng.choice(movie_count, size=review_count, p=movie_p)
+    user_idx = rng.choice(user_count, size=review_count, p=user_p)
+
+    pair_keys = movie_idx.astype(np.int64) * user_count + user_idx
+    _, unique_positions = np.unique(pair_keys, return_index=True)
+    movie_idx = movie_idx[unique_positions]
+    user_idx = user_idx[unique_positions]
+
+    # Her filmin bir "kalite" ortalaması var; puanlar onun etrafında dağılır
+    quality = np.clip(rng.normal(6.5, 1.5, size=movie_count), 1, 10)
+    ratings = np.clip(np.rint(quality[movie_idx] + rng.normal(0, 1.8, size=len(movie_idx))), 1, 10).astype(np.int64)
+
+    order = rng.permutation(len(movie_idx))
+    return movie_idx[order], user_idx[order], ratings[order]
+
+
+def movie_batches(movie_ids: list, averages: np.ndarray, counts: np.ndarray, sums: np.ndarray, args, rng: np.random.Generator):
+    embedder = None
+    if args.embeddings == "model":
+        from app.core.embeddings import generate_embeddings, movie_embedding_text
+        embedder = lambda docs: generate_embeddings([movie_embedding_text(d) for d in docs])
+
+    now = datetime.now()
+    for start in range(0, len(movie_ids), args.batch_size):
+        end = min(start + args.batch_size, len(movie_ids))
+        docs = []
+        for i in range(start, end):
+            title = " ".join(TITLE_WORDS[j] for j in rng.integers(len(TITLE_WORDS), size=rng.integers(1, 4)))
+            movie = MovieCreate(
+                title=f"{title} {i}",
+                year=int(rng.integers(1920, 2026)),
+                director=_person(rng),
+                genre=[GENRES[j] for j in rng.choice(len(GENRES), size=rng.integers(1, 4), replace=False)],
+                cast=[_person(rng) for _ in range(int(rng.integers(2, 8)))],
+                description=f"{SYNTHETIC_MARK} {title.lower()} hakkında sentetik bir film açıklaması.",
+                average_rating=float(averages[i]),
+            )
+            doc = movie.model_dump()
+            doc["_id"] = movie_ids[i]
+            doc["review_count"] = int(counts[i])
+            doc["rating_sum"] = int(sums[i])
+            doc["created_at"] = now - timedelta(days=int(rng.integers(0, 3650)))
+            docs.append(doc)
+
+        if embedder:
+            vectors = embedder(docs)
+        else:
+            vectors = rng.standard_normal((len(docs), EMBEDDING_DIM), dtype=np.float32)
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors.tolist()
+        for doc, vector in zip(docs, vectors):
+            doc["embedding"] = vector
+            # Rastgele vektörler de seçili modelinkiymiş gibi etiketlenir; aksi halde açılışta yeniden embed edilirdi
+            doc["embedding_model"] = current_embedding_model()
+        yield docs
+
+
+def user_batches(user_ids: list, args):
+    hashed_pw = get_password_hash(SYNTHETIC_PASSWORD)  # bcrypt pahalı, tek hash paylaşılıyor
+    created_at = datetime.utcnow()
+    for start in range(0, len(user_ids), args.batch_size):
+        yield [
+            {
+                "_id": user_ids[i],
+                "email": f"synthetic_{i}@synthetic.example.com",
+                "username": f"syn_{i}",
+                "hashed_password": hashed_pw,
+                "is_active": True,
+                "role": "user",
+                "created_at": created_at,
+            }
+            for i in range(start, min(start + args.batch_size, len(user_ids)))
+        ]
+
+
+def review_batches(movie_ids, user_ids, movie_idx, user_idx, ratings, args, rng: np.random.Generator):
+    now = datetime.utcnow()
+    # Son günlere yoğunlaşan zaman damgaları (trend hesapları için gerçekçi)
+    ages = rng.exponential(scale=args.review_days / 4, size=len(ratings)).clip(0, args.review_days)
+    for start in range(0, len(ratings), args.batch_size):
+        end = min(start + args.batch_size, len(ratings))
+        yield [
+            {
+                "rating": int(ratings[i]),
+                "comment": f"{SYNTHETIC_MARK} {int(ratings[i])}/10",
+                "movie_id": str(movie_ids[movie_idx[i]]),
+                "user_id": str(user_ids[user_idx[i]]),
+                "created_at": now - timedelta(days=float(ages[i])),
+            }
+            for i in range(start, end)
+        ]
+
+
+async def bulk_load(collection, batches, concurrency: int, label: str) -> int:
+    """Batch'leri en fazla `concurrency` eşzamanlı insert_many ile yazar."""
+    semaphore = asyncio.Semaphore(concurrency)
+    pending = set()
+    inserted = 0
+    started = time.perf_counter()
+
+    failures = []  # (batch no, kayıt sayısı, hata)
+
+    async def insert(number, batch):
+        nonlocal inserted
+        try:
+            result = await collection.insert_many(batch, ordered=False)
+            inserted += len(result.inserted_ids)
+        except BulkWriteError as e:
+            # ordered=False: hatalı kayıtlar dışındakiler yazıldı
+            write_errors = e.details.get("writeErrors", [])
+            inserted += e.details.get("nInserted", 0)
+            failures.append((number, len(write_errors), write_errors[0]["errmsg"] if write_errors else str(e)))
+        except Exception as e:
+            failures.append((number, len(batch), repr(e)))
+        finally:
+            semaphore.release()
+
+    for number, batch in enumerate(batches, start=1):
+        await semaphore.acquire()
+        task = asyncio.create_task(insert(number, batch))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+        # Üretici hızlı olsa bile eşzamanlı batch sayısı sınırlı kalır (sabit bellek)
+        await asyncio.sleep(0)
+
+    if pending:
+        await asyncio.gather(*pending)
+
+    elapsed = time.perf_counter() - started
+    print(f"{label}: {inserted} kayıt {elapsed:.1f} sn'de yüklendi ({inserted / max(elapsed, 1e-9):,.0f}/sn).")
+    if failures:
+        for number, count, error in sorted(failures):
+            print(f"{label}: batch {number} başarısız ({count} kayıt): {error}")
+        raise RuntimeError(f"{label}: {len(failures)} batch'te toplam {sum(c for _, c, _ in failures)} kayıt yazılamadı.")
+    return inserted
+
+
+async def generate(args) -> None:
+    rng = np.random.default_rng(args.seed)
+    client = AsyncIOMotorClient(settings.MONGO_URL)
+    db = client[settings.DB_NAME]
+
+    if args.drop:
+        await db.movies.delete_many({"description": {"$regex": f"^\\{SYNTHETIC_MARK}"}})
+        await db.users.delete_many({"email": {"$regex": "@synthetic\\.example\\.com$"}})
+        await db.reviews.delete_many({"comment": {"$regex": f"^\\{SYNTHETIC_MARK}"}})
+        print("Önceki sentetik veri silindi.")
+
+    movie_ids = [ObjectId() for _ in range(args.movies)]
+    user_ids = [ObjectId() for _ in range(args.users)]
+
+    movie_idx = user_idx = ratings = np.array([], dtype=np.int64)
+    averages = np.zeros(args.movies)
+    counts = np.zeros(args.movies, dtype=np.int64)
+    sums = np.zeros(args.movies)
+    if args.reviews and args.movies and args.users:
+        movie_idx, user_idx, ratings = sample_reviews(args.movies, args.users, args.reviews, args, rng)
+        # Ortalama puanlar ve sayaçlar yorumlardan önceden hesaplanıp filmlere yazılır
+        counts = np.bincount(movie_idx, minlength=args.movies)
+        sums = np.bincount(movie_idx, weights=ratings, minlength=args.movies)
+        averages = np.round(np.divide(sums, counts, out=np.zeros(args.movies), where=counts > 0), 1)
+        print(f"{len(ratings)} benzersiz yorum örneklendi; en popüler film {counts.max()} yorum aldı.")
+
+    await bulk_load(db.movies, movie_batches(movie_ids, averages, counts, sums, args, rng), args.concurrency, "Filmler")
+    await bulk_load(db.users, user_batches(user_ids, args), args.concurrency, "Kullanıcılar")
+    await bulk_load(db.reviews, review_batches(movie_ids, user_ids, movie_idx, user_idx, ratings, args, rng), args.concurrency, "Yorumlar")
+
+    client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sentetik film/kullanıcı/yorum verisi üretir.")
+    parser.add_argument("--movies", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--reviews", type=int, default=100_000)
+    parser.add_argument("--zipf", type=float, default=1.1, help="Film popülerliği Zipf üssü")
+    parser.add_argument("--user-zipf", type=float, default=0.8, help="Kullanıcı aktivitesi Zipf üssü")
+    parser.add_argument("--review-days", type=int, default=365, help="Yorum tarihlerinin yayıldığı gün sayısı")
+    parser.add_argument("--embeddings", choices=["random", "model"], default="random")
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--drop", action="store_true", help="Önceki sentetik veriyi sil")
+    asyncio.run(generate(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()